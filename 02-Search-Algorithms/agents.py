@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Generic, List
+from typing import Callable, Dict, Generic, List, Optional
 from problem import HeuristicFunction, Problem, S, A, Solution
+from solution_cache import SolutionCache
 
 # This is an abstract class for all goal based agents
 class GoalBasedAgent(ABC, Generic[S, A]):
@@ -23,16 +24,23 @@ class HumanAgent(GoalBasedAgent[S, A]):
 
 # This agent applies an uninformed search algorithm to find the solution to goal for the given state
 class UninformedSearchAgent(GoalBasedAgent[S, A]):
-    def __init__(self, search_fn: Callable[[Problem[S, A], S], Solution]) -> None:
+    # A precomputed policy (e.g. from a PolicyTable) can be given so the agent only searches from the states that are not in it
+    # If a solution cache is given, the agent looks for the solution in the cache before searching
+    def __init__(self, search_fn: Callable[[Problem[S, A], S], Solution], policy: Optional[Dict[S, A]] = None,
+                 cache: Optional[SolutionCache] = None) -> None:
         super().__init__()
         self.search_fn = search_fn
+        self.cache = cache
         # The policy will store the action to do for each state so as not to search again after each observation
-        self.policy: Dict[S, A] = {}
+        self.policy: Dict[S, A] = dict(policy) if policy is not None else {}
     
     def act(self, problem: Problem[S, A], state: S) -> A:
         # This state is not stored in the policy, we need to search for a solution 
         if state not in self.policy:
-            solution = self.search_fn(problem, state)
+            if self.cache is not None:
+                solution = self.cache.solve(problem, state, self.search_fn)
+            else:
+                solution = self.search_fn(problem, state)
             # if no solution was found, we return None
             if solution is None:
                 self.policy[state] = None
@@ -46,17 +54,24 @@ class UninformedSearchAgent(GoalBasedAgent[S, A]):
 
 # This agent applies an informed search algorithm to find the solution to goal for the given state
 class InformedSearchAgent(GoalBasedAgent[S, A]):
-    def __init__(self, search_fn: Callable[[Problem[S, A], S, HeuristicFunction], Solution], heuristic: HeuristicFunction) -> None:
+    # A precomputed policy (e.g. from a PolicyTable) can be given so the agent only searches from the states that are not in it
+    # If a solution cache is given, the agent looks for the solution in the cache before searching
+    def __init__(self, search_fn: Callable[[Problem[S, A], S, HeuristicFunction], Solution], heuristic: HeuristicFunction,
+                 policy: Optional[Dict[S, A]] = None, cache: Optional[SolutionCache] = None) -> None:
         super().__init__()
         self.search_fn = search_fn
         self.heuristic = heuristic
+        self.cache = cache
         # The policy will store the action to do for each state so as not to search again after each observation
-        self.policy: Dict[S, A] = {}
+        self.policy: Dict[S, A] = dict(policy) if policy is not None else {}
     
     def act(self, problem: Problem[S, A], state: S) -> A:
         # This state is not stored in the policy, we need to search for a solution 
         if state not in self.policy:
-            solution = self.search_fn(problem, state, self.heuristic)
+            if self.cache is not None:
+                solution = self.cache.solve(problem, state, self.search_fn, self.heuristic)
+            else:
+                solution = self.search_fn(problem, state, self.heuristic)
             # if no solution was found, we return None
             if solution is None:
                 self.policy[state] = None
@@ -0,0 +1,93 @@
+from typing import Callable, List, Tuple
+import argparse, csv, glob, time
+
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from dungeon_heuristic import strong_heuristic
+from parking_heuristic import pattern_database_heuristic
+from search_events import IncumbentEvent, SolutionEvent
+from benchmarks.common import print_table
+import search
+
+# This benchmark runs the anytime searches (weighted A*, ARA* and focal search) on the dungeons and the parking lots
+# and records every solution they find as (time, cost, bound) to show how the solution cost improves with the time.
+# It prints the first and the last solution of every search next to the optimal cost (found by A*),
+# and it writes all the solutions to a CSV file (one row per solution) which can be plotted as cost vs time.
+# With --plot, it also draws the cost vs time of every level to an image (this needs matplotlib).
+
+# The anytime searches with their keyword arguments
+ALGORITHMS: List[Tuple[str, dict]] = [
+    ("WeightedAStarSearch", dict(weight=2.0)),
+    ("AnytimeRepairingAStarSearch", dict(weight=3.0, weight_step=0.5)),
+    ("FocalSearch", dict(weight=2.0)),
+]
+
+# Returns the levels as (path, problem class, heuristic)
+def get_levels() -> List[Tuple[str, type, Callable]]:
+    return [(path, DungeonProblem, strong_heuristic) for path in sorted(glob.glob("dungeons/*.txt"))] + \
+           [(path, ParkingProblem, pattern_database_heuristic) for path in sorted(glob.glob("parks/*.txt"))]
+
+def main(args: argparse.Namespace):
+    rows, records = [], []
+    for path, problem_class, heuristic in get_levels():
+        problem = problem_class.from_file(path)
+        start = time.perf_counter()
+        solution = search.AStarSearch(problem, problem.get_initial_state(), heuristic)
+        astar_time = time.perf_counter() - start
+        optimal = None
+        if solution is not None:
+            state, optimal = problem.get_initial_state(), 0
+            for action in solution:
+                optimal += problem.get_cost(state, action)
+                state = problem.get_successor(state, action)
+        rows.append([path, "AStarSearch", optimal, f"{astar_time:.4f}", "1.00", optimal, f"{astar_time:.4f}", "1.00"])
+
+        for name, kwargs in ALGORITHMS:
+            problem = problem_class.from_file(path)
+            incumbents: List[IncumbentEvent] = []
+            start = time.perf_counter()
+            for event in getattr(search, name + "Events")(problem, problem.get_initial_state(), heuristic, time_limit=args.time_limit, **kwargs):
+                if isinstance(event, IncumbentEvent):
+                    incumbents.append(event)
+                    records.append({"level": path, "algorithm": name, "time": event.elapsed, "cost": event.cost, "bound": event.bound, "optimal": optimal})
+                elif isinstance(event, SolutionEvent):
+                    break
+            elapsed = time.perf_counter() - start
+            if not incumbents:
+                rows.append([path, name, None, "-", "-", None, f"{elapsed:.4f}", "-"])
+                continue
+            first, last = incumbents[0], incumbents[-1]
+            rows.append([path, name, first.cost, f"{first.elapsed:.4f}", f"{first.bound:.2f}", last.cost, f"{last.elapsed:.4f}", f"{last.bound:.2f}"])
+    print_table(["Level", "Algorithm", "First Cost", "First Time (s)", "First Bound", "Final Cost", "Final Time (s)", "Final Bound"], rows)
+
+    with open(args.csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["level", "algorithm", "time", "cost", "bound", "optimal"])
+        writer.writeheader()
+        writer.writerows(records)
+    print(f"Wrote {len(records)} solutions to {args.csv}")
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        levels = sorted({record["level"] for record in records})
+        figure, axes = plt.subplots(len(levels), 1, figsize=(8, 3 * len(levels)), squeeze=False)
+        for axis, level in zip(axes[:, 0], levels):
+            for name, _ in ALGORITHMS:
+                points = [(record["time"], record["cost"]) for record in records if record["level"] == level and record["algorithm"] == name]
+                if points: axis.step(*zip(*points), where="post", marker="o", label=name)
+            axis.set_title(level)
+            axis.set_xlabel("time (s)")
+            axis.set_ylabel("cost")
+            axis.legend()
+        figure.tight_layout()
+        figure.savefig(args.plot)
+        print(f"Saved the plot to {args.plot}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record the solution cost vs time of the anytime searches on the dungeons and the parking lots")
+    parser.add_argument("--time-limit", "-t", type=float, default=2.0, help="the time budget of every search in seconds")
+    parser.add_argument("--csv", default="anytime.csv", help="the CSV file to write the solutions to")
+    parser.add_argument("--plot", default=None, help="draw the cost vs time to this image file (needs matplotlib)")
+    args = parser.parse_args()
+    main(args)
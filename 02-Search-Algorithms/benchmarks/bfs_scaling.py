@@ -0,0 +1,55 @@
+from typing import Dict, List
+import argparse, os, random
+
+from graph import GraphNode, GraphRoutingProblem
+from mathutils import Point
+from helpers.utils import fetch_recorded_calls
+from benchmarks.common import load_module, measure_time, print_table
+import search
+
+# This benchmark measures how the breadth first search scales with the size of the graph
+# Each graph has random node positions and every node is connected to 'degree' random nodes.
+# The goal is not reachable (it has no incoming edges) so the search has to traverse the whole graph.
+# The baseline (by default, the search.py in the "solution" folder) is only run on the small graphs
+# since its frontier membership test is linear in the frontier size.
+
+# Create a random graph routing problem with the given number of nodes
+def random_graph_problem(size: int, degree: int, seed: int) -> GraphRoutingProblem:
+    rng = random.Random(seed)
+    nodes = [GraphNode(str(index), Point(rng.randrange(size), rng.randrange(size))) for index in range(size)]
+    adjacency: Dict[GraphNode, List[GraphNode]] = {
+        node: [nodes[rng.randrange(size - 1)] for _ in range(degree)] for node in nodes
+    }
+    return GraphRoutingProblem(nodes[0], nodes[-1], adjacency)
+
+def run(search_fn, problem: GraphRoutingProblem):
+    fetch_recorded_calls(GraphRoutingProblem.is_goal)
+    solution, elapsed = measure_time(search_fn, problem, problem.get_initial_state())
+    expanded = len(fetch_recorded_calls(GraphRoutingProblem.is_goal))
+    return solution, expanded, elapsed
+
+def main(args: argparse.Namespace):
+    baseline = load_module(os.path.join(args.baseline, "search.py"), "baseline_search")
+    rows = []
+    for exponent in range(3, args.max_exponent + 1):
+        size = 10 ** exponent
+        problem = random_graph_problem(size, args.degree, args.seed)
+        _, expanded, elapsed = run(search.BreadthFirstSearch, problem)
+        baseline_elapsed = "-"
+        if size <= args.baseline_limit:
+            _, baseline_expanded, baseline_elapsed = run(baseline.BreadthFirstSearch, problem)
+            assert baseline_expanded == expanded, "The expansion order differs from the baseline"
+            baseline_elapsed = f"{baseline_elapsed:.4f}"
+        rows.append([size, expanded, baseline_elapsed, f"{elapsed:.4f}", f"{expanded/elapsed:,.0f}"])
+        del problem
+    print_table(["Nodes", "Expanded", "Baseline (s)", "BFS (s)", "Expansions/s"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how breadth first search scales on random graphs")
+    parser.add_argument("--baseline", "-b", default="solution", help="the folder containing the baseline search.py")
+    parser.add_argument("--baseline-limit", type=int, default=10**4, help="the largest graph on which the baseline is run")
+    parser.add_argument("--max-exponent", type=int, default=6, help="the largest graph has 10^max_exponent nodes")
+    parser.add_argument("--degree", type=int, default=4, help="the number of edges going out of each node")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args)
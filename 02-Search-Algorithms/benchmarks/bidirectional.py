@@ -0,0 +1,81 @@
+from typing import Dict, List
+import argparse, random
+
+from graph import GraphNode, GraphRoutingProblem, graphrouting_heuristic, reverse_adjacency
+from mathutils import Point
+from helpers.utils import fetch_recorded_calls
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the number of expanded nodes (counted from the recorded calls of GraphRoutingProblem.is_goal)
+# of the unidirectional and bidirectional searches on graphs/graph1-6.json and on generated road networks.
+# It also checks that every bidirectional search finds a path with the same cost as its unidirectional counterpart.
+
+PAIRS = [
+    ("BreadthFirstSearch", "BidirectionalBreadthFirstSearch", False),
+    ("UniformCostSearch", "BidirectionalUniformCostSearch", False),
+    ("AStarSearch", "BidirectionalAStarSearch", True),
+]
+
+# Create a road network on a size x size grid with jittered positions
+# where every node has a directed edge to each of its 4 neighbors with the given probability
+# The start and the goal are placed at a quarter of the width from the left and right borders
+def road_network_problem(size: int, edge_probability: float, seed: int) -> GraphRoutingProblem:
+    rng = random.Random(seed)
+    nodes = {
+        (x, y): GraphNode(f"{x},{y}", Point(x * 10 + rng.randint(-3, 3), y * 10 + rng.randint(-3, 3)))
+        for x in range(size) for y in range(size)
+    }
+    adjacency: Dict[GraphNode, List[GraphNode]] = {}
+    for (x, y), node in nodes.items():
+        neighbors = [nodes.get((x + dx, y + dy)) for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1))]
+        adjacency[node] = sorted((
+            neighbor for neighbor in neighbors if neighbor is not None and rng.random() < edge_probability
+        ), key=lambda node: node.name)
+    start, goal = nodes[(size // 4, size // 2)], nodes[(3 * size // 4, size // 2)]
+    return GraphRoutingProblem(start, goal, adjacency, reverse_adjacency(adjacency))
+
+def path_cost(problem: GraphRoutingProblem, path) -> float:
+    if path is None: return None
+    state, total = problem.get_initial_state(), 0
+    for action in path:
+        total += problem.get_cost(state, action)
+        state = problem.get_successor(state, action)
+    assert state == problem.goal, "The path does not end at the goal"
+    return total
+
+def run(name: str, problem: GraphRoutingProblem, uses_heuristic: bool):
+    args = (problem, problem.get_initial_state())
+    if uses_heuristic: args += (graphrouting_heuristic,)
+    fetch_recorded_calls(GraphRoutingProblem.is_goal)
+    path, elapsed = measure_time(getattr(search, name), *args)
+    expanded = len(fetch_recorded_calls(GraphRoutingProblem.is_goal))
+    return path, expanded, elapsed
+
+def main(args: argparse.Namespace):
+    problems = [(f"graphs/graph{index}.json", GraphRoutingProblem.from_file(f"graphs/graph{index}.json")) for index in range(1, 7)]
+    for size in args.sizes:
+        problems.append((f"road network {size}x{size}", road_network_problem(size, args.edge_probability, args.seed)))
+    rows = []
+    for name, problem in problems:
+        for unidirectional, bidirectional, uses_heuristic in PAIRS:
+            path, expanded, elapsed = run(unidirectional, problem, uses_heuristic)
+            bi_path, bi_expanded, bi_elapsed = run(bidirectional, problem, uses_heuristic)
+            if uses_heuristic or "Uniform" in unidirectional:
+                cost, bi_cost = path_cost(problem, path), path_cost(problem, bi_path)
+                same = (cost is None and bi_cost is None) or (cost is not None and bi_cost is not None and abs(cost - bi_cost) < 1e-6)
+            else:
+                same = (path is None and bi_path is None) or (path is not None and bi_path is not None and len(path) == len(bi_path))
+            rows.append([
+                name, unidirectional, "OK" if same else "MISMATCH",
+                expanded, bi_expanded, f"{elapsed:.4f}", f"{bi_elapsed:.4f}"
+            ])
+    print_table(["Graph", "Algorithm", "Path", "Expanded", "Bidirectional Expanded", "Time (s)", "Bidirectional Time (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the unidirectional and bidirectional searches on graph routing problems")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[30, 100, 300], help="the side lengths of the generated road networks")
+    parser.add_argument("--edge-probability", type=float, default=0.8, help="the probability of every directed edge in the generated road networks")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,45 @@
+from typing import Callable, Dict, List, Tuple
+import argparse
+
+from dungeon import DungeonProblem
+from dungeon_heuristic import bounding_box_heuristic, strong_heuristic, weak_heuristic
+from helpers.utils import fetch_tracked_call_count
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the dungeon heuristics by running A* with each of them on the dungeon levels
+# For every heuristic, it reports the number of explored nodes (the calls to "is_goal"), the run time and the path length
+# The run time includes the time spent building the heuristic tables (e.g. the maze distances), since a new problem is loaded for every run
+
+HEURISTICS: Dict[str, Callable] = {
+    "weak": weak_heuristic,
+    "bounding_box": bounding_box_heuristic,
+    "strong": strong_heuristic,
+}
+
+# The levels to benchmark with the list of heuristics to skip on each level (since they take too long to finish)
+LEVELS: List[Tuple[str, List[str]]] = [
+    *((f"dungeons/dungeon{index}.txt", []) for index in range(1, 4)),
+    ("dungeons/dungeon4.txt", ["weak", "bounding_box"]),
+]
+
+def main(args: argparse.Namespace):
+    rows = []
+    for level, skipped in LEVELS:
+        expected = None
+        for name, heuristic in HEURISTICS.items():
+            if name in skipped and not args.all: continue
+            problem = DungeonProblem.from_file(level)
+            fetch_tracked_call_count(DungeonProblem.is_goal)
+            solution, elapsed = measure_time(search.AStarSearch, problem, problem.get_initial_state(), heuristic)
+            explored = fetch_tracked_call_count(DungeonProblem.is_goal)
+            length = None if solution is None else len(solution)
+            if expected is None: expected = length
+            rows.append([level, name, length, "OK" if length == expected else "MISMATCH", explored, f"{elapsed:.4f}"])
+    print_table(["Level", "Heuristic", "Path Length", "Optimal", "Explored", "Time (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the explored nodes and the run time of A* with the dungeon heuristics")
+    parser.add_argument("--all", action="store_true", help="also run the heuristics that are skipped on the large levels")
+    args = parser.parse_args()
+    main(args)
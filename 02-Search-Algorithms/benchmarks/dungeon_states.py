@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, List, Tuple
+from collections import deque
+import argparse, gc, time, tracemalloc
+
+from mathutils import Direction, Point
+from dungeon import DungeonLayout, DungeonProblem, DungeonState
+from benchmarks.common import print_table
+
+# This benchmark compares the compact dungeon state (a cell index and a coin bitmask) against
+# the previous representation (a Point and a frozenset of coin Points)
+# For every level, it enumerates all the reachable states with a breadth first search over the successors and reports:
+#   - The number of states generated per second (generating a successor and checking it against the set of reached states)
+#   - The memory per state (the memory allocated by the reached set divided by the number of states)
+
+# This is the state representation that was used before the compact one
+@dataclass(frozen=True)
+class LegacyDungeonState:
+    __slots__ = ("layout", "player", "remaining_coins")
+    layout: DungeonLayout
+    player: Point
+    remaining_coins: FrozenSet[Point]
+
+def legacy_initial_state(problem: DungeonProblem) -> LegacyDungeonState:
+    state = problem.get_initial_state()
+    return LegacyDungeonState(problem.layout, state.player, state.remaining_coins)
+
+def legacy_successors(state: LegacyDungeonState) -> List[LegacyDungeonState]:
+    successors = []
+    walkable = state.layout.walkable
+    for direction in Direction:
+        player = state.player + direction.to_vector()
+        if player not in walkable: continue
+        remaining_coins = state.remaining_coins
+        if player in remaining_coins:
+            remaining_coins -= {player}
+        successors.append(LegacyDungeonState(state.layout, player, remaining_coins))
+    return successors
+
+def compact_initial_state(problem: DungeonProblem) -> DungeonState:
+    return problem.get_initial_state()
+
+def compact_successors_of(problem: DungeonProblem) -> Callable[[DungeonState], List[DungeonState]]:
+    def successors(state: DungeonState) -> List[DungeonState]:
+        return [problem.get_successor(state, action) for action in problem.get_actions(state)]
+    return successors
+
+# Enumerate all the reachable states and return the set of reached states and the number of generated successors
+def enumerate_states(initial_state, successors: Callable, limit: int) -> Tuple[set, int]:
+    reached = {initial_state}
+    frontier = deque([initial_state])
+    generated = 0
+    while frontier and len(reached) < limit:
+        for successor in successors(frontier.popleft()):
+            generated += 1
+            if successor not in reached:
+                reached.add(successor)
+                frontier.append(successor)
+    return reached, generated
+
+def measure(initial_state, successors: Callable, limit: int) -> Tuple[int, float, float]:
+    gc.collect()
+    start = time.perf_counter()
+    reached, generated = enumerate_states(initial_state, successors, limit)
+    elapsed = time.perf_counter() - start
+    count = len(reached)
+    del reached
+    gc.collect()
+    tracemalloc.start()
+    try:
+        reached, _ = enumerate_states(initial_state, successors, limit)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return count, generated / elapsed, current / count
+
+def main(args: argparse.Namespace):
+    rows = []
+    for level in args.levels:
+        problem = DungeonProblem.from_file(level)
+        representations = [
+            ("frozenset", legacy_initial_state(problem), legacy_successors),
+            ("bitmask", compact_initial_state(problem), compact_successors_of(problem)),
+        ]
+        results = []
+        for name, initial_state, successors in representations:
+            count, rate, per_state = measure(initial_state, successors, args.limit)
+            results.append((name, count, rate, per_state))
+        for name, count, rate, per_state in results:
+            rows.append([level, name, count, f"{rate:,.0f}", f"{per_state:.1f}", f"{rate / results[0][2]:.2f}x"])
+    print_table(["Level", "State", "States", "States/s", "Bytes/State", "Speedup"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the speed and the memory of the dungeon state representations")
+    parser.add_argument("levels", nargs="*", default=[f"dungeons/dungeon{index}.txt" for index in range(1, 5)], help="the dungeon files to enumerate")
+    parser.add_argument("--limit", "-l", type=int, default=200000, help="the maximum number of states to enumerate per level")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,78 @@
+from typing import Callable, List, Tuple
+import argparse
+
+from dungeon import DungeonLayout, DungeonProblem, DungeonState
+from dungeon_heuristic import maze_distances
+from grid_search import GridAStarSearch, JumpPointSearch
+from level_generators import generate_dungeon_problem
+from mathutils import Direction, Point, manhattan_distance
+from search_metrics import SearchMetrics
+from helpers.utils import fetch_tracked_call_count
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the grid searches of grid_search.py against the generic AStarSearch on the player leg of large generated dungeons
+# The leg goes from the walkable cell closest to the top left corner to the walkable cell closest to the bottom right corner
+# (the longest legs of the dungeon) and the dungeons are mostly open since JPS saves the most in open areas.
+# For every search, it reports the path length (checked against the maze distance computed by a BFS), the expanded nodes and the time:
+#   AStarSearch: the search of search.py on a DungeonProblem without coins whose exit is the goal of the leg (expanded = "is_goal" calls)
+#   GridAStarSearch: A* on the cells of the layout
+#   JumpPointSearch: JPS on the cells of the layout (expanded = the expanded jump points)
+# All the searches use the manhattan distance as the heuristic.
+
+def manhattan_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
+    return manhattan_distance(state.player, problem.layout.exit)
+
+# Returns the walkable cell closest to the given location
+def closest_walkable(layout: DungeonLayout, point: Point) -> Point:
+    return min(layout.walkable, key=lambda walkable: (manhattan_distance(walkable, point), walkable))
+
+# Create a problem without coins where the player starts at "start" and the exit is "goal"
+def leg_problem(layout: DungeonLayout, start: Point, goal: Point) -> DungeonProblem:
+    problem = DungeonProblem()
+    problem.layout = DungeonLayout.create(layout.width, layout.height, layout.walkable, goal, ())
+    problem.initial_state = DungeonState.create(problem.layout, start, ())
+    return problem
+
+def run_a_star(layout: DungeonLayout, start: Point, goal: Point) -> Tuple[List[Direction], int]:
+    problem = leg_problem(layout, start, goal)
+    fetch_tracked_call_count(DungeonProblem.is_goal)
+    solution = search.AStarSearch(problem, problem.get_initial_state(), manhattan_heuristic)
+    return solution, fetch_tracked_call_count(DungeonProblem.is_goal)
+
+def grid_runner(search_fn: Callable) -> Callable[[DungeonLayout, Point, Point], Tuple[List[Direction], int]]:
+    def run(layout: DungeonLayout, start: Point, goal: Point) -> Tuple[List[Direction], int]:
+        metrics = SearchMetrics()
+        solution = search_fn(layout, start, goal, metrics)
+        return solution, metrics.expanded
+    return run
+
+SEARCHES: List[Tuple[str, Callable[[DungeonLayout, Point, Point], Tuple[List[Direction], int]]]] = [
+    ("AStarSearch", run_a_star),
+    ("GridAStarSearch", grid_runner(GridAStarSearch)),
+    ("JumpPointSearch", grid_runner(JumpPointSearch)),
+]
+
+def main(args: argparse.Namespace):
+    rows = []
+    for size in args.sizes:
+        for walls in args.walls:
+            layout = generate_dungeon_problem(size, coins=0, wall_density=walls, seed=args.seed).layout
+            start, goal = closest_walkable(layout, Point(0, 0)), closest_walkable(layout, Point(size - 1, size - 1))
+            distance = maze_distances(layout, start)[layout.cell(goal)]
+            base = None
+            for name, run in SEARCHES:
+                (solution, expanded), elapsed = min((measure_time(run, layout, start, goal) for _ in range(args.repeat)), key=lambda result: result[1])
+                if base is None: base = elapsed
+                length = None if solution is None else len(solution)
+                rows.append([f"{size}x{size}", walls, name, length, "OK" if length == distance else "MISMATCH", expanded, f"{elapsed:.4f}", f"{base / elapsed:.2f}x"])
+    print_table(["Size", "Walls", "Search", "Path Length", "Optimal", "Expanded", "Time (s)", "Speedup"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Jump Point Search and grid A* against AStarSearch on the player leg of generated dungeons")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256], help="the sizes of the generated dungeons")
+    parser.add_argument("--walls", type=float, nargs="+", default=[0.0, 0.05, 0.2], help="the wall densities of the generated dungeons")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the level generator")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="the best time of this many runs is reported")
+    args = parser.parse_args()
+    main(args)
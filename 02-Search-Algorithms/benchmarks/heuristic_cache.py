@@ -0,0 +1,65 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+
+from dungeon import DungeonProblem
+from dungeon_heuristic import bounding_box_heuristic, strong_heuristic, weak_heuristic
+from heuristic_cache import cached_heuristic
+from helpers.utils import fetch_tracked_call_count
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark runs A* and Greedy Best First Search on the dungeons with and without a heuristic cache
+# For every cache size, it reports the hit rate, the evictions and the run time compared to the uncached heuristic
+# It also checks that the cache does not change the explored nodes (the calls to "is_goal") or the path length
+
+HEURISTICS: Dict[str, Callable] = {
+    "weak": weak_heuristic,
+    "bounding_box": bounding_box_heuristic,
+    "strong": strong_heuristic,
+}
+
+ALGORITHMS = ["AStarSearch", "BestFirstSearch"]
+
+# The levels to benchmark with the list of heuristics to skip on each level (since they take too long to finish)
+LEVELS: List[Tuple[str, List[str]]] = [
+    *((f"dungeons/dungeon{index}.txt", []) for index in range(1, 4)),
+    ("dungeons/dungeon4.txt", ["weak", "bounding_box"]),
+]
+
+# Run the search on a new problem and return the path length, the explored nodes and the elapsed time
+def run(level: str, algorithm: str, heuristic: Callable) -> Tuple[Optional[int], int, float]:
+    problem = DungeonProblem.from_file(level)
+    fetch_tracked_call_count(DungeonProblem.is_goal)
+    solution, elapsed = measure_time(getattr(search, algorithm), problem, problem.get_initial_state(), heuristic)
+    explored = fetch_tracked_call_count(DungeonProblem.is_goal)
+    return (None if solution is None else len(solution)), explored, elapsed
+
+def main(args: argparse.Namespace):
+    sizes = [None if size <= 0 else size for size in args.sizes]
+    rows = []
+    for level, skipped in LEVELS:
+        for name, heuristic in HEURISTICS.items():
+            if name in skipped and not args.all: continue
+            for algorithm in ALGORITHMS:
+                length, explored, base_time = run(level, algorithm, heuristic)
+                rows.append([level, algorithm, name, "none", length, explored, "-", "-", "-", f"{base_time:.4f}", "1.00x"])
+                for size in sizes:
+                    cached = cached_heuristic(size)(heuristic)
+                    cached_length, cached_explored, elapsed = run(level, algorithm, cached)
+                    stats = cached.stats()
+                    same = cached_length == length and cached_explored == explored
+                    rows.append([
+                        level, algorithm, name, "unbounded" if size is None else size,
+                        cached_length, cached_explored if same else f"{cached_explored} (MISMATCH)",
+                        stats["hits"] + stats["misses"], f"{stats['hit_rate']:.1%}", stats["evictions"],
+                        f"{elapsed:.4f}", f"{base_time / elapsed:.2f}x"
+                    ])
+    print_table(["Level", "Algorithm", "Heuristic", "Cache Size", "Path Length", "Explored", "Calls", "Hit Rate", "Evictions", "Time (s)", "Speedup"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the hit rate and the run time of the cached dungeon heuristics")
+    parser.add_argument("--sizes", "-s", type=int, nargs="+", default=[0, 4096, 256],
+                        help="the cache sizes to test (0 means unbounded)")
+    parser.add_argument("--all", action="store_true", help="also run the heuristics that are skipped on the large levels")
+    args = parser.parse_args()
+    main(args)
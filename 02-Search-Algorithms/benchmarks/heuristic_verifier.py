@@ -0,0 +1,75 @@
+from typing import Callable, Dict
+import argparse
+
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from dungeon_heuristic import bounding_box_heuristic, strong_heuristic, weak_heuristic
+from parking_heuristic import distance_heuristic, pattern_database_heuristic
+from helpers.heuristic_checks import test_heuristic_consistency
+from helpers.heuristic_verifier import StateSpace, verify_heuristic
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the offline heuristic verifier (helpers/heuristic_verifier.py) against the online consistency check
+# For every level, the state space is explored once (the "Explore" time includes the backward Dijkstra search)
+# then every heuristic is verified on all the states and edges of the state space ("Verify" time).
+# The online check runs A* with "test_heuristic_consistency" on every generated successor ("A* Check" time)
+# and it only checks the edges generated by the search ("A* Edges").
+# Examples:
+#   python -m benchmarks.heuristic_verifier
+#   python -m benchmarks.heuristic_verifier dungeons/dungeon3.txt --no-online
+
+HEURISTICS: Dict[type, Dict[str, Callable]] = {
+    DungeonProblem: {
+        "weak": weak_heuristic,
+        "bounding_box": bounding_box_heuristic,
+        "strong": strong_heuristic,
+    },
+    ParkingProblem: {
+        "distance": distance_heuristic,
+        "pattern_database": pattern_database_heuristic,
+    },
+}
+
+DEFAULT_LEVELS = [f"dungeons/dungeon{index}.txt" for index in range(1, 4)] + [f"parks/park{index}.txt" for index in range(1, 6)]
+
+# Run A* with the consistency check on every generated successor and return the number of checked edges
+def online_check(problem_class: type, level: str, heuristic: Callable) -> int:
+    problem = problem_class.from_file(level)
+    checked = 0
+    check = test_heuristic_consistency(heuristic)(problem_class.get_successor)
+    def get_successor(state, action):
+        nonlocal checked
+        checked += 1
+        return check(problem, state, action)
+    problem.get_successor = get_successor
+    search.AStarSearch(problem, problem.get_initial_state(), heuristic)
+    return checked
+
+def main(args: argparse.Namespace):
+    rows = []
+    for level in args.levels:
+        problem_class = DungeonProblem if "dungeon" in level else ParkingProblem
+        problem = problem_class.from_file(level)
+        space, explore_time = measure_time(StateSpace.of, problem, args.max_states)
+        for index, (name, heuristic) in enumerate(HEURISTICS[problem_class].items()):
+            report, verify_time = measure_time(verify_heuristic, problem, heuristic)
+            row = [level if index == 0 else "", name, len(space.states), len(space.sources),
+                   "yes" if report.admissible else f"NO ({len(report.inadmissible) + len(report.nonzero_goals)})",
+                   "yes" if report.consistent else f"NO ({len(report.inconsistent)})",
+                   f"{report.accuracy:.3f}", f"{explore_time:.4f}" if index == 0 else "", f"{verify_time:.4f}"]
+            if args.online:
+                checked, check_time = measure_time(online_check, problem_class, level, heuristic)
+                row += [checked, f"{check_time:.4f}"]
+            rows.append(row)
+    headers = ["Level", "Heuristic", "States", "Edges", "Admissible", "Consistent", "Accuracy", "Explore (s)", "Verify (s)"]
+    if args.online: headers += ["A* Edges", "A* Check (s)"]
+    print_table(headers, rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the heuristics on the whole state space of the levels and compare against the online check")
+    parser.add_argument("levels", nargs="*", default=DEFAULT_LEVELS, help="the dungeon and parking files to verify")
+    parser.add_argument("--max-states", type=int, default=1_000_000, help="the maximum number of states of a level")
+    parser.add_argument("--no-online", dest="online", action="store_false", help="do not run A* with the online consistency check")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,100 @@
+from typing import Dict, List
+import argparse, json, math, os, random, tempfile, time
+
+from graph import GraphRoutingProblem, graphrouting_heuristic
+from landmarks import LandmarkRouter, LandmarkTable, graph_hash, landmark_heuristic, landmark_path
+from benchmarks.common import print_table
+import search
+
+# This benchmark measures the throughput (queries per second) of shortest path queries on a large generated graph
+# It compares:
+#   - a new A* search with the euclidean heuristic for every query (the baseline)
+#   - a new A* search with the landmark heuristic for every query
+#   - the landmark router which answers the queries over node indices
+# It also reports the preprocessing time, the size of the landmark file and checks that all the methods find paths with the same cost.
+
+# Generate a road-like graph: the nodes are on a jittered grid and every node is connected to its grid neighbors
+# Some edges are one-way (only one direction is kept) and some edges are missing to make the graph irregular
+def generate_graph(size: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    name = lambda x, y: f"n{x}_{y}"
+    graph = {
+        name(x, y): {"position": [x * 100 + rng.randint(-30, 30), y * 100 + rng.randint(-30, 30)], "adjacent": []}
+        for y in range(size) for x in range(size)
+    }
+    for y in range(size):
+        for x in range(size):
+            for nx, ny in ((x + 1, y), (x, y + 1)):
+                if nx >= size or ny >= size or rng.random() < 0.1: continue
+                one_way = rng.random() < 0.15
+                forward = rng.random() < 0.5
+                if not one_way or forward: graph[name(x, y)]["adjacent"].append(name(nx, ny))
+                if not one_way or not forward: graph[name(nx, ny)]["adjacent"].append(name(x, y))
+    return {"graph": graph, "start": name(0, 0), "goal": name(size - 1, size - 1)}
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        graph_path = os.path.join(directory, "graph.json")
+        with open(graph_path, 'w') as f:
+            json.dump(generate_graph(args.size, args.seed), f)
+        problem = GraphRoutingProblem.from_file(graph_path)
+        nodes = sorted(problem.adjacency, key=lambda node: node.name)
+        queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        table = LandmarkTable.build(problem.adjacency, args.landmarks)
+        table.save(landmark_path(graph_path), graph_hash(graph_path))
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        router = LandmarkRouter.from_file(graph_path, args.landmarks)
+        load_time = time.perf_counter() - start
+        print(f"Graph: {len(nodes)} nodes, {sum(len(adjacent) for adjacent in problem.adjacency.values())} edges")
+        print(f"Preprocessing: {build_time:.3f}s, landmark file: {os.path.getsize(landmark_path(graph_path))} bytes, loading: {load_time:.3f}s")
+
+        # Every query uses a new problem (sharing the adjacency) since the start and the goal are fixed in the problem
+        def make_problem(query_start, query_goal) -> GraphRoutingProblem:
+            return GraphRoutingProblem(query_start, query_goal, problem.adjacency, problem.reverse_adjacency)
+
+        def path_cost(query_start, path: List) -> float:
+            if path is None: return math.inf
+            cost, state = 0, query_start
+            for action in path:
+                cost += problem.get_cost(state, action)
+                state = action
+            return cost
+
+        def run_search(heuristic, attach: bool):
+            costs = []
+            for query_start, query_goal in queries:
+                query_problem = make_problem(query_start, query_goal)
+                if attach: table.attach(query_problem)
+                costs.append(path_cost(query_start, search.AStarSearch(query_problem, query_start, heuristic)))
+            return costs
+
+        def run_router():
+            return [cost for _, cost in router.query_many(queries)]
+
+        methods = [
+            ("AStarSearch + euclidean", lambda: run_search(graphrouting_heuristic, False)),
+            ("AStarSearch + landmarks", lambda: run_search(landmark_heuristic, True)),
+            ("LandmarkRouter", run_router),
+        ]
+        rows, expected = [], None
+        for name, method in methods:
+            start = time.perf_counter()
+            costs = method()
+            elapsed = time.perf_counter() - start
+            if expected is None: expected = costs
+            same = all(a == b or abs(a - b) <= 1e-6 * max(1, abs(a)) for a, b in zip(costs, expected))
+            rows.append([name, len(queries), f"{elapsed:.3f}", f"{len(queries) / elapsed:.1f}", "OK" if same else "MISMATCH"])
+        print_table(["Method", "Queries", "Time (s)", "Queries/s", "Same Costs"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the shortest path queries per second with and without the landmark tables")
+    parser.add_argument("--size", "-s", type=int, default=60, help="the generated graph is a size x size grid")
+    parser.add_argument("--queries", "-q", type=int, default=200, help="the number of random queries")
+    parser.add_argument("--landmarks", "-l", type=int, default=8, help="the number of landmarks")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed")
+    args = parser.parse_args()
+    main(args)
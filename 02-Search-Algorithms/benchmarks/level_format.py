@@ -0,0 +1,59 @@
+import argparse, json, os, tempfile
+
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from graph import GraphRoutingProblem
+from level_format import convert, load_level
+from level_generators import generate_dungeon, generate_graph, generate_parking
+from benchmarks.common import format_bytes, measure_peak_memory, measure_time, print_table
+
+# This benchmark compares loading large generated levels from the text/json files with loading them from the binary level files
+# For every level, it reports the file sizes, the load times and the peak memory allocated while loading
+# (the binary files are loaded both memory-mapped and read into memory)
+# and it checks that the loaded problems are equal to the ones read from the text/json files.
+
+# Returns whether two problems of the same kind have the same content
+def same_problem(original, loaded) -> bool:
+    if isinstance(original, DungeonProblem):
+        # the layouts are compared by their fields since the layout equality compares the objects by pointers
+        return all(getattr(original.layout, field) == getattr(loaded.layout, field) for field in original.layout.__slots__) and \
+            (original.initial_state.cell, original.initial_state.coins) == (loaded.initial_state.cell, loaded.initial_state.coins)
+    if isinstance(original, ParkingProblem):
+        return all(getattr(original, field) == getattr(loaded, field)
+                   for field in ("width", "height", "passages", "cars", "slots", "walkable", "moves", "slot_owner", "goal"))
+    return (original.start, original.goal) == (loaded.start, loaded.goal) and list(original.adjacency.items()) == list(loaded.adjacency.items()) \
+        and original.reverse_adjacency == loaded.reverse_adjacency
+
+def main(args: argparse.Namespace):
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in (("dungeon.txt", generate_dungeon(args.size, coins=60, seed=args.seed)),
+                           ("park.txt", generate_parking(args.size, cars=10, seed=args.seed))):
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write(text)
+        with open(os.path.join(directory, "graph.json"), 'w') as f:
+            json.dump(generate_graph(args.size * args.size, seed=args.seed), f)
+        levels = [("dungeon.txt", DungeonProblem.from_file), ("park.txt", ParkingProblem.from_file), ("graph.json", GraphRoutingProblem.from_file)]
+
+        for name, from_file in levels:
+            source = os.path.join(directory, name)
+            target = convert(source)
+            original, text_time = measure_time(from_file, source)
+            _, text_memory = measure_peak_memory(from_file, source)
+            row = [name, format_bytes(os.path.getsize(source)), format_bytes(os.path.getsize(target)), f"{text_time:.4f}", format_bytes(text_memory)]
+            same = True
+            for mmap in (True, False):
+                loaded, binary_time = measure_time(load_level, target, mmap)
+                _, binary_memory = measure_peak_memory(load_level, target, mmap)
+                same = same and same_problem(original, loaded)
+                row += [f"{binary_time:.4f}", f"{text_time / binary_time:.1f}x", format_bytes(binary_memory)]
+            rows.append(row + ["OK" if same else "MISMATCH"])
+    print_table(["Level", "Text Size", "Binary Size", "Text Load (s)", "Text Memory",
+                 "Mapped Load (s)", "Speedup", "Mapped Memory", "Read Load (s)", "Speedup", "Read Memory", "Same Problem"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the load time and memory of the text/json levels and the binary levels")
+    parser.add_argument("--size", "-s", type=int, default=400, help="the width and height of the generated grids (the graph has size^2 nodes)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the level generators")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,54 @@
+from typing import List
+import argparse
+
+from dungeon import DungeonProblem
+from dungeon_heuristic import strong_heuristic, weak_heuristic
+from helpers.utils import fetch_tracked_call_count
+from benchmarks.common import format_bytes, measure_peak_memory, measure_time, print_table
+import search
+
+# This benchmark compares A* against the memory-bounded searches (IDA* and SMA*) on the dungeon levels
+# For every search, it reports the peak memory, the number of expanded nodes (the calls to "is_goal") and the run time
+# Every search is run twice: once under tracemalloc to get the peak memory and once without it to get the time and the expansions
+# The path length of the memory-bounded searches is compared with A* to check that they are still optimal
+# Note: dungeon4 is not included by default since IDA* takes too long to finish on it
+
+HEURISTICS = {"weak": weak_heuristic, "strong": strong_heuristic}
+
+def run(search_fn, problem: DungeonProblem, *args):
+    initial_state = problem.get_initial_state()
+    _, peak = measure_peak_memory(search_fn, problem, initial_state, *args)
+    fetch_tracked_call_count(DungeonProblem.is_goal)
+    solution, elapsed = measure_time(search_fn, problem, initial_state, *args)
+    expanded = fetch_tracked_call_count(DungeonProblem.is_goal)
+    return solution, peak, expanded, elapsed
+
+def main(args: argparse.Namespace):
+    heuristic = HEURISTICS[args.heuristic]
+    rows: List[List[str]] = []
+    for level in args.levels:
+        configurations = [("AStarSearch", search.AStarSearch, ())]
+        configurations.append((f"IDA* (table={args.transpositions})", search.IterativeDeepeningAStarSearch, (args.transpositions,)))
+        for max_nodes in args.max_nodes:
+            configurations.append((f"SMA* (max_nodes={max_nodes})", search.SimplifiedMemoryBoundedAStarSearch, (max_nodes,)))
+        expected = None
+        for name, search_fn, extra_args in configurations:
+            problem = DungeonProblem.from_file(level)
+            solution, peak, expanded, elapsed = run(search_fn, problem, heuristic, *extra_args)
+            length = None if solution is None else len(solution)
+            if expected is None: expected = length
+            rows.append([
+                level, name, length,
+                "OK" if length == expected else "MISMATCH",
+                format_bytes(peak), expanded, f"{elapsed:.4f}"
+            ])
+    print_table(["Level", "Algorithm", "Path Length", "Optimal", "Peak Memory", "Expanded", "Time (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the peak memory and the expansions of A*, IDA* and SMA* on dungeons")
+    parser.add_argument("levels", nargs="*", default=[f"dungeons/dungeon{index}.txt" for index in range(1, 4)], help="the dungeon files to benchmark")
+    parser.add_argument("--heuristic", choices=HEURISTICS.keys(), default="strong", help="the heuristic used by all the searches")
+    parser.add_argument("--max-nodes", "-m", type=int, nargs="+", default=[20000, 5000], help="the memory budgets (in nodes) of SMA*")
+    parser.add_argument("--transpositions", "-t", type=int, default=2**16, help="the size of the transposition table of IDA*")
+    args = parser.parse_args()
+    main(args)
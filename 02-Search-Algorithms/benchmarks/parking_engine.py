@@ -0,0 +1,60 @@
+from typing import List
+from collections import deque
+import argparse, os
+
+from parking import ParkingProblem
+from problem import Problem
+from benchmarks.common import load_module, measure_time, print_table
+import search
+
+# This benchmark compares the integer-encoded parking problem against a baseline implementation of parking.py
+# (by default, the one in the "solution" folder) on the parking levels. For every level, it reports:
+#   - The time to enumerate all the reachable states with a breadth first search over "get_successors"
+#   - The time of uniform cost search (from the current search.py) on both implementations
+# Both implementations should find the same solution (the same list of actions)
+
+# Enumerate the reachable states (up to the limit) and return the number of states
+def enumerate_states(problem: Problem, limit: int) -> int:
+    initial_state = problem.get_initial_state()
+    reached = {initial_state}
+    frontier = deque([initial_state])
+    while frontier and len(reached) < limit:
+        for _, successor, _ in problem.get_successors(frontier.popleft()):
+            if successor not in reached:
+                reached.add(successor)
+                frontier.append(successor)
+    return len(reached)
+
+def main(args: argparse.Namespace):
+    baseline = load_module(os.path.join(args.baseline, "parking.py"), "baseline_parking")
+    rows: List[List[str]] = []
+    for index in range(1, 6):
+        level = f"parks/park{index}.txt"
+        before_problem = baseline.ParkingProblem.from_file(level)
+        after_problem = ParkingProblem.from_file(level)
+
+        before_count, before_enumeration = measure_time(enumerate_states, before_problem, args.limit)
+        after_count, after_enumeration = measure_time(enumerate_states, after_problem, args.limit)
+        assert before_count == after_count, f"{level}: the implementations reached a different number of states"
+
+        expected, before_search = measure_time(search.UniformCostSearch, before_problem, before_problem.get_initial_state())
+        solution, after_search = measure_time(search.UniformCostSearch, after_problem, after_problem.get_initial_state())
+
+        rows.append([
+            level, after_count,
+            f"{before_enumeration:.4f}", f"{after_enumeration:.4f}", f"{before_enumeration/after_enumeration:.2f}x",
+            "OK" if solution == expected else "MISMATCH",
+            f"{before_search:.4f}", f"{after_search:.4f}", f"{before_search/after_search:.2f}x",
+        ])
+    print_table([
+        "Level", "States",
+        "Enumerate Before (s)", "Enumerate After (s)", "Speedup",
+        "UCS Solution", "UCS Before (s)", "UCS After (s)", "Speedup"
+    ], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the speed of the parking problem implementation against a baseline")
+    parser.add_argument("--baseline", "-b", default="solution", help="the folder containing the baseline parking.py")
+    parser.add_argument("--limit", "-l", type=int, default=10**6, help="the maximum number of states to enumerate per level")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,80 @@
+from typing import Callable, Dict, List
+import argparse
+
+from parking import ParkingProblem
+from parking_heuristic import distance_heuristic, pattern_database_heuristic
+from problem import Problem
+from helpers.heuristic_checks import InconsistentHeuristicException, test_heuristic_consistency
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the parking heuristics by running A* with each of them on the parking levels
+# For every heuristic, it reports the number of explored nodes (the calls to "is_goal"), the run time and the path cost
+# The run time includes the time spent building the heuristic tables, since a new problem is loaded for every run
+# The "zero" heuristic makes A* expand the same nodes as uniform cost search
+# With --check, every search also runs the consistency check from helpers/heuristic_checks.py on every generated successor
+
+HEURISTICS: Dict[str, Callable] = {
+    "zero": lambda problem, state: 0,
+    "distance": distance_heuristic,
+    "pattern_database": pattern_database_heuristic,
+}
+
+def path_cost(problem: Problem, path: List) -> float:
+    state, cost = problem.get_initial_state(), 0
+    for action in path:
+        cost += problem.get_cost(state, action)
+        state = problem.get_successor(state, action)
+    return cost
+
+def run(level: str, heuristic: Callable, check: bool):
+    problem = ParkingProblem.from_file(level)
+    explored = 0
+    is_goal = problem.is_goal
+    def counted_is_goal(state):
+        nonlocal explored
+        explored += 1
+        return is_goal(state)
+    problem.is_goal = counted_is_goal
+    # The consistency check wraps "ParkingProblem.get_successor" like the autograder does (on the class, not on a patched problem)
+    # and the number of checked edges is counted so a check that is never called is visible in the table
+    checked = None
+    original_get_successor = ParkingProblem.get_successor
+    if check:
+        checked = 0
+        checked_get_successor = test_heuristic_consistency(heuristic)(original_get_successor)
+        def get_successor(self, state, action):
+            nonlocal checked
+            checked += 1
+            return checked_get_successor(self, state, action)
+        ParkingProblem.get_successor = get_successor
+    try:
+        solution, elapsed = measure_time(search.AStarSearch, problem, problem.get_initial_state(), heuristic)
+        consistent = "yes" if check else "-"
+    except InconsistentHeuristicException:
+        solution, elapsed, consistent = None, float('nan'), "NO"
+    finally:
+        ParkingProblem.get_successor = original_get_successor
+        problem.is_goal = is_goal
+    return solution, explored, elapsed, None if solution is None else path_cost(problem, solution), consistent, checked
+
+def main(args: argparse.Namespace):
+    rows = []
+    for level in args.levels:
+        expected = None
+        for name, heuristic in HEURISTICS.items():
+            solution, explored, elapsed, cost, consistent, checked = run(level, heuristic, args.check)
+            if name == "zero": expected = cost
+            row = [level, name, cost, "OK" if cost == expected else "MISMATCH", explored, f"{elapsed:.4f}"]
+            if args.check: row += [consistent, checked]
+            rows.append(row)
+    headers = ["Level", "Heuristic", "Path Cost", "Optimal", "Explored", "Time (s)"]
+    if args.check: headers += ["Consistent", "Checked Edges"]
+    print_table(headers, rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the explored nodes and the run time of A* with the parking heuristics")
+    parser.add_argument("levels", nargs="*", default=[f"parks/park{index}.txt" for index in range(1, 6)], help="the parking files to benchmark")
+    parser.add_argument("--check", action="store_true", help="check the consistency of the heuristics while searching")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Tuple
+from contextlib import contextmanager
+import argparse, glob
+
+import mathutils
+from mathutils import Direction, Point
+import dungeon, parking
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from benchmarks.common import measure_time, print_table
+from benchmarks.dungeon_states import enumerate_states, legacy_initial_state, legacy_successors
+
+# This benchmark compares the Point named tuple against the frozen dataclass that was used before
+# It measures the basic operations (creating, adding and hashing points) and the code of this lab that works on points:
+#   - loading the dungeons and the parking lots (which builds the layout tables from the points)
+#   - the point based dungeon successor function (the state representation used before the compact states)
+# To run the same code with the old points, the Point class is replaced in the modules of the lab while the old points are measured.
+
+# This is the Point class that was used before the named tuple
+@dataclass(frozen=True)
+class LegacyPoint:
+    __slots__ = ('x', 'y')
+    x: int
+    y: int
+
+    def __add__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x - other.x, self.y - other.y)
+
+    def __neg__(self) -> 'LegacyPoint':
+        return LegacyPoint(-self.x, -self.y)
+
+    def __str__(self) -> str:
+        return f'({self.x}, {self.y})'
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y))
+
+# Replace the Point class (and the direction vectors) in the modules of the lab while the block runs
+@contextmanager
+def use_point_class(point_class: type):
+    modules = [mathutils, dungeon, parking]
+    vectors = Direction._Vectors
+    try:
+        for module in modules: module.Point = point_class
+        Direction._Vectors = [point_class(x, y) for x, y in vectors]
+        yield
+    finally:
+        for module in modules: module.Point = Point
+        Direction._Vectors = vectors
+
+# The basic operations: create points, add a vector to them and look them up in a set
+def point_operations(point_class: type, size: int) -> int:
+    points = [point_class(x, y) for y in range(size) for x in range(size)]
+    vector = point_class(1, 0)
+    reached = set(points)
+    return sum(1 for point in points if point + vector in reached)
+
+def load_levels() -> int:
+    problems = [DungeonProblem.from_file(path) for path in sorted(glob.glob("dungeons/*.txt"))]
+    problems += [ParkingProblem.from_file(path) for path in sorted(glob.glob("parks/*.txt"))]
+    return len(problems)
+
+def point_successors(level: str, limit: int) -> int:
+    reached, _ = enumerate_states(legacy_initial_state(DungeonProblem.from_file(level)), legacy_successors, limit)
+    return len(reached)
+
+def main(args: argparse.Namespace):
+    workloads: List[Tuple[str, Callable[[type], object]]] = [
+        (f"Point operations ({args.size}x{args.size})", lambda point_class: point_operations(point_class, args.size)),
+        ("Load dungeons and parks", lambda _: load_levels()),
+        (f"Point successors ({args.level})", lambda _: point_successors(args.level, args.limit)),
+    ]
+    rows = []
+    for name, workload in workloads:
+        times = []
+        for point_class in (LegacyPoint, Point):
+            with use_point_class(point_class):
+                output, elapsed = min((measure_time(workload, point_class) for _ in range(args.repeat)), key=lambda result: result[1])
+            times.append(elapsed)
+        rows.append([name, output, f"{times[0]:.4f}", f"{times[1]:.4f}", f"{times[0] / times[1]:.2f}x"])
+    print_table(["Workload", "Output", "Dataclass (s)", "Named Tuple (s)", "Speedup"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Point named tuple against the frozen dataclass")
+    parser.add_argument("--size", "-s", type=int, default=300, help="the point operations are done on a size x size grid")
+    parser.add_argument("--level", default="dungeons/dungeon4.txt", help="the dungeon used to enumerate the point based states")
+    parser.add_argument("--limit", "-l", type=int, default=100000, help="the maximum number of states to enumerate")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="the best time of this many runs is reported")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,71 @@
+import argparse, json, math, os, random, tempfile, time
+
+from graph import GraphRoutingProblem, graphrouting_heuristic
+from policy_table import PolicyTable
+from agents import InformedSearchAgent
+from benchmarks.common import format_bytes, measure_peak_memory, print_table
+from benchmarks.landmarks import generate_graph
+import search
+
+# This benchmark routes many start nodes to the same goal on a large generated graph
+# It compares running A* once for every start node with building one policy table from the goal then looking up the action of every start
+# It reports the build time and the memory of the table, the time of the lookups and checks that both methods give the same path costs
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        graph_path = os.path.join(directory, "graph.json")
+        with open(graph_path, 'w') as f:
+            json.dump(generate_graph(args.size, args.seed), f)
+        problem = GraphRoutingProblem.from_file(graph_path)
+    nodes = sorted(problem.adjacency, key=lambda node: node.name)
+    starts = [rng.choice(nodes) for _ in range(args.starts)]
+    print(f"Graph: {len(nodes)} nodes, goal: {problem.goal}, starts: {len(starts)}")
+
+    def path_cost(start, path) -> float:
+        if path is None: return math.inf
+        cost, state = 0, start
+        for action in path:
+            cost += problem.get_cost(state, action)
+            state = action
+        return cost
+
+    # A* from every start (every query needs its own problem since the start is part of the problem)
+    begin = time.perf_counter()
+    astar_costs = []
+    for start in starts:
+        query = GraphRoutingProblem(start, problem.goal, problem.adjacency, problem.reverse_adjacency)
+        astar_costs.append(path_cost(start, search.AStarSearch(query, start, graphrouting_heuristic)))
+    astar_time = time.perf_counter() - begin
+
+    # One policy table for all the starts
+    table = PolicyTable.build(problem)
+    _, peak = measure_peak_memory(PolicyTable.build, problem)
+    begin = time.perf_counter()
+    actions = [table.action(start) for start in starts]
+    lookup_time = time.perf_counter() - begin
+    table_costs = [path_cost(start, table.path(start)) for start in starts]
+    same = all(a == b or abs(a - b) <= 1e-6 * max(1, abs(a)) for a, b in zip(astar_costs, table_costs))
+
+    # An agent using the table as a precomputed policy walks from every start to the goal without searching
+    agent = InformedSearchAgent(search.AStarSearch, graphrouting_heuristic, policy=table.policy())
+    begin = time.perf_counter()
+    for start, action in zip(starts, actions):
+        assert agent.act(problem, start) == action or start == problem.goal or action is None
+    agent_time = time.perf_counter() - begin
+
+    print_table(["Method", "Time (s)", "Per Start (ms)", "Memory", "Same Costs"], [
+        ["AStarSearch per start", f"{astar_time:.4f}", f"{1000 * astar_time / len(starts):.4f}", "-", "-"],
+        ["PolicyTable build", f"{table.build_time:.4f}", "-", f"{format_bytes(table.memory_size())} (peak {format_bytes(peak)})", "OK" if same else "MISMATCH"],
+        ["PolicyTable lookups", f"{lookup_time:.6f}", f"{1000 * lookup_time / len(starts):.6f}", "-", "-"],
+        ["Agent with policy", f"{agent_time:.6f}", f"{1000 * agent_time / len(starts):.6f}", "-", "-"],
+    ])
+    print(f"Break-even: the table is faster once there are more than {math.ceil(table.build_time / (astar_time / len(starts)))} starts")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare A* per start node with a policy table built by one backward search from the goal")
+    parser.add_argument("--size", "-s", type=int, default=60, help="the generated graph is a size x size grid")
+    parser.add_argument("--starts", "-n", type=int, default=200, help="the number of random start nodes")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed")
+    args = parser.parse_args()
+    main(args)
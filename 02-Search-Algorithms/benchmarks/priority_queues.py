@@ -0,0 +1,70 @@
+from typing import List, Type
+import argparse
+
+from problem import Problem
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from dungeon_heuristic import strong_heuristic
+from priority_queue import IndexedPriorityQueue, LazyPriorityQueue
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark compares the heap operations done by the cost-based and informed searches
+# when the frontier is an IndexedPriorityQueue (decrease-key) and a LazyPriorityQueue
+# (a heapq list with stale entries, which is how the searches were implemented before).
+# The queue used by search.py is replaced (the same way the autograder patches the problem classes)
+# with a subclass that remembers its instances so that its counters can be read after the search.
+
+ALGORITHMS = ["UniformCostSearch", "AStarSearch", "BestFirstSearch"]
+
+LEVELS = [
+    *(f"parks/park{index}.txt" for index in range(1, 6)),
+    *(f"dungeons/dungeon{index}.txt" for index in range(1, 4)),
+]
+
+def load(level: str) -> Problem:
+    if level.startswith("parks"):
+        return ParkingProblem.from_file(level)
+    return DungeonProblem.from_file(level)
+
+def run(name: str, level: str, queue_type: Type):
+    class RecordingQueue(queue_type):
+        instances: List = []
+        def __init__(self) -> None:
+            super().__init__()
+            RecordingQueue.instances.append(self)
+    problem = load(level)
+    args = (problem, problem.get_initial_state())
+    if name != "UniformCostSearch": args += (strong_heuristic,)
+    original = search.IndexedPriorityQueue
+    search.IndexedPriorityQueue = RecordingQueue
+    try:
+        solution, elapsed = measure_time(getattr(search, name), *args)
+    finally:
+        search.IndexedPriorityQueue = original
+    counters = RecordingQueue.instances[-1].counters()
+    return solution, counters, elapsed
+
+def main(args: argparse.Namespace):
+    rows = []
+    for level in LEVELS:
+        for name in ALGORITHMS:
+            # The parking problem has no heuristic
+            if name != "UniformCostSearch" and level.startswith("parks"): continue
+            lazy_solution, lazy, lazy_elapsed = run(name, level, LazyPriorityQueue)
+            solution, indexed, elapsed = run(name, level, IndexedPriorityQueue)
+            rows.append([
+                level, name, "OK" if solution == lazy_solution else "MISMATCH",
+                lazy["pushes"], lazy["pops"], lazy["stale_pops"], f"{lazy_elapsed:.4f}",
+                indexed["pushes"], indexed["updates"], indexed["pops"], f"{elapsed:.4f}",
+            ])
+    print_table([
+        "Level", "Algorithm", "Solution",
+        "Lazy Pushes", "Lazy Pops", "Stale Pops", "Lazy (s)",
+        "Indexed Pushes", "Decrease-Keys", "Indexed Pops", "Indexed (s)",
+    ], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the heap operations of the indexed and the lazy priority queues")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,130 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse, csv
+
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from graph import GraphRoutingProblem, graphrouting_heuristic
+from dungeon_heuristic import bounding_box_heuristic, strong_heuristic, weak_heuristic
+from parking_heuristic import distance_heuristic, pattern_database_heuristic
+from level_generators import generate_dungeon, generate_graph, generate_parking
+from search_metrics import SearchMetrics
+from benchmarks.common import format_bytes, measure_peak_memory, measure_time, print_table
+import search
+
+# This benchmark runs every algorithm/heuristic pair on generated levels of growing sizes and writes the results to a CSV file
+# (one row per run) so the results of different versions of the code can be compared to track regressions and improvements.
+# Every run records the time, the peak memory (measured with tracemalloc in a separate run), the expansions and the solution cost.
+# Once a pair takes longer than the time limit on a level, it is skipped on the larger levels of the same suite
+# (a single run is not interrupted, so the time limit should be small compared to the time you are willing to wait).
+# Examples:
+#   python -m benchmarks.scaling
+#   python -m benchmarks.scaling --suite graph --sizes 1000 10000 100000 --seeds 3 --csv graphs.csv
+
+# An algorithm with the name of its heuristic and the heuristic (both are None for the uninformed searches)
+Pair = Tuple[str, Optional[str], Optional[Callable]]
+
+def _dungeon_factory(size: int, seed: int) -> Callable[[], DungeonProblem]:
+    text = generate_dungeon(size, coins=4, wall_density=0.2, seed=seed)
+    return lambda: DungeonProblem.from_text(text)
+
+def _parking_factory(size: int, seed: int) -> Callable[[], ParkingProblem]:
+    text = generate_parking(size, cars=3, wall_density=0.1, seed=seed)
+    return lambda: ParkingProblem.from_text(text)
+
+def _graph_factory(size: int, seed: int) -> Callable[[], GraphRoutingProblem]:
+    definition = generate_graph(size, degree=6, seed=seed)
+    return lambda: GraphRoutingProblem.from_definition(definition)
+
+# A suite contains the default sizes, a function that creates a problem from (size, seed)
+# and the list of (algorithm, heuristic name, heuristic) to run on every level
+SUITES: Dict[str, Tuple[List[int], Callable[[int, int], Callable], List[Pair]]] = {
+    "dungeon": ([16, 32, 64, 128], _dungeon_factory, [
+        ("BreadthFirstSearch", None, None),
+        ("DepthFirstSearch", None, None),
+        ("UniformCostSearch", None, None),
+        ("AStarSearch", "weak", weak_heuristic),
+        ("AStarSearch", "bounding_box", bounding_box_heuristic),
+        ("AStarSearch", "strong", strong_heuristic),
+        ("BestFirstSearch", "weak", weak_heuristic),
+        ("BestFirstSearch", "strong", strong_heuristic),
+    ]),
+    "parking": ([5, 6, 7, 8], _parking_factory, [
+        ("BreadthFirstSearch", None, None),
+        ("UniformCostSearch", None, None),
+        ("AStarSearch", "distance", distance_heuristic),
+        ("AStarSearch", "pattern_database", pattern_database_heuristic),
+        ("BestFirstSearch", "distance", distance_heuristic),
+    ]),
+    "graph": ([1000, 10000, 100000], _graph_factory, [
+        ("BreadthFirstSearch", None, None),
+        ("DepthFirstSearch", None, None),
+        ("UniformCostSearch", None, None),
+        ("AStarSearch", "euclidean", graphrouting_heuristic),
+        ("BestFirstSearch", "euclidean", graphrouting_heuristic),
+        ("BidirectionalUniformCostSearch", None, None),
+        ("BidirectionalAStarSearch", "euclidean", graphrouting_heuristic),
+    ]),
+}
+
+FIELDS = ["suite", "size", "seed", "algorithm", "heuristic", "status", "time", "peak_memory",
+          "expanded", "goal_tests", "generated", "peak_frontier", "solution_length", "solution_cost"]
+
+# Run a search on the problem and return its output
+def run(problem, algorithm: str, heuristic: Optional[Callable], metrics: Optional[SearchMetrics] = None):
+    arguments = (problem, problem.get_initial_state()) + (() if heuristic is None else (heuristic,))
+    return getattr(search, algorithm)(*arguments, metrics=metrics)
+
+def main(args: argparse.Namespace):
+    records = []
+    for suite in args.suite:
+        default_sizes, make_factory, pairs = SUITES[suite]
+        skipped = set()
+        for size in args.sizes or default_sizes:
+            for seed in range(args.seeds):
+                factory = make_factory(size, seed)
+                for algorithm, heuristic_name, heuristic in pairs:
+                    record = {"suite": suite, "size": size, "seed": seed, "algorithm": algorithm, "heuristic": heuristic_name}
+                    records.append(record)
+                    if (algorithm, heuristic_name) in skipped:
+                        record["status"] = "skipped"
+                        continue
+                    # every run gets a new problem (created before the measurement) so the caches of the previous runs are not reused
+                    _, elapsed = measure_time(run, factory(), algorithm, heuristic)
+                    metrics = SearchMetrics()
+                    run(factory(), algorithm, heuristic, metrics)
+                    record.update(
+                        status="solved" if metrics.solution_length is not None else "no solution", time=elapsed,
+                        expanded=metrics.expanded, goal_tests=metrics.goal_tests, generated=metrics.generated,
+                        peak_frontier=metrics.peak_frontier, solution_length=metrics.solution_length, solution_cost=metrics.solution_cost,
+                    )
+                    if args.memory:
+                        record["peak_memory"] = measure_peak_memory(run, factory(), algorithm, heuristic)[1]
+                    if elapsed > args.time_limit:
+                        skipped.add((algorithm, heuristic_name))
+                    print(f"{suite} size={size} seed={seed} {algorithm}({heuristic_name or ''}): {elapsed:.4f}s, {metrics.expanded} expanded", flush=True)
+
+    print_table(["Suite", "Size", "Seed", "Algorithm", "Heuristic", "Status", "Time (s)", "Peak Memory", "Expanded", "Cost"], [
+        [
+            record["suite"], record["size"], record["seed"], record["algorithm"], record["heuristic"] or "-", record["status"],
+            f"{record['time']:.4f}" if "time" in record else "-",
+            format_bytes(record["peak_memory"]) if "peak_memory" in record else "-",
+            record.get("expanded", "-"), "-" if record.get("solution_cost") is None else round(record["solution_cost"], 2),
+        ] for record in records
+    ])
+    with open(args.csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    print(f"Wrote {len(records)} runs to {args.csv}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how the searches scale on generated dungeons, parking lots and graphs")
+    parser.add_argument("--suite", action="append", choices=list(SUITES), help="the suite to run (can be repeated, all the suites by default)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="the level sizes (the defaults of every suite are used by default)")
+    parser.add_argument("--seeds", type=int, default=1, help="the number of levels (with the seeds 0, 1, ...) of every size")
+    parser.add_argument("--time-limit", "-t", type=float, default=10.0, help="skip a pair on the larger levels once it takes longer than this (in seconds)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="do not measure the peak memory (which needs an extra run)")
+    parser.add_argument("--csv", default="scaling.csv", help="the CSV file to write the results to")
+    args = parser.parse_args()
+    args.suite = args.suite or list(SUITES)
+    main(args)
@@ -0,0 +1,45 @@
+import argparse
+
+from dungeon import DungeonProblem
+from dungeon_heuristic import strong_heuristic, weak_heuristic
+from search_events import run_with_budget
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark measures the cost of the search events on a dungeon
+# For every algorithm, it compares the run time of the search function (which creates no events)
+# with the run time of its event variant driven by "run_with_budget" (which creates an event for every expansion)
+# It also runs the event variant with a node budget to show the status and the partial path returned when the search is stopped
+
+ALGORITHMS = [
+    ("BreadthFirstSearch", None),
+    ("UniformCostSearch", None),
+    ("AStarSearch", weak_heuristic),
+    ("AStarSearch", strong_heuristic),
+    ("BestFirstSearch", weak_heuristic),
+]
+
+def main(args: argparse.Namespace):
+    rows = []
+    for name, heuristic in ALGORITHMS:
+        def arguments():
+            problem = DungeonProblem.from_file(args.level)
+            return (problem, problem.get_initial_state()) + ((heuristic,) if heuristic else ())
+        plain, plain_time = measure_time(getattr(search, name), *arguments())
+        outcome, events_time = measure_time(run_with_budget, getattr(search, name + "Events")(*arguments()))
+        budgeted = run_with_budget(getattr(search, name + "Events")(*arguments()), node_limit=args.budget)
+        rows.append([
+            name + ("" if heuristic is None else f"({heuristic.__name__})"),
+            "OK" if outcome.solution == plain else "MISMATCH", outcome.expanded,
+            f"{plain_time:.4f}", f"{events_time:.4f}", f"{events_time / plain_time:.2f}x",
+            budgeted.status, None if budgeted.partial is None else len(budgeted.partial)
+        ])
+    print_table(["Algorithm", "Same Solution", "Expanded", "Time (s)", "Time With Events (s)", "Overhead",
+                 f"Status ({args.budget} nodes)", "Partial Path Length"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the overhead of the search events and the budget driver")
+    parser.add_argument("level", nargs="?", default="dungeons/dungeon3.txt", help="the dungeon file to search")
+    parser.add_argument("--budget", "-b", type=int, default=1000, help="the node budget of the budgeted runs")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,64 @@
+from typing import Callable, List, Tuple
+import argparse, os
+
+from problem import Problem
+from dungeon import DungeonProblem
+from parking import ParkingProblem
+from dungeon_heuristic import strong_heuristic
+from benchmarks.common import format_bytes, load_module, measure_peak_memory, measure_time, print_table
+import search
+
+# This benchmark compares the peak memory and the run time of the search algorithms
+# against a baseline implementation of search.py (by default, the one in the "solution" folder)
+# Every search is run twice: once under tracemalloc to get the peak memory and once without it to get the time
+
+# The (algorithm, uses heuristic) pairs to benchmark
+ALGORITHMS: List[Tuple[str, bool]] = [
+    ("BreadthFirstSearch", False),
+    ("DepthFirstSearch", False),
+    ("UniformCostSearch", False),
+    ("AStarSearch", True),
+    ("BestFirstSearch", True),
+]
+
+# The levels to benchmark with the list of algorithms to skip on each level (since they take too long to finish)
+LEVELS: List[Tuple[str, Callable[[str], Problem], List[str]]] = [
+    *((f"parks/park{index}.txt", ParkingProblem.from_file, []) for index in range(1, 6)),
+    *((f"dungeons/dungeon{index}.txt", DungeonProblem.from_file, []) for index in range(1, 4)),
+    ("dungeons/dungeon4.txt", DungeonProblem.from_file, ["BreadthFirstSearch", "UniformCostSearch", "AStarSearch"]),
+]
+
+def run(module, name: str, uses_heuristic: bool, problem: Problem):
+    search_fn = getattr(module, name)
+    args = (problem, problem.get_initial_state())
+    if uses_heuristic: args += (strong_heuristic,)
+    solution, peak = measure_peak_memory(search_fn, *args)
+    _, elapsed = measure_time(search_fn, *args)
+    return solution, peak, elapsed
+
+def main(args: argparse.Namespace):
+    baseline = load_module(os.path.join(args.baseline, "search.py"), "baseline_search")
+    rows = []
+    for level, loader, skipped in LEVELS:
+        for name, uses_heuristic in ALGORITHMS:
+            if name in skipped or (args.algorithm and name != args.algorithm): continue
+            # The parking problem has no heuristic
+            if uses_heuristic and loader is not DungeonProblem.from_file: continue
+            problem = loader(level)
+            expected, before_peak, before_time = run(baseline, name, uses_heuristic, problem)
+            problem = loader(level)
+            solution, after_peak, after_time = run(search, name, uses_heuristic, problem)
+            rows.append([
+                level, name,
+                "OK" if solution == expected else "MISMATCH",
+                format_bytes(before_peak), format_bytes(after_peak), f"{before_peak/max(after_peak, 1):.2f}x",
+                f"{before_time:.4f}", f"{after_time:.4f}"
+            ])
+    print_table(["Level", "Algorithm", "Solution", "Peak Before", "Peak After", "Reduction", "Time Before (s)", "Time After (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the peak memory of the search algorithms against a baseline")
+    parser.add_argument("--baseline", "-b", default="solution", help="the folder containing the baseline search.py")
+    parser.add_argument("--algorithm", "-a", default="", help="only benchmark the given algorithm")
+    args = parser.parse_args()
+    main(args)
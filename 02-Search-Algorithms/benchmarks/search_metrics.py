@@ -0,0 +1,90 @@
+import argparse, json, random
+
+from dungeon import DungeonProblem
+from dungeon_heuristic import strong_heuristic
+from graph import GraphNode, GraphRoutingProblem, graphrouting_heuristic, reverse_adjacency
+from mathutils import Point
+from search_metrics import SearchMetrics
+from benchmarks.common import measure_time, print_table
+import search
+
+# This benchmark runs the search algorithms on a dungeon with a SearchMetrics object and prints the collected metrics
+# It also measures the run time of every search without metrics and with metrics to show the overhead of collecting them
+# With --json, the metrics of all the searches are written to a JSON file
+# It also checks that the bidirectional searches report no re-opened states on random trees
+# (every state of a tree has a single path from the root, so a correct count of the search work never re-opens a state)
+
+# The (algorithm, uses heuristic) pairs to run
+ALGORITHMS = [
+    ("BreadthFirstSearch", False),
+    ("DepthFirstSearch", False),
+    ("UniformCostSearch", False),
+    ("AStarSearch", True),
+    ("BestFirstSearch", True),
+    ("IterativeDeepeningAStarSearch", True),
+    ("SimplifiedMemoryBoundedAStarSearch", True),
+]
+
+# The (algorithm, uses heuristic) pairs of the bidirectional searches to check on trees
+BIDIRECTIONAL = [
+    ("BidirectionalBreadthFirstSearch", False),
+    ("BidirectionalUniformCostSearch", False),
+    ("BidirectionalAStarSearch", True),
+]
+
+# Create a random tree with the given number of nodes (every edge goes both ways) and a route between two random nodes
+def tree_problem(size: int, rng: random.Random) -> GraphRoutingProblem:
+    nodes = [GraphNode(str(index), Point(rng.randint(0, 1000), rng.randint(0, 1000))) for index in range(size)]
+    adjacency = {node: [] for node in nodes}
+    for index in range(1, size):
+        parent = nodes[rng.randrange(index)]
+        adjacency[parent].append(nodes[index])
+        adjacency[nodes[index]].append(parent)
+    start, goal = rng.sample(nodes, 2)
+    return GraphRoutingProblem(start, goal, adjacency, reverse_adjacency(adjacency))
+
+# Run the bidirectional searches on random trees and check that none of them reports a re-opened state
+def check_bidirectional_trees(count: int, size: int, seed: int):
+    rng = random.Random(seed)
+    problems = [tree_problem(size, rng) for _ in range(count)]
+    for name, uses_heuristic in BIDIRECTIONAL:
+        for problem in problems:
+            metrics = SearchMetrics()
+            arguments = (problem, problem.get_initial_state()) + ((graphrouting_heuristic,) if uses_heuristic else ())
+            getattr(search, name)(*arguments, metrics=metrics)
+            assert metrics.reopened == 0, f"{name} reported {metrics.reopened} re-opened states on a tree"
+    print(f"The bidirectional searches reported no re-opened states on {count} random trees of {size} nodes\n")
+
+def main(args: argparse.Namespace):
+    check_bidirectional_trees(args.trees, args.tree_size, args.seed)
+    rows, exported = [], []
+    for name, uses_heuristic in ALGORITHMS:
+        search_fn = getattr(search, name)
+        problem = DungeonProblem.from_file(args.level)
+        arguments = (problem, problem.get_initial_state()) + ((strong_heuristic,) if uses_heuristic else ())
+        _, plain_time = measure_time(search_fn, *arguments)
+        metrics = SearchMetrics()
+        _, measured_time = measure_time(search_fn, *arguments, metrics=metrics)
+        exported.append(metrics.to_dict())
+        rows.append([
+            name, metrics.goal_tests, metrics.expanded, metrics.reopened, metrics.generated,
+            metrics.heuristic_evaluations, metrics.peak_frontier, sum(metrics.heap_operations.values()),
+            metrics.solution_cost, f"{plain_time:.4f}", f"{measured_time:.4f}"
+        ])
+    print_table([
+        "Algorithm", "Goal Tests", "Expanded", "Reopened", "Generated", "Heuristic Calls",
+        "Peak Frontier", "Heap Ops", "Cost", "Time (s)", "Time With Metrics (s)"
+    ], rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"level": args.level, "searches": exported}, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect the search metrics of the search algorithms on a dungeon")
+    parser.add_argument("level", nargs="?", default="dungeons/dungeon3.txt", help="the dungeon file to search")
+    parser.add_argument("--json", "-j", default=None, help="write the metrics to this JSON file")
+    parser.add_argument("--trees", type=int, default=40, help="the number of random trees used to check the bidirectional searches")
+    parser.add_argument("--tree-size", type=int, default=300, help="the number of nodes in every random tree")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args)
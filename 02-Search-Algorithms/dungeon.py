@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import FrozenSet, Iterable
+from typing import Dict, FrozenSet, Iterable, Tuple
 from enum import Enum
+import hashlib
 
 from mathutils import Direction, Point
 from problem import Problem
@@ -24,36 +25,103 @@ class DungeonTile(str, Enum):
 # we only need the default equality which compares objects by pointers.
 # The layout contains the problem details that are unchangeable across states such as:
 #   The walkable area (locations without walls) and the exit location
+# It also contains the tables used by the compact state representation:
+#   Every location has a cell index (y * width + x) and every coin has a bit index in the coin mask
 @dataclass(eq=False, frozen=True)
 class DungeonLayout:
-    __slots__ = ("width", "height", "walkable", "exit")
+    __slots__ = ("width", "height", "walkable", "exit", "coins", "points", "moves", "actions", "coin_masks", "coin_sets")
     width: int
     height: int
     walkable: FrozenSet[Point]
     exit: Point
+    coins: Tuple[Point, ...]                    # coins[i] is the location of the coin stored in bit 'i' of the coin mask
+    points: Tuple[Point, ...]                   # points[cell] is the location of the cell
+    moves: Tuple[Tuple[int, ...], ...]          # moves[cell][direction] is the cell reached by moving in the direction (-1 if it is a wall)
+    actions: Tuple[Tuple[Direction, ...], ...]  # actions[cell] is the list of directions that do not lead into a wall
+    coin_masks: Tuple[int, ...]                 # coin_masks[cell] is the bit of the coin at the cell (0 if there is no coin)
+    coin_sets: Dict[int, FrozenSet[Point]]      # a cache that maps coin masks to sets of coin locations
+
+    # Build the layout and its tables from the walkable area, the exit and the coin locations
+    @staticmethod
+    def create(width: int, height: int, walkable: FrozenSet[Point], exit: Point, coins: Iterable[Point]) -> 'DungeonLayout':
+        coins = tuple(sorted(coins, key=lambda point: (point.y, point.x)))
+        points = tuple(Point(x, y) for y in range(height) for x in range(width))
+        def cell_of(point: Point) -> int:
+            return point.y * width + point.x if point in walkable else -1
+        moves = tuple(
+            tuple(cell_of(point + direction.to_vector()) if point in walkable else -1 for direction in Direction)
+            for point in points
+        )
+        actions = tuple(tuple(direction for direction in Direction if cell_moves[direction] >= 0) for cell_moves in moves)
+        coin_masks = [0] * len(points)
+        for index, coin in enumerate(coins):
+            coin_masks[cell_of(coin)] = 1 << index
+        return DungeonLayout(width, height, walkable, exit, coins, points, moves, actions, tuple(coin_masks), {})
+
+    # A frozen dataclass with slots cannot be restored by pickle (it restores the slots with setattr)
+    # so the layout is pickled as a call to the constructor with its fields
+    def __reduce__(self):
+        return DungeonLayout, tuple(getattr(self, name) for name in self.__slots__)
+
+    # Returns the cell index of a location
+    def cell(self, point: Point) -> int:
+        return point.y * self.width + point.x
+
+    # Returns the coin mask that contains the given coin locations
+    def coin_mask(self, coins: Iterable[Point]) -> int:
+        mask = 0
+        for coin in coins:
+            mask |= self.coin_masks[self.cell(coin)]
+        return mask
 
 # For the dungeon state, we use dataclass with frozen=True to automatically implement:
 #   the constructor, the == operator, the hash function and to make the class immutable
 # Now it can be added to sets and used as keys in dictionaries
 # This will contain a reference to the dungeon layout and it will contain environment details that change across states such as:
-#   The player location and the locations of the remaining coins 
+#   The player location (stored as a cell index) and the remaining coins (stored as an integer where bit 'i' is set if coin 'i' remains)
+# Since both are integers, hashing the state and generating a successor take constant time regardless of the number of coins
+# The player location and the remaining coins can still be read as a Point and a frozenset of Points using the properties below
 @dataclass(frozen=True)
 class DungeonState:
-    __slots__ = ("layout", "player", "remaining_coins")
+    __slots__ = ("layout", "cell", "coins")
     layout: DungeonLayout
-    player: Point
-    remaining_coins: FrozenSet[Point]
+    cell: int
+    coins: int
+
+    # Create a state from the player location and the set of the remaining coin locations
+    @staticmethod
+    def create(layout: DungeonLayout, player: Point, remaining_coins: Iterable[Point]) -> 'DungeonState':
+        return DungeonState(layout, layout.cell(player), layout.coin_mask(remaining_coins))
+
+    # The state is pickled as a call to the constructor (see DungeonLayout.__reduce__)
+    def __reduce__(self):
+        return DungeonState, (self.layout, self.cell, self.coins)
+
+    # The player location
+    @property
+    def player(self) -> Point:
+        return self.layout.points[self.cell]
+
+    # The set of the remaining coin locations (the sets are cached in the layout so they are only built once for every coin mask)
+    @property
+    def remaining_coins(self) -> FrozenSet[Point]:
+        coin_sets = self.layout.coin_sets
+        coins = coin_sets.get(self.coins)
+        if coins is None:
+            coins = coin_sets[self.coins] = frozenset(coin for index, coin in enumerate(self.layout.coins) if self.coins >> index & 1)
+        return coins
 
     # This operator will convert the state to a string containing the grid representation of the level at the current state
     def __str__(self) -> str:
+        player, remaining_coins = self.player, self.remaining_coins
         def position_to_str(position):
             if position not in self.layout.walkable:
                 return DungeonTile.WALL
-            if position == self.player:
+            if position == player:
                 return DungeonTile.PLAYER
             if position == self.layout.exit:
                 return DungeonTile.EXIT
-            if position in self.remaining_coins:
+            if position in remaining_coins:
                 return DungeonTile.COIN
             return DungeonTile.EMPTY
         return '\n'.join(''.join(position_to_str(Point(x, y)) for x in range(self.layout.width)) for y in range(self.layout.height))
@@ -78,27 +146,20 @@ class DungeonProblem(Problem[DungeonState, Direction]):
     # We use @track_call_count to track the number of times this function was called to count the number of explored nodes
     @track_call_count
     def is_goal(self, state: DungeonState) -> bool:
-        return len(state.remaining_coins) == 0 and state.player == self.layout.exit
+        return state.coins == 0 and state.player == self.layout.exit
 
     def get_actions(self, state: DungeonState) -> Iterable[Direction]:
-        actions = []
-        for direction in Direction:
-            position = state.player + direction.to_vector()
-            # Disallow walking into walls
-            if position not in self.layout.walkable: continue
-            actions.append(direction)
-        return actions
+        # The directions that do not lead into walls are precomputed for every cell
+        return list(state.layout.actions[state.cell])
 
     def get_successor(self, state: DungeonState, action: Direction) -> DungeonState:
-        player = state.player + action.to_vector()
-        remaining_coins = state.remaining_coins
-        if player not in self.layout.walkable:
+        layout = state.layout
+        cell = layout.moves[state.cell][action]
+        if cell < 0:
             # If we try to walk into a wall, the state does not change
             return state
-        if player in remaining_coins:
-            # If we walk over a coin, we take it
-            remaining_coins -= {player}
-        return DungeonState(state.layout, player, remaining_coins)
+        # If we walk over a coin, we take it (clearing its bit does nothing if the cell has no coin or the coin was already taken)
+        return DungeonState(layout, cell, state.coins & ~layout.coin_masks[cell])
 
     def get_cost(self, state: DungeonState, action: Direction) -> float:
         # All actions have the same cost
@@ -123,8 +184,9 @@ class DungeonProblem(Problem[DungeonState, Direction]):
                     elif char == DungeonTile.EXIT:
                         exit = Point(x, y)
         problem = DungeonProblem()
-        problem.layout = DungeonLayout(width, height, frozenset(walkable), exit)
-        problem.initial_state = DungeonState(problem.layout, player, frozenset(coins))
+        problem.layout = DungeonLayout.create(width, height, frozenset(walkable), exit, coins)
+        problem.initial_state = DungeonState.create(problem.layout, player, coins)
+        problem.level_hash = hashlib.sha1("\n".join(lines).encode()).hexdigest()
         return problem
 
     # Read a dungeon problem from file containing a grid of tiles
@@ -1,4 +1,4 @@
-from dungeon import DungeonProblem, DungeonState
+from dungeon import DungeonLayout, DungeonProblem, DungeonState
 from mathutils import Direction, Point, euclidean_distance, manhattan_distance
 from helpers import utils
 
@@ -8,16 +8,100 @@ def weak_heuristic(problem: DungeonProblem, state: DungeonState):
     return euclidean_distance(state.player, problem.layout.exit)
 
 #TODO: Import any modules and write any functions you want to use
+from collections import deque
+from typing import List, Tuple
+
+# Run a breadth first search from the source over the walkable area and return the maze distance to every cell
+# Since all the actions cost 1, the BFS depth is the length of the shortest path
+# The distances are stored in a list indexed by the cell index and the unreachable cells have an infinite distance
+def maze_distances(layout: DungeonLayout, source: Point) -> List[float]:
+    moves = layout.moves
+    distances = [float('inf')] * len(moves)
+    start = layout.cell(source)
+    distances[start] = 0
+    frontier = deque([start])
+    while frontier:
+        cell = frontier.popleft()
+        distance = distances[cell] + 1
+        for neighbor in moves[cell]:
+            if neighbor >= 0 and distances[neighbor] > distance:
+                distances[neighbor] = distance
+                frontier.append(neighbor)
+    return distances
+
+# Return the maze distances from the given location (a coin or the exit) to every cell
+# The distances are computed once per location and stored in the problem cache
+def distances_from(problem: DungeonProblem, source: Point) -> List[float]:
+    tables = problem.cache().setdefault("maze_distances", {})
+    distances = tables.get(source)
+    if distances is None:
+        distances = tables[source] = maze_distances(problem.layout, source)
+    return distances
+
+# Return a lower bound for the cost of visiting all the coins in the mask starting from any of them then going to the exit
+# It is the weight of the minimum spanning tree over the coins (using the maze distances) plus the distance from the closest coin to the exit
+# It also returns the distance tables of the coins which are used to find the distance from the player to the closest coin
+# The result only depends on the remaining coins so it is stored in the problem cache for every coin mask
+def coins_cost(problem: DungeonProblem, mask: int) -> Tuple[float, List[List[float]]]:
+    memo = problem.cache().setdefault("coins_cost", {})
+    result = memo.get(mask)
+    if result is not None:
+        return result
+    layout = problem.layout
+    coins = [coin for index, coin in enumerate(layout.coins) if mask >> index & 1]
+    tables = [distances_from(problem, coin) for coin in coins]
+    cells = [layout.cell(coin) for coin in coins]
+    exit_distances = distances_from(problem, layout.exit)
+    # Prim's algorithm: every coin not in the tree keeps its distance to the closest coin in the tree
+    tree_weight = 0
+    closest = {index: tables[0][cells[index]] for index in range(1, len(coins))}
+    while closest:
+        index = min(closest, key=closest.get)
+        tree_weight += closest.pop(index)
+        distances = tables[index]
+        for other in closest:
+            closest[other] = min(closest[other], distances[cells[other]])
+    cost = tree_weight + min(exit_distances[cell] for cell in cells)
+    result = memo[mask] = (cost, tables)
+    return result
 
 def strong_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
-    #TODO: ADD YOUR CODE HERE
     #IMPORTANT: DO NOT USE "problem.is_goal" HERE.
     # Calling it here will mess up the tracking of the explored nodes count
     # which is considered the number of is_goal calls during the search
     #NOTE: you can use problem.cache() to get a dictionary in which you can store information that will persist between calls of this function
     # This could be useful if you want to store the results heavy computations that can be cached and used across multiple calls of this function
-    # utils.NotImplemented()
 
+    '''
+    The main idea is to use the actual maze distances (which take the walls into consideration) instead of the distances on an empty grid.
+    A BFS is done once from every coin and from the exit and the distances are stored in the problem cache.
+
+    To collect all the coins then reach the exit, the player must:
+        walk to the first coin it collects : this costs at least the maze distance to the closest coin
+        walk between the coins : the walk connects all the coins so it costs at least the weight of their minimum spanning tree
+        walk from the last coin to the exit : this costs at least the maze distance from the closest coin to the exit
+    so the sum is a lower bound of the actual cost (admissible).
+
+    It is also consistent since moving the player changes the distance to the closest coin by at most 1 (the action cost),
+    and collecting a coin can not increase the estimate by more than 1 since the coin can be connected to the remaining
+    spanning tree with the edge to its closest coin.
+
+    The spanning tree and the exit leg only depend on the remaining coins, so they are memoized for every coin mask.
+    '''
+
+    # if there are no coins, the player only needs to go to the exit
+    if state.coins == 0:
+        return distances_from(problem, problem.layout.exit)[state.cell]
+
+    # the distance from the player to the closest coin
+    cost, tables = coins_cost(problem, state.coins)
+    cell = state.cell
+    return min(distances[cell] for distances in tables) + cost
+
+# This was the strong heuristic before the maze distances were used
+# It only uses the distances between the player and the coins on each axis and ignores the walls
+# It is kept to compare the number of explored nodes against the maze distance heuristic
+def bounding_box_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
     '''
     The nain idea is to cal the biggest distance between the player move in each direction
     this is a lower bound of the actual cost
@@ -1,6 +1,6 @@
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 from dataclasses import dataclass
-import json
+import hashlib, json
 
 from problem import Problem
 from mathutils import Point, euclidean_distance
@@ -19,13 +19,27 @@ class GraphNode:
     def __str__(self) -> str:
         return self.name
 
+# Build the reverse adjacency of a graph where every node is mapped to the nodes that have an edge into it
+# The incoming nodes are sorted by name to match the order of the adjacency read from the file
+def reverse_adjacency(adjacency: Dict[GraphNode, List[GraphNode]]) -> Dict[GraphNode, List[GraphNode]]:
+    reverse: Dict[GraphNode, List[GraphNode]] = {node: [] for node in adjacency}
+    for node, adjacent in adjacency.items():
+        for next_node in adjacent:
+            reverse.setdefault(next_node, []).append(node)
+    for incoming in reverse.values():
+        incoming.sort(key=lambda node: node.name)
+    return reverse
+
 # This is the implementation of the graph routing problem
 class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
-    def __init__(self, start: GraphNode, goal: GraphNode, adjacency: Dict[GraphNode, List[GraphNode]]) -> None:
+    # The reverse adjacency is optional; if it is not given, it will be built the first time it is needed
+    def __init__(self, start: GraphNode, goal: GraphNode, adjacency: Dict[GraphNode, List[GraphNode]],
+                 reverse_adjacency: Optional[Dict[GraphNode, List[GraphNode]]] = None) -> None:
         super().__init__()
         self.start = start
         self.goal = goal
         self.adjacency = adjacency
+        self.reverse_adjacency = reverse_adjacency
     
     def get_initial_state(self) -> GraphNode:
         return self.start
@@ -46,11 +60,18 @@ class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
     # The cost of an action is the distance between the current node and the next node 
     def get_cost(self, state: GraphNode, action: GraphNode) -> float:
         return euclidean_distance(state.position, action.position)
+
+    # Returns the problem of going back from the goal to the given state along the reversed edges
+    # This is used by the bidirectional searches to search backward from the goal.
+    # Since the cost of an edge is the distance between its nodes, a reversed edge has the same cost as the original one.
+    def reverse(self, state: GraphNode) -> 'GraphRoutingProblem':
+        if self.reverse_adjacency is None:
+            self.reverse_adjacency = reverse_adjacency(self.adjacency)
+        return GraphRoutingProblem(self.goal, state, self.reverse_adjacency, self.adjacency)
     
-    # Read a graph routing problem from file
+    # Create a graph routing problem from its definition (the content of a graph file)
     @staticmethod
-    def from_file(path: str) -> 'GraphRoutingProblem':
-        problem_def: Dict[str, Dict] = json.load(open(path, 'r'))
+    def from_definition(problem_def: Dict[str, Any]) -> 'GraphRoutingProblem':
         graph_def: Dict[str, Dict] = problem_def.get("graph", {})
         node_dict = {name: GraphNode(name, Point(*item.get("position", [0,0]))) for name, item in graph_def.items()}
         adjacency: Dict[GraphNode, List[GraphNode]] = {}
@@ -60,7 +81,15 @@ class GraphRoutingProblem(Problem[GraphNode, GraphNode]):
             adjacency[node] = adjacent
         start = node_dict[problem_def.get("start", "")]
         goal = node_dict[problem_def.get("goal", "")]
-        return GraphRoutingProblem(start, goal, adjacency)
+        problem = GraphRoutingProblem(start, goal, adjacency, reverse_adjacency(adjacency))
+        problem.level_hash = hashlib.sha1(json.dumps(problem_def, sort_keys=True).encode()).hexdigest()
+        return problem
+
+    # Read a graph routing problem from file
+    @staticmethod
+    def from_file(path: str) -> 'GraphRoutingProblem':
+        with open(path, 'r') as f:
+            return GraphRoutingProblem.from_definition(json.load(f))
 
 def graphrouting_heuristic(problem: GraphRoutingProblem, state: GraphNode) -> float:
     return euclidean_distance(state.position, problem.goal.position)
\ No newline at end of file
@@ -0,0 +1,187 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dungeon import DungeonLayout, DungeonProblem, DungeonState
+from mathutils import Direction, Point
+from priority_queue import IndexedPriorityQueue
+from search_metrics import SearchMetrics
+
+# This file contains searches specialized for the 4-connected uniform-cost grid of the dungeons
+# They find the shortest path between two locations of a dungeon layout (e.g. the player leg to a coin or to the exit)
+# and work directly on the move table of the layout (the cell indices) instead of going through the Problem interface.
+# Both searches return the path as a list of Directions (or None if the goal cannot be reached), like the search functions in search.py
+# so the path can be applied with "DungeonProblem.get_successor" or given to the agents.
+#
+# GridAStarSearch is A* with the manhattan distance on the cells of the layout.
+# JumpPointSearch is a 4-connected variant of Jump Point Search (JPS):
+#   In an open area, there are many shortest paths between two cells which only differ by the order of their moves
+#   and A* expands every cell on all of them. JPS only follows one of these paths (the canonical path) where:
+#       a horizontal move can be followed by any move (except going back)
+#       a vertical move can only be followed by a horizontal move if it is forced: if the cell behind the turn (on the side of the turn) is a wall
+#       (otherwise the same path can be done by doing the horizontal move first)
+#   So instead of pushing every neighbor to the frontier, the search "jumps" in straight lines
+#   and only pushes the cells where the canonical path could turn (the jump points):
+#       a vertical jump stops at the goal or at a cell with a forced horizontal turn
+#       a horizontal jump stops at the goal or at a cell where a vertical jump (up or down) finds a jump point
+#   Every canonical path is still found, so the path is still optimal, but only the jump points are pushed and expanded.
+#   Since a vertical turn is allowed after every horizontal move, every horizontal jump scans the columns it crosses,
+#   so JPS saves the most in open areas and the least in mazes where most cells are already turning points.
+
+# The horizontal and the vertical directions
+_HORIZONTAL = (Direction.RIGHT, Direction.LEFT)
+_VERTICAL = (Direction.UP, Direction.DOWN)
+
+# Returns the manhattan distance between two cells of a layout with the given width
+def _cell_distance(width: int, first: int, second: int) -> int:
+    return abs(first % width - second % width) + abs(first // width - second // width)
+
+# Both searches order the frontier by f = g + h then by h, so among the nodes with the same f, the deepest ones are expanded first
+# (in an open area, all the cells inside the rectangle between the start and the goal have the same f, so this avoids expanding all of them)
+
+# Collect the final values of the metrics (the searches in this file do not use a Problem so the metrics are filled directly)
+def _finish_metrics(metrics: Optional[SearchMetrics], frontier: IndexedPriorityQueue, solution: Optional[List[Direction]]):
+    if metrics is None: return
+    metrics.peak_frontier = max(metrics.peak_frontier, len(frontier))
+    for name, value in frontier.counters().items():
+        metrics.heap_operations[name] = metrics.heap_operations.get(name, 0) + value
+    if solution is not None:
+        metrics.solution_length = metrics.solution_cost = len(solution)
+
+# Convert a list of cells, where every two consecutive cells are on the same row or column, to a list of directions
+def _cells_to_directions(width: int, cells: List[int]) -> List[Direction]:
+    directions = []
+    for current, target in zip(cells, cells[1:]):
+        dx, dy = target % width - current % width, target // width - current // width
+        if dx > 0: direction = Direction.RIGHT
+        elif dx < 0: direction = Direction.LEFT
+        elif dy < 0: direction = Direction.UP
+        else: direction = Direction.DOWN
+        directions += [direction] * (abs(dx) + abs(dy))
+    return directions
+
+# Find the shortest path from start to goal with A* on the cells of the layout (using the manhattan distance as the heuristic)
+# If metrics is given, the expanded nodes, the generated nodes and the frontier size are recorded in it
+def GridAStarSearch(layout: DungeonLayout, start: Point, goal: Point, metrics: Optional[SearchMetrics] = None) -> Optional[List[Direction]]:
+    moves, width = layout.moves, layout.width
+    if start not in layout.walkable or goal not in layout.walkable: return None
+    source, target = layout.cell(start), layout.cell(goal)
+    gx, gy = goal
+    costs: Dict[int, int] = {source: 0}
+    parents: Dict[int, Tuple[int, Direction]] = {}
+    explored = set()
+    frontier = IndexedPriorityQueue()
+    frontier.push(source, (_cell_distance(width, source, target), 0))
+    if metrics is not None: metrics.watch_frontier(frontier)
+    solution = None
+    while frontier:
+        cell, _, _ = frontier.pop()
+        if metrics is not None:
+            metrics.goal_tests += 1
+            metrics.expanded += 1
+            metrics.peak_frontier = max(metrics.peak_frontier, len(frontier))
+        if cell == target:
+            solution = []
+            while cell != source:
+                cell, direction = parents[cell]
+                solution.append(direction)
+            solution.reverse()
+            break
+        explored.add(cell)
+        cost = costs[cell] + 1
+        for direction, successor in enumerate(moves[cell]):
+            if successor < 0 or successor in explored: continue
+            if metrics is not None: metrics.generated += 1
+            if cost >= costs.get(successor, cost + 1): continue
+            costs[successor] = cost
+            parents[successor] = (cell, Direction(direction))
+            remaining = abs(successor % width - gx) + abs(successor // width - gy)
+            priority = (cost + remaining, remaining)
+            if successor in frontier:
+                frontier.update(successor, priority)
+            else:
+                frontier.push(successor, priority)
+    _finish_metrics(metrics, frontier, solution)
+    return solution
+
+# Find the shortest path from start to goal with Jump Point Search on the cells of the layout (see the top of the file)
+# If metrics is given, the expanded jump points, the generated jump points and the frontier size are recorded in it
+def JumpPointSearch(layout: DungeonLayout, start: Point, goal: Point, metrics: Optional[SearchMetrics] = None) -> Optional[List[Direction]]:
+    moves, width = layout.moves, layout.width
+    if start not in layout.walkable or goal not in layout.walkable: return None
+    source, target = layout.cell(start), layout.cell(goal)
+    RIGHT, LEFT = Direction.RIGHT, Direction.LEFT
+
+    # Jump vertically from the cell and return the first jump point (or -1 if a wall is reached first)
+    def jump_vertical(cell: int, direction: Direction) -> int:
+        while True:
+            successor = moves[cell][direction]
+            if successor < 0 or successor == target: return successor
+            # a horizontal turn is forced if the side cell is walkable but the cell behind it (next to the current cell) is a wall
+            behind, side = moves[cell], moves[successor]
+            if (side[RIGHT] >= 0 and behind[RIGHT] < 0) or (side[LEFT] >= 0 and behind[LEFT] < 0): return successor
+            cell = successor
+
+    # Jump horizontally from the cell and return the first jump point (or -1 if a wall is reached first)
+    def jump_horizontal(cell: int, direction: Direction) -> int:
+        while True:
+            successor = moves[cell][direction]
+            if successor < 0 or successor == target: return successor
+            if jump_vertical(successor, Direction.UP) >= 0 or jump_vertical(successor, Direction.DOWN) >= 0: return successor
+            cell = successor
+
+    # Returns the directions in which the search continues from a cell that was reached by moving in the given direction
+    # (the start cell is given the direction 4 so the search continues in every direction)
+    def directions_from(cell: int, direction: int) -> List[Direction]:
+        if direction == 4: return list(Direction)
+        if direction in _HORIZONTAL: return [Direction(direction), Direction.UP, Direction.DOWN]
+        behind, side = moves[moves[cell][(direction + 2) % 4]], moves[cell]
+        return [Direction(direction)] + [turn for turn in _HORIZONTAL if side[turn] >= 0 and behind[turn] < 0]
+
+    # Since the directions of the search depend on the direction in which the cell was reached,
+    # the nodes of the search are (cell, direction) pairs stored as the integer cell * 5 + direction (the start node is cell * 5 + 4)
+    root = source * 5 + 4
+    costs: Dict[int, int] = {root: 0}
+    parents: Dict[int, int] = {}
+    explored = set()
+    frontier = IndexedPriorityQueue()
+    frontier.push(root, (_cell_distance(width, source, target), 0))
+    if metrics is not None: metrics.watch_frontier(frontier)
+    solution = None
+    while frontier:
+        node, _, _ = frontier.pop()
+        cell, direction = divmod(node, 5)
+        if metrics is not None:
+            metrics.goal_tests += 1
+            metrics.expanded += 1
+            metrics.peak_frontier = max(metrics.peak_frontier, len(frontier))
+        if cell == target:
+            cells = [cell]
+            while node != root:
+                node = parents[node]
+                cells.append(node // 5)
+            cells.reverse()
+            solution = _cells_to_directions(width, cells)
+            break
+        explored.add(node)
+        for turn in directions_from(cell, direction):
+            successor_cell = (jump_vertical if turn in _VERTICAL else jump_horizontal)(cell, turn)
+            if successor_cell < 0: continue
+            successor = successor_cell * 5 + turn
+            if successor in explored: continue
+            if metrics is not None: metrics.generated += 1
+            cost = costs[node] + _cell_distance(width, cell, successor_cell)
+            if cost >= costs.get(successor, cost + 1): continue
+            costs[successor] = cost
+            parents[successor] = node
+            remaining = _cell_distance(width, successor_cell, target)
+            priority = (cost + remaining, remaining)
+            if successor in frontier:
+                frontier.update(successor, priority)
+            else:
+                frontier.push(successor, priority)
+    _finish_metrics(metrics, frontier, solution)
+    return solution
+
+# Find the path of the player from the given state to a location of the dungeon (e.g. a coin or the exit) with a grid search
+# The path ignores the coins (walking over a coin collects it but does not change the path)
+def find_leg(problem: DungeonProblem, state: DungeonState, goal: Point, search_fn: Callable = JumpPointSearch) -> Optional[List[Direction]]:
+    return search_fn(problem.layout, state.player, goal)
@@ -0,0 +1,191 @@
+from typing import Any, Callable, Dict, List, Optional
+import copy, heapq
+
+import numpy as np
+
+from problem import A, S, HeuristicFunction, Problem
+from .heuristic_checks import InconsistentHeuristicException
+
+# This file contains an offline verifier for the heuristics
+# "test_heuristic_consistency" only checks the transitions generated by one search (and calls the heuristic twice for every one of them).
+# Instead, the verifier enumerates the whole reachable state space of a problem once and stores it in arrays:
+#   the states (every state gets an index), the edges (source index, target index, cost) and the goal states
+# Then it computes the exact cost to the closest goal of every state with a backward Dijkstra search from all the goals.
+# To verify a heuristic, it is called once per state and all the checks are done on arrays:
+#   admissibility: h(s) <= cost to go(s) for every state (the states that cannot reach a goal are skipped)
+#   consistency: h(s) - h(s') <= cost(s, a) for every edge s -> s'
+#   goals: h(goal) == 0 for every goal state
+# The state space is stored in the problem cache, so verifying many heuristics on the same problem only enumerates it once.
+# This is meant for small-to-medium problems (the whole state space is kept in memory), for example:
+#   report = verify_heuristic(DungeonProblem.from_file("dungeons/dungeon2.txt"), strong_heuristic)
+#   print(report.summary())
+#   report.raise_for_violations()
+
+class InadmissibleHeuristicException(Exception):
+    pass
+
+# The reachable state space of a problem with the exact cost to go of every state
+class StateSpace:
+    def __init__(self, states: List[Any], sources: np.ndarray, targets: np.ndarray, costs: np.ndarray, actions: List[Any], goals: np.ndarray) -> None:
+        self.states = states            # states[i] is the state with the index i (the initial state has the index 0)
+        self.sources = sources          # the edge e goes from the state sources[e] to the state targets[e]
+        self.targets = targets
+        self.costs = costs              # costs[e] is the cost of the edge e
+        self.actions = actions          # actions[e] is the action of the edge e
+        self.goals = goals              # goals[i] is True if the state i is a goal
+        self.cost_to_go = self._backward_dijkstra()     # cost_to_go[i] is the cost of the cheapest path from the state i to a goal (inf if there is none)
+        self.heuristic_values: Dict[Callable, np.ndarray] = {}   # The values of the verified heuristics (computed once per heuristic)
+
+    # Enumerate all the states reachable from the initial state (with a breadth first search)
+    # Raises a ValueError if there are more than max_states states
+    @staticmethod
+    def explore(problem: Problem[S, A], initial_state: Optional[S] = None, max_states: int = 1_000_000) -> 'StateSpace':
+        initial_state = problem.get_initial_state() if initial_state is None else initial_state
+        states, index = [initial_state], {initial_state: 0}
+        sources, targets, costs, actions = [], [], [], []
+        # the goal test is called once per state, so the call counter of "is_goal" (used to count the explored nodes) is saved
+        # and restored after, even if the exploration fails. The counter is either a number (track_call_count) or a deque (record_calls)
+        is_goal = type(problem).is_goal
+        counted = hasattr(is_goal, "calls")
+        if counted: calls = copy.copy(is_goal.calls)
+        goals = []
+        current = 0
+        try:
+            while current < len(states):
+                state = states[current]
+                goals.append(problem.is_goal(state))
+                for action, successor, cost in problem.get_successors(state):
+                    target = index.get(successor)
+                    if target is None:
+                        if len(states) >= max_states:
+                            raise ValueError(f"The state space has more than {max_states} states")
+                        target = index[successor] = len(states)
+                        states.append(successor)
+                    sources.append(current)
+                    targets.append(target)
+                    costs.append(cost)
+                    actions.append(action)
+                current += 1
+        finally:
+            if counted: is_goal.calls = calls
+        return StateSpace(states, np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64),
+                          np.array(costs, dtype=np.float64), actions, np.array(goals, dtype=bool))
+
+    # Returns the state space of the problem, it is explored once and stored in the problem cache
+    @staticmethod
+    def of(problem: Problem[S, A], max_states: int = 1_000_000) -> 'StateSpace':
+        spaces = problem.cache().setdefault("state_spaces", {})
+        initial_state = problem.get_initial_state()
+        space = spaces.get(initial_state)
+        if space is None:
+            space = spaces[initial_state] = StateSpace.explore(problem, initial_state, max_states)
+        return space
+
+    # Compute the cost to the closest goal of every state with a Dijkstra search from all the goals along the reversed edges
+    # If all the edges have the same cost, a breadth first search is enough
+    def _backward_dijkstra(self) -> np.ndarray:
+        count = len(self.states)
+        # the reversed edges are grouped by their (original) target: incoming[start[i]:start[i+1]] are the edges that end at the state i
+        incoming = np.argsort(self.targets, kind="stable")
+        start = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.targets, minlength=count), out=start[1:])
+        sources, costs = self.sources[incoming].tolist(), self.costs[incoming].tolist()
+        start = start.tolist()
+        distances = [float('inf')] * count
+        goals = np.flatnonzero(self.goals).tolist()
+        for goal in goals: distances[goal] = 0.0
+        if len(costs) == 0 or min(costs) == max(costs):
+            cost = costs[0] if costs else 1.0
+            frontier = goals
+            while frontier:
+                next_frontier = []
+                for state in frontier:
+                    distance = distances[state] + cost
+                    for edge in range(start[state], start[state + 1]):
+                        source = sources[edge]
+                        if distances[source] > distance:
+                            distances[source] = distance
+                            next_frontier.append(source)
+                frontier = next_frontier
+        else:
+            frontier = [(0.0, goal) for goal in goals]
+            while frontier:
+                distance, state = heapq.heappop(frontier)
+                if distance > distances[state]: continue
+                for edge in range(start[state], start[state + 1]):
+                    source, next_distance = sources[edge], distance + costs[edge]
+                    if next_distance < distances[source]:
+                        distances[source] = next_distance
+                        heapq.heappush(frontier, (next_distance, source))
+        return np.array(distances, dtype=np.float64)
+
+    # Returns the values of the heuristic for all the states (the heuristic is called once per state and the values are cached)
+    def evaluate(self, problem: Problem[S, A], heuristic: HeuristicFunction) -> np.ndarray:
+        values = self.heuristic_values.get(heuristic)
+        if values is None:
+            values = self.heuristic_values[heuristic] = np.fromiter((heuristic(problem, state) for state in self.states), dtype=np.float64, count=len(self.states))
+        return values
+
+# The result of verifying a heuristic on a state space
+class HeuristicReport:
+    def __init__(self, space: StateSpace, values: np.ndarray, tolerance: float) -> None:
+        self.space = space
+        self.values = values
+        reachable = np.isfinite(space.cost_to_go)
+        # the indices of the states where the heuristic overestimates the cost to go
+        self.inadmissible = np.flatnonzero(reachable & (values > space.cost_to_go + tolerance))
+        # the indices of the edges where the heuristic decreases by more than the edge cost
+        # the edges that leave a state with an infinite heuristic (a state that is claimed to be a dead end) are skipped
+        # since an infinite heuristic on a state that can reach a goal is already reported as inadmissible
+        source_values = values[space.sources]
+        with np.errstate(invalid="ignore"):
+            decrease = source_values - values[space.targets]
+        self.inconsistent = np.flatnonzero(np.isfinite(source_values) & (decrease > space.costs + tolerance))
+        # the indices of the goal states where the heuristic is not zero
+        self.nonzero_goals = np.flatnonzero(space.goals & (np.abs(values) > tolerance))
+        # the average ratio between the heuristic and the cost to go (1 is a perfect heuristic) over the states that can reach a goal
+        informative = reachable & (space.cost_to_go > 0)
+        self.accuracy = float(np.mean(values[informative] / space.cost_to_go[informative])) if informative.any() else 1.0
+
+    @property
+    def admissible(self) -> bool:
+        return len(self.inadmissible) == 0 and len(self.nonzero_goals) == 0
+
+    @property
+    def consistent(self) -> bool:
+        return len(self.inconsistent) == 0
+
+    # Returns a one line summary of the verification
+    def summary(self) -> str:
+        space = self.space
+        return (f"{len(space.states)} states, {len(space.sources)} edges, {int(space.goals.sum())} goals: "
+                f"{len(self.inadmissible)} inadmissible states, {len(self.inconsistent)} inconsistent edges, "
+                f"{len(self.nonzero_goals)} goals with a nonzero heuristic, accuracy = {self.accuracy:.3f}")
+
+    # Raise an exception that describes the first violation (if any)
+    # The message of an inconsistent edge is the same as the one of "test_heuristic_consistency"
+    def raise_for_violations(self):
+        space, values = self.space, self.values
+        if len(self.nonzero_goals) > 0:
+            state = self.nonzero_goals[0]
+            raise InadmissibleHeuristicException(f"Goal State (heuristic = {values[state]}):\n{space.states[state]}\nThe heuristic of a goal state must be 0")
+        if len(self.inadmissible) > 0:
+            state = self.inadmissible[0]
+            message = f"State (heuristic = {values[state]}):" + "\n" + str(space.states[state]) + "\n"
+            message += f"The heuristic overestimates the cost to the closest goal: {values[state]} > {space.cost_to_go[state]}"
+            raise InadmissibleHeuristicException(message)
+        if len(self.inconsistent) > 0:
+            edge = self.inconsistent[0]
+            source, target, cost = space.sources[edge], space.targets[edge], space.costs[edge]
+            h, next_h = values[source], values[target]
+            message = f"State (heuristic = {h}):" + "\n" + str(space.states[source]) + "\n"
+            message += f"Action: {str(space.actions[edge])} (cost = {cost})" + "\n"
+            message += f"Next State (heuristic = {next_h}):" + "\n" + str(space.states[target]) + "\n"
+            message += "Decrease in heuristic exceeds the actions cost\n"
+            message += f"h(state) - h(next state) = {h} - {next_h} = {h - next_h} > {cost} (action cost)"
+            raise InconsistentHeuristicException(message)
+
+# Verify the admissibility and the consistency of a heuristic on every state and edge of the reachable state space of the problem
+def verify_heuristic(problem: Problem[S, A], heuristic: HeuristicFunction, max_states: int = 1_000_000, tolerance: float = 1e-9) -> HeuristicReport:
+    space = StateSpace.of(problem, max_states)
+    return HeuristicReport(space, space.evaluate(problem, heuristic), tolerance)
@@ -0,0 +1,74 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import functools
+
+from problem import HeuristicFunction, Problem, S
+
+# This file contains a cache for heuristic functions.
+# A cached heuristic stores the value of every state it evaluates, so a state that is generated many times
+# (e.g. reached from different parents) is only evaluated once. It can be used as a decorator:
+#   @cached_heuristic(max_size=2**16)
+#   def my_heuristic(problem, state): ...
+# or applied to an existing heuristic:
+#   heuristic = cached_heuristic()(strong_heuristic)
+# The values are stored per problem in "problem.cache()" (so the values of different problems are never mixed)
+# and they are keyed by the state (which uses the hash and the equality of the state).
+# If max_size is given, the cache only keeps the most recently used values and evicts the least recently used one when it is full.
+# The cache only calls the heuristic so it does not change the number of "is_goal" calls (the explored nodes count).
+
+class HeuristicCache:
+    def __init__(self, heuristic: HeuristicFunction, max_size: Optional[int] = None) -> None:
+        functools.update_wrapper(self, heuristic)
+        self.heuristic = heuristic
+        self.max_size = max_size
+        # the statistics of the cache over all the problems
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Returns the values stored for the given problem (an OrderedDict if the size is bounded since it keeps the usage order)
+    def values(self, problem: Problem) -> Dict[Any, float]:
+        cache = problem.cache()
+        values = cache.get(self)
+        if values is None:
+            values = cache[self] = OrderedDict() if self.max_size is not None else {}
+        return values
+
+    def __call__(self, problem: Problem, state: S) -> float:
+        values = self.values(problem)
+        value = values.get(state)
+        if value is not None:
+            self.hits += 1
+            if self.max_size is not None:
+                values.move_to_end(state)
+            return value
+        self.misses += 1
+        value = values[state] = self.heuristic(problem, state)
+        if self.max_size is not None and len(values) > self.max_size:
+            values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    # Removes the stored values of the given problem
+    def clear(self, problem: Problem):
+        problem.cache().pop(self, None)
+
+    # Returns the statistics of the cache
+    def stats(self) -> Dict[str, Any]:
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / calls if calls else 0.0,
+        }
+
+    # Resets the statistics of the cache (the stored values are kept)
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+# Returns a decorator that caches a heuristic function with an optional maximum number of stored values per problem
+def cached_heuristic(max_size: Optional[int] = None):
+    def decorator(heuristic: HeuristicFunction) -> HeuristicCache:
+        return HeuristicCache(heuristic, max_size)
+    return decorator
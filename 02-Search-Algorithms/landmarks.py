@@ -0,0 +1,255 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from array import array
+import argparse, hashlib, heapq, math, os, struct, time
+
+from graph import GraphNode, GraphRoutingProblem, reverse_adjacency
+from mathutils import euclidean_distance
+
+# This file contains the landmark (ALT: A*, Landmarks and the Triangle inequality) preprocessing for the graph routing problem.
+# A graph is usually loaded once then queried many times between different start and goal nodes.
+# The preprocessing picks a few landmark nodes and computes the shortest distance from every landmark to every node
+# and from every node to every landmark. Then, for any nodes v and t and any landmark L, the triangle inequality gives:
+#   d(v, t) >= d(v, L) - d(t, L)    and     d(v, t) >= d(L, t) - d(L, v)
+# The largest of these bounds (and the euclidean distance) is an admissible and consistent heuristic
+# which is usually much closer to the real distance than the euclidean distance alone, so A* explores much fewer nodes.
+# The tables are saved in a binary file next to the graph (e.g. "graph1.json" -> "graph1.landmarks"),
+# so the preprocessing is only done once for every graph (the file stores a hash of the graph so it is rebuilt if the graph changes).
+# The tables can be used:
+#   - as a heuristic for the search functions: "landmark_heuristic" (after calling "LandmarkTable.attach(problem)")
+#   - with the "LandmarkRouter" which answers many queries on the same graph using an A* over node indices.
+
+# The binary file starts with a header containing:
+#   the magic bytes, the number of nodes, the number of landmarks and the first 8 bytes of the sha1 of the graph file
+# followed by the landmark indices (int32) and the two tables (float64) where every table has a row per landmark.
+_MAGIC = b"ALT1"
+_HEADER = struct.Struct("<4sII8s")
+
+# The nodes of the graph are identified by their index in the list of nodes sorted by name
+def _node_list(adjacency: Dict[GraphNode, List[GraphNode]]) -> List[GraphNode]:
+    nodes = set(adjacency)
+    for adjacent in adjacency.values(): nodes.update(adjacent)
+    return sorted(nodes, key=lambda node: node.name)
+
+# Convert an adjacency to a list of (next node index, cost) for every node index
+def _edge_lists(adjacency: Dict[GraphNode, List[GraphNode]], index: Dict[GraphNode, int]) -> List[Tuple[Tuple[int, float], ...]]:
+    edges: List[Tuple[Tuple[int, float], ...]] = [()] * len(index)
+    for node, adjacent in adjacency.items():
+        edges[index[node]] = tuple((index[next_node], euclidean_distance(node.position, next_node.position)) for next_node in adjacent)
+    return edges
+
+# Compute the shortest distance from the source to every node (math.inf if the node can not be reached)
+def dijkstra(edges: Sequence[Sequence[Tuple[int, float]]], source: int) -> array:
+    distances = array('d', [math.inf]) * len(edges)
+    distances[source] = 0
+    heap = [(0.0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if distance > distances[node]: continue
+        for next_node, cost in edges[node]:
+            next_distance = distance + cost
+            if next_distance < distances[next_node]:
+                distances[next_node] = next_distance
+                heapq.heappush(heap, (next_distance, next_node))
+    return distances
+
+# Returns the hash of the graph file which is stored in the landmark file to detect outdated tables
+def graph_hash(graph_path: str) -> bytes:
+    with open(graph_path, 'rb') as f:
+        return hashlib.sha1(f.read()).digest()[:8]
+
+# Returns the path of the landmark file of a graph file
+def landmark_path(graph_path: str) -> str:
+    return os.path.splitext(graph_path)[0] + ".landmarks"
+
+class LandmarkTable:
+    def __init__(self, nodes: List[GraphNode], landmarks: List[int], from_landmarks: List[array], to_landmarks: List[array]) -> None:
+        self.nodes = nodes                                  # The nodes sorted by name
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.landmarks = landmarks                          # The indices of the landmark nodes
+        self.from_landmarks = from_landmarks                # from_landmarks[l][v] is the distance from landmark l to node v
+        self.to_landmarks = to_landmarks                    # to_landmarks[l][v] is the distance from node v to landmark l
+
+    # Pick "count" landmarks and compute their tables
+    # The landmarks are picked by the farthest point selection: every new landmark is the node which is the farthest from the picked ones
+    # (ignoring the direction of the edges). Nodes which can not be reached from the picked landmarks are picked first.
+    @staticmethod
+    def build(adjacency: Dict[GraphNode, List[GraphNode]], count: int = 8) -> 'LandmarkTable':
+        nodes = _node_list(adjacency)
+        index = {node: i for i, node in enumerate(nodes)}
+        forward = _edge_lists(adjacency, index)
+        backward = _edge_lists(reverse_adjacency(adjacency), index)
+        undirected = [forward[i] + backward[i] for i in range(len(nodes))]
+        landmarks: List[int] = []
+        from_landmarks: List[array] = []
+        to_landmarks: List[array] = []
+        closest = array('d', [math.inf]) * len(nodes)
+        candidate = 0
+        while nodes and len(landmarks) < min(count, len(nodes)):
+            landmarks.append(candidate)
+            from_landmarks.append(dijkstra(forward, candidate))
+            to_landmarks.append(dijkstra(backward, candidate))
+            distances = dijkstra(undirected, candidate)
+            for i, distance in enumerate(distances):
+                if distance < closest[i]: closest[i] = distance
+            # The next landmark is the node with the largest distance to the closest landmark (unreachable nodes come first)
+            candidate = max((i for i in range(len(nodes)) if i not in landmarks), key=lambda i: closest[i], default=None)
+            if candidate is None: break
+        return LandmarkTable(nodes, landmarks, from_landmarks, to_landmarks)
+
+    # Write the tables to a binary file
+    def save(self, path: str, source_hash: bytes = bytes(8)):
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, len(self.nodes), len(self.landmarks), source_hash))
+            array('i', self.landmarks).tofile(f)
+            for table in self.from_landmarks + self.to_landmarks:
+                table.tofile(f)
+
+    # Read the tables of the given graph from a binary file
+    # It returns None if the file is invalid or if it does not match the given hash (if any)
+    @staticmethod
+    def load(path: str, adjacency: Dict[GraphNode, List[GraphNode]], source_hash: Optional[bytes] = None) -> Optional['LandmarkTable']:
+        nodes = _node_list(adjacency)
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size: return None
+            magic, node_count, landmark_count, stored_hash = _HEADER.unpack(header)
+            if magic != _MAGIC or node_count != len(nodes): return None
+            if source_hash is not None and stored_hash != source_hash: return None
+            try:
+                landmarks = array('i')
+                landmarks.fromfile(f, landmark_count)
+                tables = []
+                for _ in range(2 * landmark_count):
+                    table = array('d')
+                    table.fromfile(f, node_count)
+                    tables.append(table)
+            except EOFError:
+                return None
+        return LandmarkTable(nodes, list(landmarks), tables[:landmark_count], tables[landmark_count:])
+
+    # Load the tables of a graph file from the landmark file next to it, or build them and save them if the file is missing or outdated
+    @staticmethod
+    def for_graph(graph_path: str, adjacency: Dict[GraphNode, List[GraphNode]], count: int = 8) -> 'LandmarkTable':
+        path, source_hash = landmark_path(graph_path), graph_hash(graph_path)
+        if os.path.exists(path):
+            table = LandmarkTable.load(path, adjacency, source_hash)
+            if table is not None: return table
+        table = LandmarkTable.build(adjacency, count)
+        table.save(path, source_hash)
+        return table
+
+    # Returns the distance bounds of the goal which are needed to compute the lower bound of any node to this goal
+    # They are returned as a tuple of (d(t, L), d(L, t)) for every landmark L
+    def goal_bounds(self, goal: int) -> Tuple[Tuple[float, float], ...]:
+        return tuple((to_landmark[goal], from_landmark[goal]) for from_landmark, to_landmark in zip(self.from_landmarks, self.to_landmarks))
+
+    # Returns a lower bound of the distance from node v to the goal (both are indices)
+    # "bounds" are the goal bounds returned by "goal_bounds"
+    def lower_bound(self, v: int, bounds: Tuple[Tuple[float, float], ...]) -> float:
+        best = 0.0
+        for (goal_to, goal_from), from_landmark, to_landmark in zip(bounds, self.from_landmarks, self.to_landmarks):
+            # if both distances are infinite, the landmark gives no information about this pair
+            node_to = to_landmark[v]
+            if node_to != goal_to:
+                bound = node_to - goal_to
+                if bound > best: best = bound
+            node_from = from_landmark[v]
+            if node_from != goal_from:
+                bound = goal_from - node_from
+                if bound > best: best = bound
+        return best
+
+    # Store the table in the cache of the problem so "landmark_heuristic" can use it
+    def attach(self, problem: GraphRoutingProblem):
+        problem.cache()["landmarks"] = self
+
+# The ALT heuristic: the largest of the landmark bounds and the euclidean distance
+# The problem must have a landmark table attached (see "LandmarkTable.attach")
+def landmark_heuristic(problem: GraphRoutingProblem, state: GraphNode) -> float:
+    cache = problem.cache()
+    table: LandmarkTable = cache["landmarks"]
+    goal = problem.goal
+    # the bounds of the goal are computed once for every goal
+    bounds = cache.get("landmark_goal_bounds")
+    if bounds is None or bounds[0] != goal:
+        bounds = cache["landmark_goal_bounds"] = (goal, table.goal_bounds(table.index[goal]))
+    return max(table.lower_bound(table.index[state], bounds[1]), euclidean_distance(state.position, goal.position))
+
+# The router loads a graph and its landmark tables once, then answers shortest path queries between any two nodes
+# Every query runs an A* with the landmark heuristic over the node indices (instead of the GraphNode objects),
+# so it does not need to hash nodes or compute the edge costs during the search.
+class LandmarkRouter:
+    def __init__(self, adjacency: Dict[GraphNode, List[GraphNode]], table: LandmarkTable) -> None:
+        self.table = table
+        self.nodes = table.nodes
+        self.index = table.index
+        self.names = {node.name: node for node in self.nodes}
+        self.edges = _edge_lists(adjacency, self.index)
+        self.positions = [(node.position.x, node.position.y) for node in self.nodes]
+
+    # Load the graph file and the landmark tables (they are built and saved if needed)
+    @staticmethod
+    def from_file(graph_path: str, count: int = 8) -> 'LandmarkRouter':
+        problem = GraphRoutingProblem.from_file(graph_path)
+        return LandmarkRouter(problem.adjacency, LandmarkTable.for_graph(graph_path, problem.adjacency, count))
+
+    # Returns the shortest path from the start to the goal as a list of nodes (excluding the start) and its cost
+    # The nodes can be given as GraphNode objects or as names. If the goal can not be reached, it returns (None, math.inf)
+    def query(self, start, goal) -> Tuple[Optional[List[GraphNode]], float]:
+        if isinstance(start, str): start = self.names[start]
+        if isinstance(goal, str): goal = self.names[goal]
+        source, target = self.index[start], self.index[goal]
+        table, edges, positions = self.table, self.edges, self.positions
+        bounds = table.goal_bounds(target)
+        goal_x, goal_y = positions[target]
+        lower_bound = table.lower_bound
+        def heuristic(v: int) -> float:
+            x, y = positions[v]
+            return max(lower_bound(v, bounds), math.hypot(x - goal_x, y - goal_y))
+        costs = {source: 0.0}
+        parents = {source: -1}
+        heuristics = {source: heuristic(source)}
+        # the frontier is a heap with lazy deletion: a node may be pushed many times and the outdated entries are skipped
+        frontier = [(heuristics[source], 0.0, source)]
+        closed = set()
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node in closed: continue
+            if node == target:
+                path = []
+                while node != source:
+                    path.append(self.nodes[node])
+                    node = parents[node]
+                path.reverse()
+                return path, cost
+            closed.add(node)
+            for next_node, edge_cost in edges[node]:
+                next_cost = cost + edge_cost
+                if next_cost < costs.get(next_node, math.inf):
+                    costs[next_node] = next_cost
+                    parents[next_node] = node
+                    h = heuristics.get(next_node)
+                    if h is None: h = heuristics[next_node] = heuristic(next_node)
+                    heapq.heappush(frontier, (next_cost + h, next_cost, next_node))
+        return None, math.inf
+
+    # Answer a list of (start, goal) queries
+    def query_many(self, pairs: Iterable[Tuple]) -> List[Tuple[Optional[List[GraphNode]], float]]:
+        return [self.query(start, goal) for start, goal in pairs]
+
+def main(args: argparse.Namespace):
+    start = time.time()
+    problem = GraphRoutingProblem.from_file(args.graph)
+    table = LandmarkTable.build(problem.adjacency, args.count)
+    path = args.output or landmark_path(args.graph)
+    table.save(path, graph_hash(args.graph))
+    print(f"Saved {len(table.landmarks)} landmarks ({', '.join(table.nodes[i].name for i in table.landmarks)}) for {len(table.nodes)} nodes to {path}")
+    print(f"Elapsed time: {time.time() - start} seconds")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the landmark tables of a graph and save them next to the graph file")
+    parser.add_argument("graph", help="path to the graph file")
+    parser.add_argument("--count", "-c", type=int, default=8, help="the number of landmarks")
+    parser.add_argument("--output", "-o", default=None, help="the path of the landmark file (the graph path with the extension '.landmarks' by default)")
+    args = parser.parse_args()
+    main(args)
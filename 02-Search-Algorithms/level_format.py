@@ -0,0 +1,246 @@
+from typing import Any, Dict, List, Tuple, Union
+import argparse, hashlib, json, os, struct, time
+
+import numpy as np
+
+from mathutils import Direction, Point
+from dungeon import DungeonLayout, DungeonProblem, DungeonState
+from parking import ParkingProblem
+from graph import GraphNode, GraphRoutingProblem, reverse_adjacency
+
+# This file contains a compact binary format for the levels (dungeons, parking lots and graphs)
+# which is much faster to load than the text and json formats when many (or large) levels are solved.
+# A level file contains:
+#   the magic bytes "MILV", the length of the header (uint32) and the header which is a small json object
+#   that contains the kind of the level, its metadata and the dtype, the shape and the offset of every array,
+#   followed by the raw data of the arrays (every array starts at a multiple of 64 bytes).
+# Since the arrays are stored raw, they are memory-mapped when loaded (no parsing and no copying).
+# The arrays of every kind are:
+#   dungeon: walkable (height x width, uint8), coins (n x 2 as x, y), remaining (n, uint8: 1 if the coin is in the initial state), player (x, y), exit (x, y)
+#   parking: walkable (height x width, uint8), cars (n x 2 as x, y), slots (m x 3 as x, y, car index)
+#   graph:   names (utf-8 bytes) with name_offsets (n+1), positions (n x 2), and the adjacency and the reverse adjacency
+#            as CSR arrays (indptr has n+1 entries and indices[indptr[i]:indptr[i+1]] are the neighbors of node i)
+# The loaders return the same problem objects as "from_file" but they build the tables of the problems with numpy.
+# To convert the levels from the command line:
+#   python level_format.py dungeons/*.txt parks/*.txt graphs/*.json
+
+_MAGIC = b"MILV"
+_VERSION = 1
+_ALIGNMENT = 64
+
+# The extension of the binary level files
+EXTENSION = ".lvl"
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+# Write the arrays of a level with its kind and metadata to a binary file
+def write_level(path: str, kind: str, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries, offset = {}, 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header = json.dumps({"version": _VERSION, "kind": kind, "meta": meta, "arrays": entries}).encode()
+    data_start = _align(len(_MAGIC) + 4 + len(header))
+    with open(path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.write(bytes(data_start + entries[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+
+# Read the kind, the metadata and the arrays of a binary level file
+# If mmap is True, the arrays are read-only views of the memory-mapped file, otherwise the file is read into memory
+def read_level(path: str, mmap: bool = True) -> Tuple[str, Dict[str, Any], Dict[str, np.ndarray]]:
+    with open(path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a binary level file")
+        header_length, = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length))
+    if header["version"] != _VERSION:
+        raise ValueError(f"{path} has the unsupported version {header['version']}")
+    data_start = _align(len(_MAGIC) + 4 + header_length)
+    buffer = np.memmap(path, dtype=np.uint8, mode='r') if mmap else np.fromfile(path, dtype=np.uint8)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+        start = data_start + entry["offset"]
+        arrays[name] = buffer[start:start + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+    return header["kind"], header["meta"], arrays
+
+# Returns the walkable grid of a set of points as a (height x width) uint8 array
+def _walkable_grid(width: int, height: int, points) -> np.ndarray:
+    grid = np.zeros((height, width), dtype=np.uint8)
+    for point in points:
+        grid[point.y, point.x] = 1
+    return grid
+
+def _points_array(points: List[Point]) -> np.ndarray:
+    return np.array([(point.x, point.y) for point in points], dtype=np.int32).reshape(-1, 2)
+
+# Compute moves[cell][direction] (the cell reached by moving in the direction or -1 if it is a wall) for a walkable grid
+def _moves_table(walkable: np.ndarray) -> np.ndarray:
+    height, width = walkable.shape
+    cells = np.arange(height * width, dtype=np.int64).reshape(height, width)
+    # the grid is padded with walls so the moves out of the grid lead into walls
+    padded = np.zeros((height + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = walkable
+    moves = np.empty((height * width, len(Direction)), dtype=np.int64)
+    for direction in Direction:
+        vector = direction.to_vector()
+        neighbor = padded[1 + vector.y:1 + vector.y + height, 1 + vector.x:1 + vector.x + width]
+        moves[:, direction] = np.where(walkable & neighbor, cells + vector.y * width + vector.x, -1).ravel()
+    return moves
+
+# Returns the points of all the cells as a tuple where points[cell] is the location of the cell
+def _cell_points(width: int, height: int) -> Tuple[Point, ...]:
+    return tuple(map(Point, list(range(width)) * height, [y for y in range(height) for _ in range(width)]))
+
+# Returns the points of the non-zero cells of a grid
+def _grid_points(grid: np.ndarray) -> List[Point]:
+    ys, xs = np.nonzero(grid)
+    return list(map(Point, xs.tolist(), ys.tolist()))
+
+# The tuple of the directions for every combination of the directions (as a bit mask) that do not lead into walls
+_ACTIONS_BY_MASK = tuple(tuple(direction for direction in Direction if mask >> direction & 1) for mask in range(1 << len(Direction)))
+
+def save_dungeon(problem: DungeonProblem, path: str):
+    layout, state = problem.layout, problem.initial_state
+    write_level(path, "dungeon", {"width": layout.width, "height": layout.height, "level_hash": problem.level_hash}, {
+        "walkable": _walkable_grid(layout.width, layout.height, layout.walkable),
+        "coins": _points_array(layout.coins),
+        "remaining": np.array([state.coins >> index & 1 for index in range(len(layout.coins))], dtype=np.uint8),
+        "player": _points_array([state.player]),
+        "exit": _points_array([layout.exit]),
+    })
+
+def _load_dungeon(meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> DungeonProblem:
+    width, height = meta["width"], meta["height"]
+    walkable = np.asarray(arrays["walkable"], dtype=bool)
+    moves = _moves_table(walkable)
+    masks = ((moves >= 0) << np.arange(len(Direction))).sum(axis=1)
+    # the coins are sorted by (y, x) like in "DungeonLayout.create"
+    coins = sorted(map(Point, *arrays["coins"].T.tolist()), key=lambda point: (point.y, point.x)) if len(arrays["coins"]) else []
+    coin_masks = [0] * (width * height)
+    for index, coin in enumerate(coins):
+        coin_masks[coin.y * width + coin.x] = 1 << index
+    exit, player = Point(*arrays["exit"][0].tolist()), Point(*arrays["player"][0].tolist())
+    # the walkable set reuses the points of the cells instead of creating new ones
+    points = _cell_points(width, height)
+    layout = DungeonLayout(
+        width, height, frozenset(map(points.__getitem__, np.flatnonzero(walkable).tolist())), exit, tuple(coins), points,
+        tuple(map(tuple, moves.tolist())), tuple(_ACTIONS_BY_MASK[mask] for mask in masks.tolist()), tuple(coin_masks), {}
+    )
+    remaining = [Point(x, y) for (x, y), flag in zip(arrays["coins"].tolist(), arrays["remaining"].tolist()) if flag]
+    problem = DungeonProblem()
+    problem.layout = layout
+    problem.initial_state = DungeonState.create(layout, player, remaining)
+    return problem
+
+def save_parking(problem: ParkingProblem, path: str):
+    write_level(path, "parking", {"width": problem.width, "height": problem.height, "level_hash": problem.level_hash}, {
+        "walkable": _walkable_grid(problem.width, problem.height, problem.passages),
+        "cars": _points_array(problem.cars),
+        "slots": np.array([(position.x, position.y, index) for position, index in problem.slots.items()], dtype=np.int32).reshape(-1, 3),
+    })
+
+def _load_parking(meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> ParkingProblem:
+    width, height = meta["width"], meta["height"]
+    walkable = np.asarray(arrays["walkable"], dtype=bool)
+    problem = ParkingProblem()
+    problem.width, problem.height = width, height
+    problem.passages = set(_grid_points(walkable))
+    problem.cars = tuple(Point(x, y) for x, y in arrays["cars"].tolist())
+    problem.slots = {Point(x, y): index for x, y, index in arrays["slots"].tolist()}
+    # the tables are built from the walkable grid with numpy instead of going through the points
+    problem.walkable = bytearray(walkable.astype(np.uint8).tobytes())
+    directions = list(Direction)
+    problem.moves = tuple(
+        tuple((directions[index], next_cell) for index, next_cell in enumerate(cell_moves) if next_cell >= 0)
+        for cell_moves in _moves_table(walkable).tolist()
+    )
+    problem._build_slot_tables()
+    return problem
+
+def save_graph(problem: GraphRoutingProblem, path: str):
+    nodes = list(problem.adjacency)
+    index = {node: i for i, node in enumerate(nodes)}
+    names = [node.name.encode() for node in nodes]
+    positions = [(node.position.x, node.position.y) for node in nodes]
+    # the positions are stored as integers if they are all integers, so the loaded points are equal to the original ones
+    dtype = np.int64 if all(isinstance(value, int) for position in positions for value in position) else np.float64
+    def csr(adjacency) -> Tuple[np.ndarray, np.ndarray]:
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(adjacency.get(node, [])) for node in nodes])
+        indices = np.array([index[next_node] for node in nodes for next_node in adjacency.get(node, [])], dtype=np.int32)
+        return indptr, indices
+    indptr, indices = csr(problem.adjacency)
+    reverse_indptr, reverse_indices = csr(problem.reverse_adjacency or reverse_adjacency(problem.adjacency))
+    write_level(path, "graph", {"start": index[problem.start], "goal": index[problem.goal], "level_hash": problem.level_hash}, {
+        "names": np.frombuffer(b"".join(names), dtype=np.uint8),
+        "name_offsets": np.cumsum([0] + [len(name) for name in names], dtype=np.int64),
+        "positions": np.array(positions, dtype=dtype).reshape(-1, 2),
+        "indptr": indptr, "indices": indices,
+        "reverse_indptr": reverse_indptr, "reverse_indices": reverse_indices,
+    })
+
+def _load_graph(meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> GraphRoutingProblem:
+    text, offsets = arrays["names"].tobytes(), arrays["name_offsets"].tolist()
+    names = [text[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+    nodes = [GraphNode(name, Point(x, y)) for name, (x, y) in zip(names, arrays["positions"].tolist())]
+    def adjacency(indptr: np.ndarray, indices: np.ndarray) -> Dict[GraphNode, List[GraphNode]]:
+        indptr, neighbors = indptr.tolist(), [nodes[i] for i in indices.tolist()]
+        return {node: neighbors[start:end] for node, start, end in zip(nodes, indptr, indptr[1:])}
+    return GraphRoutingProblem(nodes[meta["start"]], nodes[meta["goal"]],
+                               adjacency(arrays["indptr"], arrays["indices"]), adjacency(arrays["reverse_indptr"], arrays["reverse_indices"]))
+
+_SAVERS = {DungeonProblem: save_dungeon, ParkingProblem: save_parking, GraphRoutingProblem: save_graph}
+_LOADERS = {"dungeon": _load_dungeon, "parking": _load_parking, "graph": _load_graph}
+
+# Save any level problem to a binary file
+def save_level(problem: Union[DungeonProblem, ParkingProblem, GraphRoutingProblem], path: str):
+    _SAVERS[type(problem)](problem, path)
+
+# Load a binary level file as a problem (a DungeonProblem, a ParkingProblem or a GraphRoutingProblem)
+def load_level(path: str, mmap: bool = True) -> Union[DungeonProblem, ParkingProblem, GraphRoutingProblem]:
+    kind, meta, arrays = read_level(path, mmap)
+    problem = _LOADERS[kind](meta, arrays)
+    # the level hash identifies the level in the solution cache (solution_cache.py)
+    # the savers store the hash of the source level so a converted level shares the cache entries of its text or json version,
+    # otherwise (e.g. a level that was created in code) the content of the binary file is hashed
+    problem.level_hash = meta.get("level_hash") or _file_hash(path)
+    return problem
+
+def _file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+# Read a level in the text or json format (graphs are stored as json and dungeons contain a player)
+def load_source_level(path: str) -> Union[DungeonProblem, ParkingProblem, GraphRoutingProblem]:
+    if path.endswith(".json"):
+        return GraphRoutingProblem.from_file(path)
+    with open(path, 'r') as f:
+        text = f.read()
+    return DungeonProblem.from_text(text) if "@" in text else ParkingProblem.from_text(text)
+
+# Convert a level from the text or json format to the binary format (next to the source file by default)
+def convert(source: str, target: str = None) -> str:
+    target = target or os.path.splitext(source)[0] + EXTENSION
+    save_level(load_source_level(source), target)
+    return target
+
+def main(args: argparse.Namespace):
+    for source in args.levels:
+        start = time.perf_counter()
+        target = convert(source, os.path.join(args.output, os.path.splitext(os.path.basename(source))[0] + EXTENSION) if args.output else None)
+        print(f"{source} -> {target} ({os.path.getsize(target)} bytes, {time.perf_counter() - start:.4f}s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert dungeons, parking lots and graphs to the binary level format")
+    parser.add_argument("levels", nargs="+", help="the level files (.txt or .json)")
+    parser.add_argument("--output", "-o", default=None, help="the directory of the converted files (next to the source files by default)")
+    args = parser.parse_args()
+    main(args)
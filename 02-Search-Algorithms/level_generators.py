@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Set, Tuple
+import argparse, json, math, random
+
+from dungeon import DungeonProblem, DungeonTile
+from parking import ParkingProblem
+from graph import GraphRoutingProblem
+
+# This file contains seeded generators of large levels (dungeons, parking lots and graphs) to measure how the searches scale.
+# The same arguments (including the seed) always generate the same level.
+# The dungeons and the parking lots are generated as text (in the same format as the files in "dungeons" and "parks")
+# and the graphs are generated as a definition (in the same format as the json files in "graphs").
+# To write a level to a file from the command line:
+#   python level_generators.py dungeon --size 64 --coins 6 --walls 0.3 --seed 1 -o dungeon.txt
+#   python level_generators.py parking --size 12 --cars 4 --seed 1 -o park.txt
+#   python level_generators.py graph --nodes 10000 --degree 6 --seed 1 -o graph.json
+
+Cell = Tuple[int, int]
+
+# Generate a grid of walls (True) and floor cells (False) surrounded by walls, where every inner cell is a wall with the given probability
+# Only the largest connected area of floor cells is kept (the rest becomes walls) so every floor cell can be reached from every other one
+# Returns the grid and the list of the floor cells
+def _cave(width: int, height: int, wall_density: float, rng: random.Random) -> Tuple[List[List[bool]], List[Cell]]:
+    if width < 3 or height < 3:
+        raise ValueError("The level must be at least 3x3 to fit the walls around it")
+    grid = [[x in (0, width - 1) or y in (0, height - 1) or rng.random() < wall_density for x in range(width)] for y in range(height)]
+    visited: Set[Cell] = set()
+    largest: List[Cell] = []
+    for y in range(height):
+        for x in range(width):
+            if grid[y][x] or (x, y) in visited: continue
+            # Find the connected area of this cell with a depth first traversal
+            area, stack = [], [(x, y)]
+            visited.add((x, y))
+            while stack:
+                cx, cy = stack.pop()
+                area.append((cx, cy))
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if not grid[ny][nx] and (nx, ny) not in visited:
+                        visited.add((nx, ny))
+                        stack.append((nx, ny))
+            if len(area) > len(largest): largest = area
+    kept = set(largest)
+    for y in range(height):
+        for x in range(width):
+            if (x, y) not in kept: grid[y][x] = True
+    # The cells are sorted so the result does not depend on the traversal order
+    return grid, sorted(largest, key=lambda cell: (cell[1], cell[0]))
+
+# Convert a grid of walls with the given items ({cell: character}) to the text of a level
+def _to_text(grid: List[List[bool]], items: Dict[Cell, str], wall: str = "#", floor: str = ".") -> str:
+    return "\n".join("".join(items.get((x, y), wall if is_wall else floor) for x, is_wall in enumerate(row)) for y, row in enumerate(grid))
+
+# Generate the text of a dungeon with the given size, number of coins and wall density (the probability that an inner cell is a wall)
+# The player, the exit and the coins are placed on distinct cells of the same connected area so the dungeon is always solvable
+def generate_dungeon(width: int, height: int = None, coins: int = 4, wall_density: float = 0.2, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    grid, floor = _cave(width, height or width, wall_density, rng)
+    if len(floor) < coins + 2:
+        raise ValueError(f"The dungeon has {len(floor)} floor cells which cannot fit the player, the exit and {coins} coins")
+    cells = rng.sample(floor, coins + 2)
+    items = {cells[0]: DungeonTile.PLAYER.value, cells[1]: DungeonTile.EXIT.value}
+    items.update((cell, DungeonTile.COIN.value) for cell in cells[2:])
+    return _to_text(grid, items, DungeonTile.WALL.value, DungeonTile.EMPTY.value)
+
+# Generate the text of a parking lot with the given size, number of cars and wall density
+# The cars and their slots are placed on distinct cells of the same connected area
+# Since the parking file format uses the letters A-J for the cars and the digits 0-9 for the slots, there can be at most 10 cars
+# Note: a connected area does not guarantee a solution (e.g. two cars in a dead end corridor that must swap places)
+# but it is very likely if the walls are sparse enough
+def generate_parking(width: int, height: int = None, cars: int = 3, wall_density: float = 0.1, seed: int = 0) -> str:
+    if not 1 <= cars <= 10:
+        raise ValueError("The number of cars must be between 1 and 10")
+    rng = random.Random(seed)
+    grid, floor = _cave(width, height or width, wall_density, rng)
+    if len(floor) < 2 * cars:
+        raise ValueError(f"The parking lot has {len(floor)} floor cells which cannot fit {cars} cars and their slots")
+    cells = rng.sample(floor, 2 * cars)
+    items = {cell: chr(ord('A') + index) for index, cell in enumerate(cells[:cars])}
+    items.update((cell, str(index)) for index, cell in enumerate(cells[cars:]))
+    return _to_text(grid, items)
+
+# Generate the definition of a random geometric graph: the nodes are placed uniformly in a square
+# and every pair of nodes closer than a radius is connected in both directions.
+# The radius is chosen so every node has "degree" neighbors on average.
+# The start and the goal are in the largest connected area of the graph, on its opposite sides.
+def generate_graph(nodes: int, degree: float = 6, size: int = None, seed: int = 0) -> Dict[str, Any]:
+    if nodes < 2:
+        raise ValueError("The graph must have at least 2 nodes")
+    rng = random.Random(seed)
+    size = size or 100 * math.isqrt(nodes)
+    positions = [(rng.randrange(size), rng.randrange(size)) for _ in range(nodes)]
+    radius = size * math.sqrt(degree / (math.pi * nodes))
+    # The nodes are put in buckets (square cells of side "radius") so only the nodes in the neighboring buckets are compared
+    buckets: Dict[Cell, List[int]] = {}
+    for index, (x, y) in enumerate(positions):
+        buckets.setdefault((int(x // radius), int(y // radius)), []).append(index)
+    adjacent: List[List[int]] = [[] for _ in range(nodes)]
+    for (bx, by), members in buckets.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for index in members:
+                    x, y = positions[index]
+                    for other in buckets.get((bx + dx, by + dy), ()):
+                        if other != index and (positions[other][0] - x) ** 2 + (positions[other][1] - y) ** 2 <= radius * radius:
+                            adjacent[index].append(other)
+    # Find the largest connected area (the edges go in both directions) so the goal is reachable from the start
+    component, largest = [-1] * nodes, []
+    for root in range(nodes):
+        if component[root] >= 0: continue
+        component[root], area, stack = root, [root], [root]
+        while stack:
+            for other in adjacent[stack.pop()]:
+                if component[other] < 0:
+                    component[other] = root
+                    area.append(other)
+                    stack.append(other)
+        if len(area) > len(largest): largest = area
+    # The start is the node of the largest area closest to the top left corner and the goal is the node of the area farthest from the start
+    largest.sort()
+    distance = lambda index, origin: (positions[index][0] - origin[0]) ** 2 + (positions[index][1] - origin[1]) ** 2
+    start = min(largest, key=lambda index: distance(index, (0, 0)))
+    goal = max(largest, key=lambda index: distance(index, positions[start]))
+    name = lambda index: f"n{index}"
+    return {
+        "graph": {name(index): {"position": list(positions[index]), "adjacent": [name(other) for other in adjacent[index]]} for index in range(nodes)},
+        "start": name(start),
+        "goal": name(goal),
+    }
+
+# The following functions generate the levels as problems
+def generate_dungeon_problem(*args, **kwargs) -> DungeonProblem:
+    return DungeonProblem.from_text(generate_dungeon(*args, **kwargs))
+
+def generate_parking_problem(*args, **kwargs) -> ParkingProblem:
+    return ParkingProblem.from_text(generate_parking(*args, **kwargs))
+
+def generate_graph_problem(*args, **kwargs) -> GraphRoutingProblem:
+    return GraphRoutingProblem.from_definition(generate_graph(*args, **kwargs))
+
+def main(args: argparse.Namespace):
+    # the wall density is only passed if it is given since the dungeons and the parking lots have different defaults
+    walls = {} if args.walls is None else {"wall_density": args.walls}
+    if args.kind == "dungeon":
+        content = generate_dungeon(args.size, args.height, args.coins, seed=args.seed, **walls)
+    elif args.kind == "parking":
+        content = generate_parking(args.size, args.height, args.cars, seed=args.seed, **walls)
+    else:
+        content = json.dumps(generate_graph(args.nodes, args.degree, seed=args.seed), indent=2)
+    if args.output is None:
+        print(content)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(content)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a dungeon, a parking lot or a graph")
+    parser.add_argument("kind", choices=["dungeon", "parking", "graph"], help="the kind of the level")
+    parser.add_argument("--size", "-s", type=int, default=32, help="the width of the dungeon or the parking lot")
+    parser.add_argument("--height", type=int, default=None, help="the height of the dungeon or the parking lot (the width by default)")
+    parser.add_argument("--coins", type=int, default=4, help="the number of coins in the dungeon")
+    parser.add_argument("--cars", type=int, default=3, help="the number of cars in the parking lot")
+    parser.add_argument("--walls", "-w", type=float, default=None, help="the probability that an inner cell is a wall")
+    parser.add_argument("--nodes", "-n", type=int, default=1000, help="the number of nodes in the graph")
+    parser.add_argument("--degree", type=float, default=6, help="the average number of neighbors of a node in the graph")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random generator")
+    parser.add_argument("--output", "-o", default=None, help="the file to write the level to (printed by default)")
+    args = parser.parse_args()
+    main(args)
@@ -2,108 +2,138 @@ from typing import Any, Dict, Set, Tuple, List
 from problem import Problem
 from mathutils import Direction, Point
 from helpers import utils
+import hashlib
 
-#TODO: (Optional) Instead of Any, you can define a type for the parking state
-ParkingState = Tuple[Point]
+# The parking state is a tuple of cell indices where state[i] is the cell of car 'i'
+# A cell index is computed from a location as (y * width + x), so the state only contains integers
+# which makes hashing it and comparing it much faster than a tuple of Points
+ParkingState = Tuple[int, ...]
 # An action of the parking problem is a tuple containing an index 'i' and a direction 'd' where car 'i' should move in the direction 'd'.
 ParkingAction = Tuple[int, Direction]
 
 # This is the implementation of the parking problem
 class ParkingProblem(Problem[ParkingState, ParkingAction]):
     passages: Set[Point]    # A set of points which indicate where a car can be (in other words, every position except walls).
-    cars: Tuple[Point]      # A tuple of points where state[i] is the position of car 'i'. 
+    cars: Tuple[Point]      # A tuple of points where state[i] is the position of car 'i'.
     slots: Dict[Point, int] # A dictionary which indicate the index of the parking slot (if it is 'i' then it is the lot of car 'i') for every position.
                             # if a position does not contain a parking slot, it will not be in this dictionary.
     width: int              # The width of the parking lot.
     height: int             # The height of the parking lot.
 
+    # The following tables are indexed by the cell index and they are built once when the problem is created
+    walkable: bytearray                                 # walkable[cell] is 1 if the cell is a passage and 0 if it is a wall
+    moves: Tuple[Tuple[Tuple[Direction, int], ...]]     # moves[cell] contains (direction, next cell) for every direction that does not lead into a wall
+    slot_owner: Tuple[int, ...]                         # slot_owner[cell] is the index of the car that owns the slot at the cell (-1 if there is no slot)
+    goal: ParkingState                                  # The state where every car is in its own slot
+
+    # Returns the cell index of a location
+    def cell(self, point: Point) -> int:
+        return point.y * self.width + point.x
+
+    # Returns the location of a cell index
+    def point(self, cell: int) -> Point:
+        return Point(cell % self.width, cell // self.width)
+
     # This function should return the initial state
     def get_initial_state(self) -> ParkingState:
-        #TODO: ADD YOUR CODE HERE
-        # utils.NotImplemented()
+        # return the initial state of the of the cars (the cells of the cars tuple)
+        return tuple(self.cell(car) for car in self.cars)
 
-        # return the initial state of the of the cars (the cars tuple)
-        return self.cars
-         
-    
     # This function should return True if the given state is a goal. Otherwise, it should return False.
     def is_goal(self, state: ParkingState) -> bool:
-        #TODO: ADD YOUR CODE HERE
-        # utils.NotImplemented()
-        
-        # check if that all the cars are in their parking slots 
-        # if yes then return True else return False        
-        for i in range(len(state)):
-            if state[i] not in self.slots or self.slots[state[i]] != i:
-                return False
-        return True
-
-    
+        # check if that all the cars are in their parking slots
+        # since the goal state is unique, this is a comparison between two tuples of integers
+        return state == self.goal
+
     # This function returns a list of all the possible actions that can be applied to the given state
     def get_actions(self, state: ParkingState) -> List[ParkingAction]:
-        #TODO: ADD YOUR CODE HERE
-        # utils.NotImplemented()
-
-        actions = []
+        # the occupied cells are stored as bits in an integer so checking if a cell is occupied is O(1)
+        occupied = 0
+        for cell in state:
+            occupied |= 1 << cell
+        # a car can move in a direction if it does not lead into a wall (it is in the moves table) or into another car
+        moves = self.moves
+        return [(car, direction) for car, cell in enumerate(state) for direction, next_cell in moves[cell] if not occupied >> next_cell & 1]
+
+    # This function returns (action, successor, cost) for every possible action in the given state
+    def get_successors(self, state: ParkingState) -> List[Tuple[ParkingAction, ParkingState, float]]:
+        # if "get_actions", "get_successor" or "get_cost" was replaced (e.g. wrapped by test_heuristic_consistency)
+        # the successors are generated by calling them so the replacement is still called for every successor
+        if not self._has_own_transitions():
+            return Problem.get_successors(self, state)
+        moves, slot_owner = self.moves, self.slot_owner
+
+        # the occupied cells are stored as bits in an integer so checking if a cell is occupied is O(1)
+        occupied = 0
+        for cell in state:
+            occupied |= 1 << cell
 
         # check for every car if it can move in any direction
-        # the location is valid if it is in the passages (not a wall) 
-        # and it is not in the state (not another car's location)
-        # if it is valid then add it to the actions list
-
-        for i in range(len(state)):
-            for direction in Direction:
-                new_location = state[i] + direction.to_vector()
-                if new_location in self.passages and new_location not in state:
-                    actions.append((i, direction))
-        return actions
-
-                 
+        # the location is valid if it is not a wall (it is in the moves table)
+        # and it is not occupied by another car
+        successors = []
+        for car, cell in enumerate(state):
+            for direction, next_cell in moves[cell]:
+                if occupied >> next_cell & 1: continue
+                # the cost is 1 unless the car enters the parking slot of another car
+                owner = slot_owner[next_cell]
+                cost = 1 if owner < 0 or owner == car else 101
+                successors.append(((car, direction), state[:car] + (next_cell,) + state[car+1:], cost))
+        return successors
+
     # This function returns a new state which is the result of applying the given action to the given state
     def get_successor(self, state: ParkingState, action: ParkingAction) -> ParkingState:
-        #TODO: ADD YOUR CODE HERE
-        # utils.NotImplemented()
-
-        # get the car number and the direction
-        car_num = action[0]
-        direction = action[1].to_vector()
-
-        # get the car current position of the car
-        car_position = state[car_num]
-
-        # get the new location of the car after moving by adding the direction to the current position
-        new_location = car_position + direction
+        car, direction = action
+        next_cell = self._next_cell(state[car], direction)
+        return state[:car] + (next_cell,) + state[car+1:]
 
-        # create a new state list and update the location of the car in the new state
-        new_state = list(state)
-        new_state[car_num] = new_location
-
-        # cast the new state list to tuple and return it
-        return tuple(new_state)
-
-
-    
     # This function returns the cost of applying the given action to the given state
     def get_cost(self, state: ParkingState, action: ParkingAction) -> float:
-        #TODO: ADD YOUR CODE HERE
-        # utils.NotImplemented()
-
-        # get the car number and the direction
-        car_num = action[0]
-        direction = action[1].to_vector()
-
-        # get the car current position of the car
-        car_position = state[car_num]
-
-        # get the new location of the car after moving by adding the direction to the current position
-        new_location = car_position + direction
-
+        car, direction = action
         # check weather the new location is the goal location or it not in the parking slots (not a parking slot for other car)
-        if new_location not in self.slots or self.slots[new_location] == car_num:
-            return 1
-        else:
-            return 101
-    
+        owner = self.slot_owner[self._next_cell(state[car], direction)]
+        return 1 if owner < 0 or owner == car else 101
+
+    # Returns True if the transition functions of this problem are the ones of ParkingProblem (not replaced on the class or on the object)
+    def _has_own_transitions(self) -> bool:
+        cls, attributes = type(self), self.__dict__
+        return all(getattr(cls, name) is function and name not in attributes for name, function in _TRANSITIONS.items())
+
+    # Returns the cell reached by moving from the given cell in the given direction
+    def _next_cell(self, cell: int, direction: Direction) -> int:
+        vector = direction.to_vector()
+        return cell + vector.y * self.width + vector.x
+
+    # Build the tables of the engine (walkable, moves, slot_owner and goal) from the passages, the cars and the slots
+    def _build_tables(self):
+        width, height = self.width, self.height
+        self.walkable = bytearray(width * height)
+        for position in self.passages:
+            self.walkable[self.cell(position)] = 1
+        moves = []
+        for cell in range(width * height):
+            position = self.point(cell)
+            cell_moves = []
+            if self.walkable[cell]:
+                for direction in Direction:
+                    next_position = position + direction.to_vector()
+                    if next_position in self.passages:
+                        cell_moves.append((direction, self.cell(next_position)))
+            moves.append(tuple(cell_moves))
+        self.moves = tuple(moves)
+        self._build_slot_tables()
+
+    # Build the tables of the slots (slot_owner and goal) from the slots and the cars
+    def _build_slot_tables(self):
+        width, height = self.width, self.height
+        slot_owner = [-1] * (width * height)
+        for position, index in self.slots.items():
+            slot_owner[self.cell(position)] = index
+        self.slot_owner = tuple(slot_owner)
+        # if a car has no slot, its goal cell is -1 which can never be reached so the problem has no goal
+        slot_cells = {index: self.cell(position) for position, index in self.slots.items()}
+        self.goal = tuple(slot_cells.get(index, -1) for index in range(len(self.cars)))
+
      # Read a parking problem from text containing a grid of tiles
     @staticmethod
     def from_text(text: str) -> 'ParkingProblem':
@@ -127,6 +157,8 @@ class ParkingProblem(Problem[ParkingState, ParkingAction]):
         problem.slots = {position:index for index, position in slots.items()}
         problem.width = width
         problem.height = height
+        problem._build_tables()
+        problem.level_hash = hashlib.sha1("\n".join(lines).encode()).hexdigest()
         return problem
 
     # Read a parking problem from file containing a grid of tiles
@@ -134,4 +166,6 @@ class ParkingProblem(Problem[ParkingState, ParkingAction]):
     def from_file(path: str) -> 'ParkingProblem':
         with open(path, 'r') as f:
             return ParkingProblem.from_text(f.read())
-    
+
+# The original functions that the fused successor generator "get_successors" replaces (to detect if they were replaced)
+_TRANSITIONS = {name: getattr(ParkingProblem, name) for name in ("get_actions", "get_successor", "get_cost")}
@@ -0,0 +1,102 @@
+from typing import Dict, List, Sequence, Tuple
+import heapq
+
+from parking import ParkingProblem, ParkingState
+
+# This file contains heuristics for the parking problem
+# Since every action moves a single car, the cost of a solution is the sum of the costs paid by each car,
+# so the cost that any group of cars must pay can be estimated while ignoring the cars outside the group.
+# Removing the other cars can only make the problem easier (they can no longer block the way),
+# so the estimate of every group is a lower bound, and the estimates of disjoint groups can be added together.
+
+# The cost paid by a car to enter a cell: it is 1 unless the cell is the parking slot of another car
+def _entry_cost(problem: ParkingProblem, car: int, cell: int) -> int:
+    owner = problem.slot_owner[cell]
+    return 1 if owner < 0 or owner == car else 101
+
+# Return the cost of the cheapest path from every cell to the slot of the given car (ignoring the other cars)
+# It runs Dijkstra's algorithm backwards from the slot where moving from a cell into a neighbor costs the entry cost of the neighbor
+# The distances are stored in a list indexed by the cell index and the cells that can not reach the slot have an infinite distance
+def car_distances(problem: ParkingProblem, car: int) -> List[float]:
+    infinity = float('inf')
+    distances = [infinity] * len(problem.moves)
+    slot = problem.goal[car]
+    if slot < 0:
+        # the car has no slot so it can never be parked
+        return distances
+    distances[slot] = 0
+    frontier = [(0, slot)]
+    while frontier:
+        distance, cell = heapq.heappop(frontier)
+        if distance > distances[cell]: continue
+        # every neighbor can move into this cell by paying its entry cost
+        distance += _entry_cost(problem, car, cell)
+        for _, neighbor in problem.moves[cell]:
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                heapq.heappush(frontier, (distance, neighbor))
+    return distances
+
+# Return the exact cost of parking a group of cars for every placement of the group (ignoring the cars outside the group)
+# The database maps the tuple of the cells of the group cars to the cost, and the placements that can not be parked are not in it
+# It runs Dijkstra's algorithm backwards from the placement where every car of the group is in its slot
+def build_pattern_database(problem: ParkingProblem, cars: Sequence[int]) -> Dict[Tuple[int, ...], float]:
+    goal = tuple(problem.goal[car] for car in cars)
+    if any(cell < 0 for cell in goal):
+        return {}
+    database = {goal: 0}
+    frontier = [(0, goal)]
+    while frontier:
+        cost, placement = heapq.heappop(frontier)
+        if cost > database[placement]: continue
+        for index, car in enumerate(cars):
+            cell = placement[index]
+            # the previous placement had this car in a neighbor cell and it paid the entry cost of its current cell to move
+            new_cost = cost + _entry_cost(problem, car, cell)
+            for _, neighbor in problem.moves[cell]:
+                if neighbor in placement: continue
+                previous = placement[:index] + (neighbor,) + placement[index+1:]
+                if new_cost < database.get(previous, float('inf')):
+                    database[previous] = new_cost
+                    heapq.heappush(frontier, (new_cost, previous))
+    return database
+
+# Return the per-car distance tables of the problem (they are computed once and stored in the problem cache)
+def _distance_tables(problem: ParkingProblem) -> List[List[float]]:
+    cache = problem.cache()
+    tables = cache.get("parking_car_distances")
+    if tables is None:
+        tables = cache["parking_car_distances"] = [car_distances(problem, car) for car in range(len(problem.cars))]
+    return tables
+
+# Return the groups of cars and their pattern databases (they are computed once and stored in the problem cache)
+# The cars are split into groups of consecutive indices where every group contains at most "group_size" cars
+def pattern_databases(problem: ParkingProblem, group_size: int = 2) -> List[Tuple[Tuple[int, ...], Dict[Tuple[int, ...], float]]]:
+    databases = problem.cache().setdefault("parking_pattern_databases", {})
+    groups = databases.get(group_size)
+    if groups is None:
+        cars = range(len(problem.cars))
+        groups = databases[group_size] = [
+            (tuple(cars[start:start+group_size]), build_pattern_database(problem, cars[start:start+group_size]))
+            for start in range(0, len(cars), group_size)
+        ]
+    return groups
+
+# This heuristic returns the sum of the distances between every car and its slot
+# where the distance is the cost of the cheapest path when the car is alone in the parking lot
+# (including the 101 cost of passing through the slots of other cars)
+# It is consistent since an action only changes the distance of the moved car and it can not decrease it by more than the action cost
+def distance_heuristic(problem: ParkingProblem, state: ParkingState) -> float:
+    tables = _distance_tables(problem)
+    return sum(tables[car][cell] for car, cell in enumerate(state))
+
+# This heuristic splits the cars into pairs and returns the sum of the exact costs of parking every pair alone in the parking lot
+# It dominates the distance heuristic since the cars in the same pair can block each other
+# It is consistent for the same reason: an action only changes the estimate of the pair that contains the moved car
+# and the estimate of a pair is the exact cost in a relaxed problem where the same action is still possible
+def pattern_database_heuristic(problem: ParkingProblem, state: ParkingState) -> float:
+    infinity = float('inf')
+    total = 0
+    for cars, database in pattern_databases(problem, 2):
+        total += database.get(tuple(state[car] for car in cars), infinity)
+    return total
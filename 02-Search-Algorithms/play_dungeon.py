@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Optional
 from dungeon import DungeonProblem, Direction, DungeonState, DungeonTile
 from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
+from solution_cache import DEFAULT_DIRECTORY, SolutionCache
 from helpers.utils import fetch_tracked_call_count
 from helpers.heuristic_checks import test_heuristic_consistency
 from functools import lru_cache
@@ -15,10 +16,14 @@ def colored_dungeon(level: str):
     level = level.replace(DungeonTile.EXIT, f'{bcolors.BRIGHT_BLUE}{DungeonTile.EXIT}{bcolors.ENDC}')
     return level
 
+# The zero heuristic (a named function instead of a lambda so its solutions can be stored in the solution cache)
+def zero_heuristic(problem: DungeonProblem, state: DungeonState) -> float:
+    return 0
+
 # Return the heuristic selected by the user
 def get_heuristic(name: str):
     if name == "zero":
-        return lambda *_: 0
+        return zero_heuristic
     if name == "weak":
         from dungeon_heuristic import weak_heuristic
         return weak_heuristic
@@ -28,8 +33,21 @@ def get_heuristic(name: str):
     print(f"Requested Heuristic '{name}' is invalid")
     exit(-1)
 
+# Return the search function with the given name from search.py
+# If the user asks for the progress, the event variant of the search is used to print a line every "progress" expansions
+# otherwise the search function is returned as it is (so it does not create any events)
+def get_search_function(name: str, args: argparse.Namespace):
+    import search
+    if not args.progress:
+        return getattr(search, name)
+    from search_events import with_progress
+    def print_progress(expanded: int, event):
+        print(f"Expanded: {expanded}, Frontier: {event.frontier_size}, g: {event.g}, f: {event.f}", flush=True)
+    return with_progress(getattr(search, name + "Events"), print_progress, args.progress)
+
 # Create an agent based on the user selections
-def create_agent(args: argparse.Namespace):
+# If a solution cache is given, the search agents look for their solutions in it before searching
+def create_agent(args: argparse.Namespace, cache: Optional[SolutionCache] = None):
     agent_type: str = args.agent
     if agent_type == "human":
         # This function reads the action from the user (human)
@@ -49,30 +67,25 @@ def create_agent(args: argparse.Namespace):
                     print("Invalid Action")
         return HumanAgent(dungeon_user_action)
     if agent_type == "bfs":
-        from search import BreadthFirstSearch
-        return UninformedSearchAgent(BreadthFirstSearch)
+        return UninformedSearchAgent(get_search_function("BreadthFirstSearch", args), cache=cache)
     if agent_type == "dfs":
-        from search import DepthFirstSearch
-        return UninformedSearchAgent(DepthFirstSearch)
+        return UninformedSearchAgent(get_search_function("DepthFirstSearch", args), cache=cache)
     if agent_type == "ucs":
-        from search import UniformCostSearch
-        return UninformedSearchAgent(UniformCostSearch)
+        return UninformedSearchAgent(get_search_function("UniformCostSearch", args), cache=cache)
     if agent_type == "astar":
-        from search import AStarSearch
         # We cache the heuristic calls to speed up the search process if the heuristic is not fast
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
             DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
-        return InformedSearchAgent(AStarSearch, heuristic)
+        return InformedSearchAgent(get_search_function("AStarSearch", args), heuristic, cache=cache)
     if agent_type == "gbfs":
-        from search import BestFirstSearch
         # We cache the heuristic calls to speed up the search process if the heuristic is not fast
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
             DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
-        return InformedSearchAgent(BestFirstSearch, heuristic)
+        return InformedSearchAgent(get_search_function("BestFirstSearch", args), heuristic, cache=cache)
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
 
@@ -84,7 +97,8 @@ def main(args: argparse.Namespace):
     state = problem.get_initial_state() # Get the initial state
     print("Initial State:")
     state_printer(state)
-    agent = create_agent(args)
+    cache = SolutionCache(args.cache) if args.cache else None
+    agent = create_agent(args, cache)
     step = 0 # This will store the current step
     total_explored_nodes = 0 # This will store the number of traversed nodes during search
     unsolvable = False # This will store whether the problem is unsolvable or not
@@ -115,6 +129,8 @@ def main(args: argparse.Namespace):
     # This was a search agent, display the number of traversed nodes
     if not isinstance(agent, HumanAgent):
         print(f"Search explored {total_explored_nodes} nodes")
+    if cache is not None:
+        print(f"Solution cache: {cache.hits} hits, {cache.misses} misses, {cache.skipped} not cacheable")
     # Finally print the elapsed time for the whole process
     print(f"Elapsed time: {time.time() - start} seconds")
 
@@ -126,11 +142,15 @@ if __name__ == "__main__":
     parser.add_argument("--agent", "-a", default="human",
                         choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'gbfs'],
                         help="the agent that will play the game")
+    parser.add_argument("--progress", "-p", type=int, default=0, metavar="N",
+                        help="print the progress of the search every N expansions")
     parser.add_argument("--heuristic", '-hf', default="zero",
                         choices=["zero", "weak", "strong"],
                         help="choose the heuristic to use with A* or Greedy Best First Search")
     parser.add_argument("--checks", "-c", action='store_true', default=False,
                         help="Enable consistency checks for the heuristic")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_DIRECTORY, default=None, metavar="DIR",
+                        help=f"look for the solutions in the solution cache before searching (the cache folder is {DEFAULT_DIRECTORY} by default)")
     parser.add_argument("--ansicolors", "-ac", action="store_true",
                         help="Print the dungeon on the console with ANSI colors (only works on some terminals)")
 
@@ -1,12 +1,40 @@
+from typing import Optional
 import time
 from graph import GraphRoutingProblem, GraphNode, graphrouting_heuristic
 from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
 from helpers.utils import fetch_recorded_calls
+from policy_table import PolicyTable
+from solution_cache import DEFAULT_DIRECTORY, SolutionCache
 import argparse, os, json
 
 # Create an agent based on the user selections
-def create_agent(args: argparse.Namespace):
+# Return the search function with the given name from search.py
+# If the user asks for the progress, the event variant of the search is used to print a line every "progress" expansions
+# otherwise the search function is returned as it is (so it does not create any events)
+def get_search_function(name: str, args: argparse.Namespace):
+    import search
+    if not args.progress:
+        return getattr(search, name)
+    from search_events import with_progress
+    def print_progress(expanded: int, event):
+        print(f"Expanded: {expanded}, Frontier: {event.frontier_size}, g: {event.g}, f: {event.f}", flush=True)
+    return with_progress(getattr(search, name + "Events"), print_progress, args.progress)
+
+# The agents that can follow a policy table: the table stores the cheapest path to the goal,
+# so it only gives the same paths as the agents that search for the cheapest path
+POLICY_AGENTS = ("ucs", "astar")
+
+# Returns the policy table of the goal if "--policy" is given (it is built by one backward search from the goal)
+def get_policy(args: argparse.Namespace, problem: GraphRoutingProblem):
+    return PolicyTable.build(problem).policy() if args.policy else None
+
+# If "--policy" is given, the ucs and astar agents receive a policy table of the goal (so they do not search)
+# If a solution cache is given, the search agents look for their solutions in it before searching
+def create_agent(args: argparse.Namespace, problem: GraphRoutingProblem, cache: Optional[SolutionCache] = None):
     agent_type: str = args.agent
+    if args.policy and agent_type not in POLICY_AGENTS:
+        print(f"The policy table can only be used by the agents: {', '.join(POLICY_AGENTS)}")
+        exit(-1)
     if agent_type == "human":
         # This function reads the action from the user (human)
         def graph_user_action(problem: GraphRoutingProblem, state: GraphNode) -> GraphNode:
@@ -27,20 +55,15 @@ def create_agent(args: argparse.Namespace):
                     print("Invalid Action")
         return HumanAgent(graph_user_action)
     if agent_type == "bfs":
-        from search import BreadthFirstSearch
-        return UninformedSearchAgent(BreadthFirstSearch)
+        return UninformedSearchAgent(get_search_function("BreadthFirstSearch", args), cache=cache)
     if agent_type == "dfs":
-        from search import DepthFirstSearch
-        return UninformedSearchAgent(DepthFirstSearch)
+        return UninformedSearchAgent(get_search_function("DepthFirstSearch", args), cache=cache)
     if agent_type == "ucs":
-        from search import UniformCostSearch
-        return UninformedSearchAgent(UniformCostSearch)
+        return UninformedSearchAgent(get_search_function("UniformCostSearch", args), get_policy(args, problem), cache)
     if agent_type == "astar":
-        from search import AStarSearch
-        return InformedSearchAgent(AStarSearch, graphrouting_heuristic)
+        return InformedSearchAgent(get_search_function("AStarSearch", args), graphrouting_heuristic, get_policy(args, problem), cache)
     if agent_type == "gbfs":
-        from search import BestFirstSearch
-        return InformedSearchAgent(BestFirstSearch, graphrouting_heuristic)
+        return InformedSearchAgent(get_search_function("BestFirstSearch", args), graphrouting_heuristic, cache=cache)
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
 
@@ -60,7 +83,8 @@ def main(args: argparse.Namespace):
     if figure:
         print(figure)
     print("Current Node:", state)
-    agent = create_agent(args)
+    cache = SolutionCache(args.cache) if args.cache else None
+    agent = create_agent(args, problem, cache)
     step = 0 # This will store the current step
     path_cost = 0 # This will store the total path cost
     traversed_nodes = [] # This will store all the traversed nodes in order of traversal
@@ -92,6 +116,8 @@ def main(args: argparse.Namespace):
     # This was a search agent, display the traversed nodes
     if not isinstance(agent, HumanAgent):
         print(f"Traversal Order: {'->'.join(traversed_nodes)}")
+    if cache is not None:
+        print(f"Solution cache: {cache.hits} hits, {cache.misses} misses, {cache.skipped} not cacheable")
     # Finally print the elapsed time for the whole process
     print(f"Elapsed time: {time.time() - start} seconds")
 
@@ -102,6 +128,12 @@ if __name__ == "__main__":
     parser.add_argument("--agent", "-a", default="human",
                         choices=['human', 'bfs', 'dfs', 'ucs', 'astar', 'gbfs'],
                         help="the agent that will play the game")
+    parser.add_argument("--progress", "-p", type=int, default=0, metavar="N",
+                        help="print the progress of the search every N expansions")
+    parser.add_argument("--policy", action="store_true",
+                        help="give the ucs and astar agents a precomputed policy table of the goal (they follow it instead of searching, so the traversal order is empty)")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_DIRECTORY, default=None, metavar="DIR",
+                        help=f"look for the solutions in the solution cache before searching (the cache folder is {DEFAULT_DIRECTORY} by default)")
 
     args = parser.parse_args()
     try:
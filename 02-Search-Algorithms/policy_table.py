@@ -0,0 +1,89 @@
+from typing import Dict, Generic, List, Optional
+import heapq, math, sys, time
+
+from problem import S, A
+from graph import GraphNode, GraphRoutingProblem, reverse_adjacency
+
+# This file contains a policy table which stores the optimal action from every node to a single goal.
+# When many agents route to the same goal, running a search for every start node repeats most of the work.
+# Instead, the policy table runs one Dijkstra search backward from the goal (along the reversed edges)
+# which computes the cost of the shortest path from every node to the goal and the first action of that path.
+# Then the optimal action of any start node is a dictionary lookup:
+#   table = PolicyTable.build(problem)
+#   action = table.action(state)
+# The table can also be given to the search agents as a precomputed policy (see "policy" in agents.py):
+#   agent = InformedSearchAgent(AStarSearch, graphrouting_heuristic, policy=table.policy())
+
+class PolicyTable(Generic[S, A]):
+    def __init__(self, goal: S, actions: Dict[S, Optional[A]], costs: Dict[S, float], build_time: float = 0) -> None:
+        self.goal = goal
+        self.actions = actions          # actions[state] is the optimal action from the state (None for the goal and the states that can not reach it)
+        self.costs = costs              # costs[state] is the cost of the shortest path to the goal (only for the states that can reach it)
+        self.build_time = build_time    # The time (in seconds) taken to build the table
+
+    # Returns the optimal action from the state (None if the state is the goal or if it can not reach the goal)
+    def action(self, state: S) -> Optional[A]:
+        return self.actions.get(state)
+
+    # Returns the cost of the shortest path from the state to the goal (math.inf if it can not reach the goal)
+    def cost(self, state: S) -> float:
+        return self.costs.get(state, math.inf)
+
+    # Returns the optimal path from the state to the goal as a list of actions (None if it can not reach the goal)
+    def path(self, state: S) -> Optional[List[A]]:
+        if state not in self.costs: return None
+        path = []
+        while state != self.goal:
+            action = self.actions[state]
+            path.append(action)
+            state = action  # in the graph routing problem, the action is the next state
+        return path
+
+    # Returns the policy as a dictionary that can be given to the search agents
+    # The goal and the states that can not reach it are not included, so an agent would still search from them
+    # (and find that there is no solution)
+    def policy(self) -> Dict[S, A]:
+        return {state: action for state, action in self.actions.items() if action is not None}
+
+    def __contains__(self, state: S) -> bool:
+        return state in self.costs
+
+    def __len__(self) -> int:
+        return len(self.costs)
+
+    # Returns the approximate memory (in bytes) used by the dictionaries of the table (the states themselves are shared with the problem)
+    def memory_size(self) -> int:
+        return sys.getsizeof(self.actions) + sys.getsizeof(self.costs) + sum(sys.getsizeof(cost) for cost in self.costs.values())
+
+    # Build the policy table of the goal of the given graph routing problem
+    # Dijkstra runs from the goal along the reversed edges so it reaches every node that has a path to the goal.
+    # When a node u is reached through the edge (u -> v), the optimal action of u is to go to v.
+    @staticmethod
+    def build(problem: GraphRoutingProblem) -> 'PolicyTable[GraphNode, GraphNode]':
+        start = time.perf_counter()
+        if problem.reverse_adjacency is None:
+            problem.reverse_adjacency = reverse_adjacency(problem.adjacency)
+        incoming = problem.reverse_adjacency
+        goal = problem.goal
+        costs: Dict[GraphNode, float] = {goal: 0}
+        actions: Dict[GraphNode, Optional[GraphNode]] = {goal: None}
+        done = set()
+        # The heap entries contain a counter to break the ties without comparing the nodes
+        counter = 0
+        frontier = [(0, counter, goal)]
+        while frontier:
+            cost, _, node = heapq.heappop(frontier)
+            if node in done: continue
+            done.add(node)
+            for previous in incoming.get(node, []):
+                if previous in done: continue
+                previous_cost = cost + problem.get_cost(previous, node)
+                if previous_cost < costs.get(previous, math.inf):
+                    costs[previous] = previous_cost
+                    actions[previous] = node
+                    counter += 1
+                    heapq.heappush(frontier, (previous_cost, counter, previous))
+        # The nodes that can not reach the goal have no action
+        for node in problem.adjacency:
+            if node not in actions: actions[node] = None
+        return PolicyTable(goal, actions, costs, time.perf_counter() - start)
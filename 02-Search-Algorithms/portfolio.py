@@ -0,0 +1,249 @@
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import argparse, multiprocessing, os, queue, time
+
+from problem import Problem
+from helpers.utils import load_function
+
+# This file contains a portfolio runner which solves one problem with several search algorithms at the same time.
+# Every algorithm (and heuristic) runs in its own process, and the runner returns as soon as one of them gives an acceptable answer
+# then it terminates the other processes.
+# Only strings (the problem file, the algorithm name and the heuristic name) are sent to the workers;
+# every worker loads its own copy of the problem using the "from_file" function of the problem class,
+# so nothing that can not be pickled (e.g. lambdas or the problem caches) has to cross the process boundaries.
+# The workers send back the solution as a list of integers where every integer is the index of the action in "get_actions"
+# and the runner rebuilds the actions from its own copy of the problem.
+
+# The problem classes that can be loaded by the workers
+PROBLEM_TYPES: Dict[str, str] = {
+    "dungeon": "dungeon.DungeonProblem",
+    "parking": "parking.ParkingProblem",
+    "graph": "graph.GraphRoutingProblem",
+}
+
+# The search algorithms that return an optimal solution (as long as the heuristic is consistent)
+OPTIMAL_ALGORITHMS = {
+    "UniformCostSearch",
+    "AStarSearch",
+    "BidirectionalUniformCostSearch",
+    "BidirectionalAStarSearch",
+    "IterativeDeepeningAStarSearch",
+    "SimplifiedMemoryBoundedAStarSearch",
+}
+
+# The search algorithms that can return no solution even if one exists (when the memory budget is too small)
+INCOMPLETE_ALGORITHMS = {
+    "SimplifiedMemoryBoundedAStarSearch",
+}
+
+# A search algorithm from search.py with an optional heuristic ("module.function" or "zero")
+@dataclass(frozen=True)
+class PortfolioEntry:
+    algorithm: str
+    heuristic: Optional[str] = None
+
+    @property
+    def optimal(self) -> bool:
+        return self.algorithm in OPTIMAL_ALGORITHMS
+
+    @property
+    def complete(self) -> bool:
+        return self.algorithm not in INCOMPLETE_ALGORITHMS
+
+    def __str__(self) -> str:
+        return self.algorithm if self.heuristic is None else f"{self.algorithm}({self.heuristic})"
+
+    # Parse an entry written as "Algorithm" or "Algorithm:module.heuristic"
+    @staticmethod
+    def parse(text: str) -> 'PortfolioEntry':
+        algorithm, _, heuristic = text.partition(":")
+        return PortfolioEntry(algorithm, heuristic or None)
+
+# The portfolio used for every problem type if the user does not select the algorithms
+DEFAULT_PORTFOLIOS: Dict[str, List[PortfolioEntry]] = {
+    "dungeon": [
+        PortfolioEntry("AStarSearch", "dungeon_heuristic.strong_heuristic"),
+        PortfolioEntry("UniformCostSearch"),
+        PortfolioEntry("BestFirstSearch", "dungeon_heuristic.strong_heuristic"),
+    ],
+    "parking": [
+        PortfolioEntry("AStarSearch", "parking_heuristic.pattern_database_heuristic"),
+        PortfolioEntry("UniformCostSearch"),
+        PortfolioEntry("BestFirstSearch", "parking_heuristic.distance_heuristic"),
+    ],
+    "graph": [
+        PortfolioEntry("AStarSearch", "graph.graphrouting_heuristic"),
+        PortfolioEntry("BidirectionalAStarSearch", "graph.graphrouting_heuristic"),
+        PortfolioEntry("UniformCostSearch"),
+        PortfolioEntry("BestFirstSearch", "graph.graphrouting_heuristic"),
+    ],
+}
+
+# The report of a single worker
+#   status is one of: "solved", "no solution", "error", "cancelled" (another worker finished first) or "timeout"
+#   expansions is the number of "is_goal" calls done by the worker (for cancelled workers, it is the last count they reported)
+@dataclass
+class WorkerReport:
+    entry: PortfolioEntry
+    status: str
+    path: Optional[list] = None
+    cost: Optional[float] = None
+    expansions: int = 0
+    elapsed: float = 0
+
+# Convert a path to the index of every action in the list of the possible actions of its state
+def encode_path(problem: Problem, path: list) -> List[int]:
+    state, indices = problem.get_initial_state(), []
+    for action in path:
+        indices.append(list(problem.get_actions(state)).index(action))
+        state = problem.get_successor(state, action)
+    return indices
+
+# Convert a list of action indices back to a path
+def decode_path(problem: Problem, indices: List[int]) -> list:
+    state, path = problem.get_initial_state(), []
+    for index in indices:
+        action = list(problem.get_actions(state))[index]
+        path.append(action)
+        state = problem.get_successor(state, action)
+    return path
+
+# Guess the problem type from the file: graphs are stored as json and dungeons contain a player
+def detect_problem_type(path: str) -> str:
+    if path.endswith(".json"):
+        return "graph"
+    with open(path, 'r') as f:
+        return "dungeon" if "@" in f.read() else "parking"
+
+# The number of expansions between two updates of the shared expansion counter
+PROGRESS_INTERVAL = 256
+# The time (in seconds) between two checks for workers that died without sending a report
+POLL_INTERVAL = 0.1
+
+# This function runs in the worker process
+def _run_worker(index: int, problem_type: str, path: str, entry: PortfolioEntry, counter, results):
+    start = time.perf_counter()
+    try:
+        problem_class = load_function(PROBLEM_TYPES[problem_type], use_local=True)
+        problem = problem_class.from_file(path)
+        # count the expansions by wrapping "is_goal" on the problem class (this only affects the worker process)
+        # so the problems created during the search (e.g. the backward problem of the bidirectional searches) are counted too
+        is_goal = problem_class.is_goal
+        expansions = 0
+        def counted_is_goal(self, state):
+            nonlocal expansions
+            expansions += 1
+            if expansions % PROGRESS_INTERVAL == 0:
+                counter.value = expansions
+            return is_goal(self, state)
+        problem_class.is_goal = counted_is_goal
+        search_fn = load_function(f"search.{entry.algorithm}", use_local=True)
+        args = [problem, problem.get_initial_state()]
+        if entry.heuristic == "zero":
+            args.append(lambda *_: 0)
+        elif entry.heuristic is not None:
+            args.append(load_function(entry.heuristic, use_local=True))
+        path_found = search_fn(*args)
+        problem_class.is_goal = is_goal
+        counter.value = expansions
+        elapsed = time.perf_counter() - start
+        cost, indices = None, None
+        if path_found is not None:
+            state, cost = problem.get_initial_state(), 0
+            for action in path_found:
+                cost += problem.get_cost(state, action)
+                state = problem.get_successor(state, action)
+            indices = encode_path(problem, path_found)
+        status = "no solution" if path_found is None else "solved"
+        results.put((index, WorkerReport(entry, status, indices, cost, expansions, elapsed)))
+    except Exception as error:
+        results.put((index, WorkerReport(entry, f"error: {error!r}", None, None, counter.value, time.perf_counter() - start)))
+
+# Solve the problem in the given file with every entry of the portfolio in parallel
+# If "require_optimal" is True, the runner waits for the first answer from an optimal algorithm,
+# otherwise, it accepts the first answer from any algorithm.
+# An answer of "no solution" is accepted if the algorithm is complete (it searched the whole graph).
+# It returns the accepted report (None if no worker gave an acceptable answer before the timeout) and the reports of all the workers
+def run_portfolio(path: str, entries: List[PortfolioEntry], problem_type: Optional[str] = None,
+                  require_optimal: bool = True, timeout: Optional[float] = None) -> Tuple[Optional[WorkerReport], List[WorkerReport]]:
+    problem_type = problem_type or detect_problem_type(path)
+    path = os.path.abspath(path)
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    counters = [context.Value('q', 0) for _ in entries]
+    workers = [
+        context.Process(target=_run_worker, args=(index, problem_type, path, entry, counters[index], results), daemon=True)
+        for index, entry in enumerate(entries)
+    ]
+    start = time.perf_counter()
+    for worker in workers: worker.start()
+
+    # the runner loads its own copy of the problem to rebuild the paths sent by the workers
+    problem = load_function(PROBLEM_TYPES[problem_type], use_local=True).from_file(path)
+
+    reports: List[Optional[WorkerReport]] = [None] * len(entries)
+    accepted: Optional[WorkerReport] = None
+    exited = set() # the workers that exited normally without a report at the previous poll
+    while accepted is None and any(report is None for report in reports):
+        remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+        if remaining is not None and remaining <= 0: break
+        try:
+            index, report = results.get(timeout=POLL_INTERVAL if remaining is None else min(remaining, POLL_INTERVAL))
+        except queue.Empty:
+            # a worker can die without sending a report (e.g. killed by the OOM killer or crashed in native code) so it is marked as an error
+            # a worker that exited normally sent its report before exiting, so it is only marked if the report is still missing at the next poll
+            for index, worker in enumerate(workers):
+                if reports[index] is not None or worker.is_alive(): continue
+                if worker.exitcode == 0 and index not in exited:
+                    exited.add(index)
+                    continue
+                reports[index] = WorkerReport(entries[index], f"error: the worker exited with code {worker.exitcode}", None, None, counters[index].value, time.perf_counter() - start)
+            continue
+        if report.path is not None:
+            report.path = decode_path(problem, report.path)
+        reports[index] = report
+        if (report.status == "no solution" and report.entry.complete) or (report.status == "solved" and (report.entry.optimal or not require_optimal)):
+            accepted = report
+
+    # cancel the workers that are still running
+    elapsed = time.perf_counter() - start
+    for index, worker in enumerate(workers):
+        if reports[index] is None:
+            worker.terminate()
+            reports[index] = WorkerReport(entries[index], "cancelled" if accepted is not None else "timeout", None, None, counters[index].value, elapsed)
+    for worker in workers: worker.join()
+
+    # if no answer was accepted (e.g. only non-optimal algorithms finished), return the cheapest solution found
+    if accepted is None:
+        solved = [report for report in reports if report.status == "solved"]
+        if solved: accepted = min(solved, key=lambda report: report.cost)
+    return accepted, reports
+
+def main(args: argparse.Namespace):
+    problem_type = args.problem if args.problem != "auto" else detect_problem_type(args.level)
+    entries = [PortfolioEntry.parse(text) for text in args.algorithms] if args.algorithms else DEFAULT_PORTFOLIOS[problem_type]
+    start = time.time()
+    accepted, reports = run_portfolio(args.level, entries, problem_type, not args.any, args.timeout)
+    for report in reports:
+        print(f"{str(report.entry):60} {report.status:12} cost={report.cost} expansions={report.expansions} elapsed={report.elapsed:.4f}s")
+    if accepted is None:
+        print("No worker found an acceptable answer")
+    elif accepted.path is None:
+        print(f"{accepted.entry} proved that there is no solution")
+    else:
+        print(f"Accepted {accepted.entry} with cost {accepted.cost}")
+        print("Path:", ' '.join(str(action) for action in accepted.path))
+    print(f"Elapsed time: {time.time() - start} seconds")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a problem with a portfolio of search algorithms running in parallel")
+    parser.add_argument("level", help="path to the problem file (a dungeon, a parking lot or a graph)")
+    parser.add_argument("--problem", "-p", default="auto", choices=["auto", *PROBLEM_TYPES.keys()],
+                        help="the type of the problem (detected from the file by default)")
+    parser.add_argument("--algorithms", "-a", nargs="+", default=None,
+                        help="the portfolio entries written as 'Algorithm' or 'Algorithm:module.heuristic' (e.g. AStarSearch:dungeon_heuristic.strong_heuristic)")
+    parser.add_argument("--any", action="store_true",
+                        help="accept the first solution from any algorithm instead of waiting for an optimal one")
+    parser.add_argument("--timeout", "-t", type=float, default=None, help="the time limit in seconds")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,214 @@
+from typing import Any, Dict, Generic, Iterator, List, Tuple, TypeVar
+import heapq
+
+# K is used for generic typing where K represents the type of the keys stored in the queue (e.g. the states)
+K = TypeVar("K")
+
+# This is a min priority queue where every key appears at most once and its priority can be changed while it is in the queue.
+# It is implemented as a binary heap with a dictionary that maps every key to its entry in the heap,
+# and every entry stores its own position in the heap, so "key in queue" and "priority(key)" are O(1)
+# and "push", "pop" and "update" (decrease-key) are O(log n).
+# Since the positions are stored in the entries, moving an entry in the heap does not need to hash its key.
+# Every key also carries a value (e.g. the index of its node in the search tree) that is returned when it is popped.
+# Ties between equal priorities are broken by the insertion order where updating a key counts as inserting it again.
+# This is the same order we get from pushing a new entry into a heapq list with an increasing index for every push.
+# The queue keeps counters for the operations done on it so it can be compared with the LazyPriorityQueue.
+class IndexedPriorityQueue(Generic[K]):
+    def __init__(self) -> None:
+        # every entry in the heap is a list [(priority, order), position, key, value]
+        self.heap: List[List[Any]] = []
+        # the entry of every key in the queue
+        self.entries: Dict[K, List[Any]] = {}
+        # the insertion order of the next pushed or updated key
+        self.order = 0
+        # the operation counters
+        self.pushes = 0
+        self.pops = 0
+        self.updates = 0
+        self.stale_pops = 0 # Always 0 since there are no stale entries, it is kept to match the LazyPriorityQueue
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __bool__(self) -> bool:
+        return bool(self.heap)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.entries
+
+    # Iterate over the keys in the queue (in no particular order)
+    def __iter__(self) -> Iterator[K]:
+        return iter(self.entries)
+
+    # Returns the current priority of a key in the queue
+    def priority(self, key: K) -> Any:
+        return self.entries[key][0][0]
+
+    # Returns the key with the lowest priority, its priority and its value without removing it
+    def peek(self) -> Tuple[K, Any, Any]:
+        entry = self.heap[0]
+        return entry[2], entry[0][0], entry[3]
+
+    # Adds a key that is not in the queue
+    def push(self, key: K, priority: Any, value: Any = None):
+        self.pushes += 1
+        heap = self.heap
+        entry = [(priority, self.order), len(heap), key, value]
+        self.order += 1
+        self.entries[key] = entry
+        heap.append(entry)
+        self._sift_up(entry)
+
+    # Changes the priority and the value of a key that is already in the queue
+    def update(self, key: K, priority: Any, value: Any = None):
+        self.updates += 1
+        entry = self.entries[key]
+        old_sort_key = entry[0]
+        entry[0] = (priority, self.order)
+        entry[3] = value
+        self.order += 1
+        if entry[0] < old_sort_key:
+            self._sift_up(entry)
+        else:
+            self._sift_down(entry)
+
+    # Removes a key from the queue wherever it is in the heap
+    def remove(self, key: K):
+        entry = self.entries.pop(key)
+        heap = self.heap
+        last = heap.pop()
+        if last is not entry:
+            position = entry[1]
+            last[1] = position
+            heap[position] = last
+            if last[0] < entry[0]:
+                self._sift_up(last)
+            else:
+                self._sift_down(last)
+
+    # Removes the key with the lowest priority and returns the key, its priority and its value
+    def pop(self) -> Tuple[K, Any, Any]:
+        self.pops += 1
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry = heap[0]
+            last[1] = 0
+            heap[0] = last
+            self._sift_down(last)
+        else:
+            entry = last
+        del self.entries[entry[2]]
+        return entry[2], entry[0][0], entry[3]
+
+    # Moves the entry up until its parent is not larger than it
+    def _sift_up(self, entry: List[Any]):
+        heap = self.heap
+        sort_key, position = entry[0], entry[1]
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if sort_key < parent[0]:
+                heap[position] = parent
+                parent[1] = position
+                position = parent_position
+                continue
+            break
+        heap[position] = entry
+        entry[1] = position
+
+    # Moves the entry down until its children are not smaller than it
+    def _sift_down(self, entry: List[Any]):
+        heap = self.heap
+        size = len(heap)
+        sort_key, position = entry[0], entry[1]
+        child_position = 2 * position + 1
+        while child_position < size:
+            child = heap[child_position]
+            right_position = child_position + 1
+            if right_position < size:
+                right = heap[right_position]
+                if right[0] < child[0]:
+                    child_position, child = right_position, right
+            if child[0] < sort_key:
+                heap[position] = child
+                child[1] = position
+                position = child_position
+                child_position = 2 * position + 1
+                continue
+            break
+        heap[position] = entry
+        entry[1] = position
+
+    # Returns the operation counters as a dictionary
+    def counters(self) -> Dict[str, int]:
+        return {"pushes": self.pushes, "pops": self.pops, "updates": self.updates, "stale_pops": self.stale_pops}
+
+# This queue has the same interface as IndexedPriorityQueue but it is implemented the way the search functions used to be:
+# updating a key pushes a new entry into a heapq list and the old entry stays in the heap until it is popped and skipped.
+# It is used as a reference to compare the number of heap operations (and the number of stale entries).
+class LazyPriorityQueue(Generic[K]):
+    def __init__(self) -> None:
+        # every entry in the heap is a tuple (priority, order, key, value)
+        self.heap: List[Tuple[Any, int, K, Any]] = []
+        # the insertion order of the live entry of every key in the queue
+        self.live: Dict[K, Tuple[Any, int]] = {}
+        # the insertion order of the next pushed or updated key
+        self.order = 0
+        # the operation counters (pushes and pops count the heapq operations)
+        self.pushes = 0
+        self.pops = 0
+        self.updates = 0
+        self.stale_pops = 0
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def __bool__(self) -> bool:
+        return bool(self.live)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.live
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self.live)
+
+    def priority(self, key: K) -> Any:
+        return self.live[key][0]
+
+    def push(self, key: K, priority: Any, value: Any = None):
+        self.pushes += 1
+        self.live[key] = (priority, self.order)
+        heapq.heappush(self.heap, (priority, self.order, key, value))
+        self.order += 1
+
+    # The old entry of the key is left in the heap (it becomes stale)
+    def update(self, key: K, priority: Any, value: Any = None):
+        self.updates += 1
+        self.push(key, priority, value)
+
+    # The stale entries on the top of the heap are popped until the top entry is live
+    def peek(self) -> Tuple[K, Any, Any]:
+        while True:
+            priority, order, key, value = self.heap[0]
+            if self.live.get(key) == (priority, order):
+                return key, priority, value
+            self.pops += 1
+            self.stale_pops += 1
+            heapq.heappop(self.heap)
+
+    # The entry of the key becomes stale
+    def remove(self, key: K):
+        del self.live[key]
+
+    def pop(self) -> Tuple[K, Any, Any]:
+        while True:
+            self.pops += 1
+            priority, order, key, value = heapq.heappop(self.heap)
+            if self.live.get(key) == (priority, order):
+                del self.live[key]
+                return key, priority, value
+            self.stale_pops += 1
+
+    def counters(self) -> Dict[str, int]:
+        return {"pushes": self.pushes, "pops": self.pops, "updates": self.updates, "stale_pops": self.stale_pops}
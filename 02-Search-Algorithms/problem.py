@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, Iterable, List, TypeVar, Union
+from typing import Callable, Generic, Iterable, List, Optional, Tuple, TypeVar, Union
 from helpers.utils import CacheContainer, with_cache
 
 # S and A are used for generic typing where S represents the state type and A represents the action type
@@ -10,6 +10,10 @@ A = TypeVar("A")
 # It also implements 'CacheContainer' which allows you to call the "cache" method
 # which returns a dictionary in which you can store any data you want to cache
 class Problem(ABC, Generic[S, A], CacheContainer):
+    # The hash of the level this problem was read from (set by "from_text" or "from_file")
+    # It is None if the problem was not read from a level. It is used by the solution cache (see solution_cache.py).
+    level_hash: Optional[str] = None
+
     # This function returns the initial state
     @abstractmethod
     def get_initial_state(self) -> S:
@@ -34,6 +38,12 @@ class Problem(ABC, Generic[S, A], CacheContainer):
     def get_cost(self, state: S, action: A) -> float:
         return 1.0
 
+    # This function returns a tuple (action, successor, cost) for every possible action from the given state
+    # By default, it calls "get_actions", "get_successor" and "get_cost" but a problem can override it
+    # to compute the successor and the cost of every action in one pass
+    def get_successors(self, state: S) -> Iterable[Tuple[A, S, float]]:
+        return [(action, self.get_successor(state, action), self.get_cost(state, action)) for action in self.get_actions(state)]
+
 # These are type aliases for:
 # A solution which is a list of actions (or None if no solution is found)
 Solution = Union[List[A], None]
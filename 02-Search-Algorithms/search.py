@@ -1,7 +1,12 @@
 from problem import HeuristicFunction, Problem, S, A, Solution
+from typing import List, Optional
 from collections import deque
 from helpers import utils
-import heapq
+from search_tree import SearchTree
+from priority_queue import IndexedPriorityQueue
+from search_metrics import SearchMetrics, unwrap_problem, with_metrics
+from search_events import IncumbentEvent, SearchEvent, SearchSteps, event_stream, run_steps
+import functools, heapq, time
 #TODO: Import any modules you want to use
 
 # All search functions take a problem and a state
@@ -12,7 +17,8 @@ import heapq
 # 1. A list of actions which represent the path from the initial state to the final state
 # 2. None if there is no solution
 
-def BreadthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
+@with_metrics
+def BreadthFirstSearch(problem: Problem[S, A], initial_state: S, early_goal_test: bool = False, metrics: Optional[SearchMetrics] = None) -> Solution:
     #TODO: ADD YOUR CODE HERE
     # utils.NotImplemented()
     
@@ -25,33 +31,55 @@ def BreadthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
             If it is the goal state it returns the path.
             If it is not the goal state the algorithm loops over all the possible actions in the current state.
 
-        2.The data structure used : Queue
+        2.The data structure used : Queue (and a set of the states in the frontier or explored)
 
         3.Why this data structure is used :
             The data structure is used because it is a FIFO data structure and it is suitable for BFS.   
+            The set allows checking whether a successor was already reached in O(1) instead of scanning the whole queue.
+
+        By default, the goal test is done when a state is popped from the frontier so the calls to "problem.is_goal"
+        follow the expansion order. If early_goal_test is True, the goal test is done when a state is generated instead,
+        which returns the same path but avoids expanding the nodes of the last layer (and changes the is_goal calls).
     '''
+    return run_steps(_breadth_first_search(problem, initial_state, early_goal_test, metrics))
 
-    # create a set to keep track of explored states
-    explored = set()
+# The steps of the breadth first search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _breadth_first_search(problem: Problem[S, A], initial_state: S, early_goal_test: bool = False, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+
+    # create a set to keep track of the reached states (the explored states and the states in the frontier)
+    reached = {initial_state}
+
+    # create a search tree to store the generated nodes
+    # each node stores its state, its parent and the action that generated it
+    # so the path is only built once the goal is found
+    tree = SearchTree()
+    states = tree.states
 
     # create a queue to keep track of the frontier 
+    # the frontier stores the indices of the nodes in the search tree
     frontier = deque()
+    if metrics is not None: metrics.watch_frontier(frontier)
 
-    # add the initial state to the frontier with an empty path
-    frontier.append((initial_state , []))
+    # add the initial state to the frontier as the root of the search tree
+    frontier.append(tree.add_root(initial_state))
+
+    # with early goal testing, the successors are tested when they are generated so the initial state has to be tested here
+    if early_goal_test and problem.is_goal(initial_state):
+        return []
     
     # loop until the frontier is empty
     while frontier :
 
-        # pop the first state from the frontier
-        state , path  = frontier.popleft()
+        # pop the first node from the frontier
+        node = frontier.popleft()
+        state = states[node]
 
         # if the state is the goal state return the path
-        if problem.is_goal(state):
-            return path
+        if not early_goal_test and problem.is_goal(state):
+            return tree.path(node)
 
-        # add the state to the explored set
-        explored.add(state)
+        # report the expansion if someone is listening
+        if listening: yield SearchEvent(state, tree.depth(node), None, len(frontier), functools.partial(tree.path, node))
 
         # loop over all the possible actions in the current state
         for action in problem.get_actions(state):
@@ -60,20 +88,25 @@ def BreadthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
             successor = problem.get_successor(state , action)
 
             # check if the successor is not in the explored set and not in the frontier
-            if successor not in explored and successor not in [x[0] for x in frontier]:
+            if successor not in reached:
 
-                # create a new path by appending the current action to the current path
-                new_path = list(path)
-                new_path.append(action)
+                # add the successor to the reached set, to the search tree and its node to the frontier
+                reached.add(successor)
+                child = tree.add(successor, node, action)
+                frontier.append(child)
 
-                # add the successor to the frontier with the new path
-                frontier.append((successor , new_path)) 
+                # with early goal testing, return as soon as the goal is generated
+                if early_goal_test and problem.is_goal(successor):
+                    return tree.path(child)
 
     # if the frontier is empty and the goal state is not found return None
     # this means that there is no solution                      
     return None   
 
-def DepthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
+BreadthFirstSearchEvents = event_stream(_breadth_first_search, "BreadthFirstSearchEvents")
+
+@with_metrics
+def DepthFirstSearch(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None) -> Solution:
     #TODO: ADD YOUR CODE HERE
     # utils.NotImplemented()
 
@@ -92,22 +125,35 @@ def DepthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
             The data structure is used because it is a LIFO data structure and it is suitable for DFS.
             To mimic the recursive nature of DFS we use a stack to keep track of the frontier.     
     '''
+    return run_steps(_depth_first_search(problem, initial_state, metrics))
+
+# The steps of the depth first search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _depth_first_search(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
     
 
     # create a set to keep track of explored states
     explored = set()
 
+    # create a search tree to store the generated nodes
+    # each node stores its state, its parent and the action that generated it
+    # so the path is only built once the goal is found
+    tree = SearchTree()
+    states = tree.states
+
     # create a queue to keep track of the frontier 
+    # the frontier stores the indices of the nodes in the search tree
     frontier = deque()
+    if metrics is not None: metrics.watch_frontier(frontier)
 
-    # add the initial state to the frontier with an empty path
-    frontier.append((initial_state , []))
+    # add the initial state to the frontier as the root of the search tree
+    frontier.append(tree.add_root(initial_state))
     
     # loop until the frontier is empty
     while frontier :
 
-        # pop the first state from the frontier
-        state , path  = frontier.pop()
+        # pop the last node from the frontier
+        node = frontier.pop()
+        state = states[node]
 
         # if the state is in the explored set continue
         if state in explored:
@@ -115,29 +161,31 @@ def DepthFirstSearch(problem: Problem[S, A], initial_state: S) -> Solution:
         
         # if the state is the goal state return the path
         if problem.is_goal(state):
-            return path
+            return tree.path(node)
 
         # add the state to the explored set
         explored.add(state)
 
+        # report the expansion if someone is listening
+        if listening: yield SearchEvent(state, tree.depth(node), None, len(frontier), functools.partial(tree.path, node))
+
         # loop over all the possible actions in the current state
         for action in problem.get_actions(state):
 
             # get the successors
             successor = problem.get_successor(state , action)
 
-            # create a new path by appending the current action to the current path
-            new_path = list(path)
-            new_path.append(action)
-
-            # add the successor to the frontier with the new path
-            frontier.append((successor , new_path)) 
+            # add the successor to the search tree and its node to the frontier
+            frontier.append(tree.add(successor, node, action)) 
 
     # if the frontier is empty and the goal state is not found return None
     # this means that there is no solution
     return None
 
-def UniformCostSearch(problem: Problem[S, A], initial_state: S) -> Solution:
+DepthFirstSearchEvents = event_stream(_depth_first_search, "DepthFirstSearchEvents")
+
+@with_metrics
+def UniformCostSearch(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None) -> Solution:
     #TODO: ADD YOUR CODE HERE
     # utils.NotImplemented()
 
@@ -150,77 +198,80 @@ def UniformCostSearch(problem: Problem[S, A], initial_state: S) -> Solution:
             If it is the goal state it returns the path.
             If it is not the goal state the algorithm loops over all the possible actions in the current state.
 
-        2.The data structure used : Priority Queue
+        2.The data structure used : Priority Queue (indexed binary heap)
 
         3.Why this data structure is used :
             To get the state with the lowest cost we use a priority queue.
+            The queue is indexed by the state so when a cheaper path to a state in the frontier is found,
+            its cost is decreased in place instead of pushing a duplicate entry.
     '''
+    return run_steps(_uniform_cost_search(problem, initial_state, metrics))
+
+# The steps of the uniform cost search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _uniform_cost_search(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
 
     # create a set to keep track of explored states
     explored = set()
 
-    # create a dictionary to keep track of the cost of each state
-    cost = {initial_state : 0}
+    # create a search tree to store the generated nodes
+    # each node stores its state, its parent and the action that generated it
+    # so the path is only built once the goal is found
+    tree = SearchTree()
 
     # create a priority queue to keep track of the frontier 
-    # the priority queue is a min heap and the priority is the cost of the state
-    # the second element of the tuple is an index to make sure that the priority queue is stable    
-    frontier = []
-    heapq.heappush(frontier, (0 , 0 , initial_state , []))
-
-    # create a counter to keep track of the index to make sure that the priority queue is stable
-    index = 1
+    # the priority queue is an indexed min heap and the priority is the cost of the state
+    # the value stored with each state is the index of its node in the search tree
+    # ties are broken by the insertion order to make sure that the priority queue is stable
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, 0, tree.add_root(initial_state))
 
     while frontier:
 
         # pop the state with the lowest cost from the frontier
-        path_cost , _ , state , path = heapq.heappop(frontier)
-
-        # if the state is in the explored set continue
-        if state in explored:
-            continue
+        state , path_cost , node = frontier.pop()
 
         # if the state is the goal state return the path
         if problem.is_goal(state):
-            return path
+            return tree.path(node)
             
         # add the state to the explored set
         explored.add(state)
 
-        # loop over all the possible actions in the current state
-        for action in problem.get_actions(state):
+        # report the expansion if someone is listening
+        if listening: yield SearchEvent(state, path_cost, path_cost, len(frontier), functools.partial(tree.path, node))
 
-            # get the successors 
-            successor = problem.get_successor(state, action)
+        # loop over all the possible actions in the current state with their successors and costs
+        for action, successor, cost in problem.get_successors(state):
 
             # check if the successor is not in the explored set
             if successor not in explored:
 
                 # calculate the cost of the successor
-                new_cost = path_cost + problem.get_cost(state, action)
-
-                # if the successor have a lower cost than the current cost then continue
-                if successor in cost and new_cost >= cost[successor]:
-                    continue
+                new_cost = path_cost + cost
 
-                # create the new path by appending the current action to the current path
-                new_path = list(path)
-                new_path.append(action)
+                # if the successor is in the frontier
+                if successor in frontier:
 
-                # update the cost of the successor to the new cost in the cost dictionary
-                cost[successor] = new_cost
+                    # if the successor have a lower cost than the current cost then continue
+                    if new_cost >= frontier.priority(successor):
+                        continue
 
-                # add the successor to the frontier with the new path and the new cost
-                heapq.heappush(frontier, (new_cost, index, successor,new_path))
+                    # otherwise, decrease the cost of the successor in the frontier and point it to the new node
+                    frontier.update(successor, new_cost, tree.add(successor, node, action))
 
-                # increment the index
-                index += 1
+                else:
+                    # add the successor to the search tree and to the frontier with the new cost
+                    frontier.push(successor, new_cost, tree.add(successor, node, action))
     
     # if the frontier is empty and the goal state is not found return None
     # this means that there is no solution
     return None
+
+UniformCostSearchEvents = event_stream(_uniform_cost_search, "UniformCostSearchEvents")
            
-def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction) -> Solution:
+@with_metrics
+def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None) -> Solution:
     #TODO: ADD YOUR CODE HERE
     # utils.NotImplemented()
 
@@ -233,11 +284,17 @@ def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFu
             If it is the goal state it returns the path.
             If it is not the goal state the algorithm loops over all the possible actions in the current state.
 
-        2.The data structure used : Priority Queue
+        2.The data structure used : Priority Queue (indexed binary heap)
 
         3.Why this data structure is used :
             To get the state with the lowest estimated cost we use a priority queue.    
+            The queue is indexed by the state so when a cheaper path to a state in the frontier is found,
+            its estimated cost is decreased in place instead of pushing a duplicate entry.
     '''
+    return run_steps(_a_star_search(problem, initial_state, heuristic, metrics))
+
+# The steps of the A* search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
 
     # create a set to keep track of explored states
     explored = set()
@@ -245,74 +302,76 @@ def AStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFu
    # the estimated cost of the initial state is the heuristic value of the initial state
     estimated_cost = heuristic(problem,initial_state)
 
-    # create a dictionary to keep track of the sum of actual cost and heuristic of each state
-    estimated_cost_map = { initial_state : estimated_cost }
+    # create a dictionary to keep track of the actual cost of each state in the frontier
+    # to use it later in the heuristic function of the successors
+    actual_cost_map = { initial_state : 0 }
 
-    # create a priority queue to keep track of the frontier
-    # the priority queue is a min heap and the priority is the sum of actual cost and heuristic of the state
-    # the second element of the tuple is an index to make sure that the priority queue is stable
-    # the third element of the tuple is the actual cost of the state to use it later in the heuristic function of the successors
-    # the fourth element of the tuple is the path to the current state
-    # the fifth element of the tuple is the path
-    frontier = []
-    heapq.heappush(frontier, (estimated_cost , 0 ,0, initial_state , []))
+    # create a search tree to store the generated nodes
+    # each node stores its state, its parent and the action that generated it
+    # so the path is only built once the goal is found
+    tree = SearchTree()
 
-    # create a counter to keep track of the index to make sure that the priority queue is stable
-    index = 1
+    # create a priority queue to keep track of the frontier
+    # the priority queue is an indexed min heap and the priority is the sum of actual cost and heuristic of the state
+    # the value stored with each state is the index of its node in the search tree
+    # ties are broken by the insertion order to make sure that the priority queue is stable
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, estimated_cost, tree.add_root(initial_state))
 
     # loop until the frontier is empty
     while frontier:
 
-        # pop the state with the lowest cost from the frontier
-        _ , _ , actual_cost , state , path = heapq.heappop(frontier)
-
-        # if the state is in the explored set continue
-        if state in explored:
-            continue
+        # pop the state with the lowest estimated cost from the frontier
+        state , estimated_cost , node = frontier.pop()
+        actual_cost = actual_cost_map.pop(state)
 
         # if the state is the goal state return the path
         if problem.is_goal(state):
-            return path
+            return tree.path(node)
 
         # add the state to the explored set
         explored.add(state)
 
-        # loop over all the possible actions in the current state
-        for action in problem.get_actions(state):
+        # report the expansion if someone is listening
+        if listening: yield SearchEvent(state, actual_cost, estimated_cost, len(frontier), functools.partial(tree.path, node))
 
-            # get the successors
-            successor = problem.get_successor(state, action)
+        # loop over all the possible actions in the current state with their successors and costs
+        for action, successor, cost in problem.get_successors(state):
 
             # check if the successor is not in the explored set
             if successor not in explored:
 
                 # calculate the actual cost of the successor
-                new_cost = actual_cost + problem.get_cost(state, action) 
+                new_cost = actual_cost + cost
 
                 # calculate the estimated cost of the successor
                 new_heuristic = heuristic(problem,successor) + new_cost
 
-                # if the successor have a lower cost than the current cost then continue
-                if successor in estimated_cost_map and new_heuristic >= estimated_cost_map[successor]:
-                    continue
+                # if the successor is in the frontier
+                if successor in frontier:
 
-                # create the new path by appending the current action to the current path
-                new_path = list(path)
-                new_path.append(action)
+                    # if the successor have a lower estimated cost than the current estimated cost then continue
+                    if new_heuristic >= frontier.priority(successor):
+                        continue
 
-                # update the estimated cost of the successor to the new estimated cost in the estimated_cost_map dictionary
-                estimated_cost_map[successor] = new_heuristic
+                    # otherwise, decrease the estimated cost of the successor in the frontier and point it to the new node
+                    frontier.update(successor, new_heuristic, tree.add(successor, node, action))
 
-                # add the successor to the frontier with the new path and the new estimated cost
-                heapq.heappush(frontier, (new_heuristic, index,new_cost,  successor, new_path))
+                else:
+                    # add the successor to the search tree and to the frontier with the new estimated cost
+                    frontier.push(successor, new_heuristic, tree.add(successor, node, action))
 
-                # increment the index
-                index += 1
+                # update the actual cost of the successor in the actual_cost_map dictionary
+                actual_cost_map[successor] = new_cost
 
     # if the frontier is empty and the goal state is not found return None
     return None
 
-def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction) -> Solution:
+AStarSearchEvents = event_stream(_a_star_search, "AStarSearchEvents")
+
+@with_metrics
+def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None) -> Solution:
     #TODO: ADD YOUR CODE HERE
     # utils.NotImplemented()
 
@@ -325,11 +384,16 @@ def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: Heurist
             If it is the goal state it returns the path.
             If it is not the goal state the algorithm loops over all the possible actions in the current state.
 
-        2.The data structure used : Priority Queue
+        2.The data structure used : Priority Queue (indexed binary heap)
 
         3.Why this data structure is used :
             To get the state with the lowest heuristic cost we use a priority queue.
+            The queue is indexed by the state so a state is never pushed twice into the frontier.
     '''
+    return run_steps(_best_first_search(problem, initial_state, heuristic, metrics))
+
+# The steps of the greedy best first search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _best_first_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
 
     # create a set to keep track of explored states
     explored = set()
@@ -337,37 +401,35 @@ def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: Heurist
     # the estimated cost of the initial state is the heuristic value of the initial state
     heuristic_cost = heuristic(problem,initial_state)
 
-    # create a dictionary to keep track of the heuristic cost of each state
-    heuristic_cost_map = { initial_state : heuristic_cost }
+    # create a search tree to store the generated nodes
+    # each node stores its state, its parent and the action that generated it
+    # so the path is only built once the goal is found
+    tree = SearchTree()
 
     # create a priority queue to keep track of the frontier
-    # the priority queue is a min heap and the priority is the heuristic cost of the state
-    # the second element of the tuple is an index to make sure that the priority queue is stable
-    # the third element of the tuple is the state
-    # the fourth element of the tuple is the path
-    frontier = []
-    heapq.heappush(frontier, (heuristic_cost , 0 , initial_state, []))
-
-    # create a counter to keep track of the index to make sure that the priority queue is stable
-    index = 1
+    # the priority queue is an indexed min heap and the priority is the heuristic cost of the state
+    # the value stored with each state is the index of its node in the search tree
+    # ties are broken by the insertion order to make sure that the priority queue is stable
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, heuristic_cost, tree.add_root(initial_state))
 
     # loop until the frontier is empty
     while frontier:
 
         # pop the state with the lowest cost from the frontier (the state with the lowest heuristic cost)
-        _ , _ , state , path = heapq.heappop(frontier)
-
-        # if the state is in the explored set continue
-        if state in explored:
-            continue
+        state , heuristic_cost , node = frontier.pop()
 
         # if the state is the goal state return the path
         if problem.is_goal(state):
-            return path
+            return tree.path(node)
 
         # add the state to the explored set
         explored.add(state)
 
+        # report the expansion if someone is listening (greedy best first search does not track the path cost)
+        if listening: yield SearchEvent(state, None, heuristic_cost, len(frontier), functools.partial(tree.path, node))
+
         # loop over all the possible actions in the current state
         for action in problem.get_actions(state):
 
@@ -380,22 +442,875 @@ def BestFirstSearch(problem: Problem[S, A], initial_state: S, heuristic: Heurist
                 # calculate the heuristic cost of the successor
                 new_heuristic = heuristic(problem,successor) 
 
-                # if the successor have a lower cost than the current cost then continue
-                if successor in heuristic_cost_map and new_heuristic >= heuristic_cost_map[successor]:
+                # if the successor is in the frontier
+                if successor in frontier:
+
+                    # if the successor have a lower cost than the current cost then continue
+                    if new_heuristic >= frontier.priority(successor):
+                        continue
+
+                    # otherwise, decrease the heuristic cost of the successor in the frontier and point it to the new node
+                    frontier.update(successor, new_heuristic, tree.add(successor, node, action))
+
+                else:
+                    # add the successor to the search tree and to the frontier with the new heuristic cost
+                    frontier.push(successor, new_heuristic, tree.add(successor, node, action))
+
+    # if the frontier is empty and the goal state is not found return None
+    return None
+
+BestFirstSearchEvents = event_stream(_best_first_search, "BestFirstSearchEvents")
+
+# The bidirectional searches run a forward search from the initial state and a backward search from the goal at the same time
+# and stop once the two searches meet. They need a problem that can be reversed (such as GraphRoutingProblem) where
+# "problem.reverse(initial_state)" returns the problem of going back from the goal to the initial state along the reversed edges.
+# Every expanded state (in both directions) is passed to "is_goal" of its problem so the number of explored nodes
+# can be tracked the same way as the other search functions.
+
+# Join the path from the initial state to a meeting state (stored in the forward tree)
+# with the path from the meeting state to the goal (stored in the backward tree).
+# The backward tree stores the actions of the reversed problem, so every backward step is converted to the (cheapest)
+# forward action that goes from the state to its parent in the backward tree.
+# Rebuilding the path is not part of the search, so it uses the original problem (the calls are not reported to the metrics).
+def _join_paths(problem: Problem[S, A], forward_tree: SearchTree, forward_node: int, backward_tree: SearchTree, backward_node: int) -> Solution:
+    problem = unwrap_problem(problem)
+    path = forward_tree.path(forward_node)
+    states, parents = backward_tree.states, backward_tree.parents
+    node = backward_node
+    while parents[node] != SearchTree.NO_PARENT:
+        state, next_state = states[node], states[parents[node]]
+        path.append(min(
+            (action for action in problem.get_actions(state) if problem.get_successor(state, action) == next_state),
+            key=lambda action: problem.get_cost(state, action)
+        ))
+        node = parents[node]
+    return path
+
+@with_metrics
+def BidirectionalBreadthFirstSearch(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm runs a breadth first search from the initial state and another one from the goal on the reversed problem.
+            In each iteration, the side with the smaller frontier expands its whole frontier (one layer).
+            When a generated state was already reached by the other side, the two searches meet at this state.
+            After the layer is complete, the meeting state with the lowest total depth is used to build the path.
+            Since whole layers are expanded, no shorter path can be found later so the path has the least number of actions.
+
+        2.The data structure used : Two Queues and two dictionaries from the reached states to their nodes
+
+        3.Why this data structure is used :
+            Each side is a breadth first search so it uses a FIFO queue.
+            The dictionaries allow checking in O(1) whether a state was reached by either side.
+    '''
+    return run_steps(_bidirectional_breadth_first_search(problem, initial_state, metrics))
+
+# The steps of the bidirectional breadth first search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _bidirectional_breadth_first_search(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+
+    # create the backward problem which starts at the goal and ends at the initial state
+    backward_problem = problem.reverse(initial_state)
+
+    # create the search tree, the frontier and the reached dictionary of each side
+    sides = []
+    for side_problem, root in ((problem, initial_state), (backward_problem, backward_problem.get_initial_state())):
+        tree = SearchTree()
+        node = tree.add_root(root)
+        sides.append((side_problem, tree, deque([node]), {root: node}))
+        if metrics is not None: metrics.watch_frontier(sides[-1][2])
+    (_, forward_tree, _, forward_reached), (_, backward_tree, _, backward_reached) = sides
+
+    # if the initial state is the goal, no actions are needed
+    if initial_state in backward_reached:
+        problem.is_goal(initial_state)
+        return []
+
+    # loop until one of the frontiers is empty (then there is no solution)
+    while sides[0][2] and sides[1][2]:
+
+        # expand the side with the smaller frontier
+        forward = len(sides[0][2]) <= len(sides[1][2])
+        side_problem, tree, frontier, reached = sides[0] if forward else sides[1]
+        other_tree, other_reached = (backward_tree, backward_reached) if forward else (forward_tree, forward_reached)
+
+        # the best meeting found in this layer as (total depth, node in this tree, node in the other tree)
+        best = None
+
+        # expand every node in the current layer
+        for _ in range(len(frontier)):
+            node = frontier.popleft()
+            state = tree.states[node]
+            side_problem.is_goal(state)
+
+            # report the expansion if someone is listening (the path is only known for the forward side)
+            if listening: yield SearchEvent(state, tree.depth(node), None, len(sides[0][2]) + len(sides[1][2]),
+                                            functools.partial(tree.path, node) if forward else None)
+
+            for action in side_problem.get_actions(state):
+                successor = side_problem.get_successor(state, action)
+                if successor in reached:
                     continue
+                child = tree.add(successor, node, action)
+                reached[successor] = child
+                frontier.append(child)
+
+                # if the other side reached this state, the two searches meet here
+                if successor in other_reached:
+                    other_node = other_reached[successor]
+                    depth = tree.depth(child) + other_tree.depth(other_node)
+                    if best is None or depth < best[0]:
+                        best = (depth, child, other_node)
+
+        # if the searches met during this layer, join the two halves of the best path
+        if best is not None:
+            _, node, other_node = best
+            if forward:
+                return _join_paths(problem, forward_tree, node, backward_tree, other_node)
+            return _join_paths(problem, forward_tree, other_node, backward_tree, node)
 
-                # create the new path by appending the current action to the current path
-                new_path = list(path)
-                new_path.append(action)
+    return None
 
-                # update the heuristic cost of the successor to the new heuristic cost in the heuristic_cost_map dictionary
-                heuristic_cost_map[successor] = new_heuristic
+BidirectionalBreadthFirstSearchEvents = event_stream(_bidirectional_breadth_first_search, "BidirectionalBreadthFirstSearchEvents")
+
+# This is the shared implementation of the bidirectional uniform cost search and the bidirectional A* search.
+# Each side is a uniform cost search on the costs reduced by a potential function p where the reduced cost of an edge (u, v)
+# is cost(u, v) - p(u) + p(v) for the forward side and cost(u, v) + p(u) - p(v) for the backward side.
+# For the uniform cost search p is 0. For A*, p(v) = (h_forward(v) - h_backward(v)) / 2 which keeps the reduced costs
+# non-negative as long as both heuristics are consistent.
+# So the priority of a state is g_forward(v) + p(v) in the forward frontier and g_backward(v) - p(v) in the backward frontier.
+# Every time a state is reached by both sides, the cost of the path through it is a candidate for the best path (mu).
+# The search stops when the sum of the lowest priorities of the two frontiers is not less than mu,
+# since every path that was not found yet has to cost at least this sum.
+def _bidirectional_best_first_search(problem: Problem[S, A], initial_state: S, potential, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    backward_problem = problem.reverse(initial_state)
+    goal = backward_problem.get_initial_state()
+
+    # the potential is computed once per state and stored since both sides need it
+    potentials = {}
+    def get_potential(state: S) -> float:
+        value = potentials.get(state)
+        if value is None:
+            value = potentials[state] = potential(backward_problem, state)
+        return value
+
+    # each side stores: its problem, its tree, its frontier, the explored set, the path cost and the node of every reached state
+    # and the sign of the potential in its priority
+    sides = []
+    for side_problem, root, sign in ((problem, initial_state, 1), (backward_problem, goal, -1)):
+        tree = SearchTree()
+        node = tree.add_root(root)
+        frontier = IndexedPriorityQueue()
+        if metrics is not None: metrics.watch_frontier(frontier)
+        frontier.push(root, sign * get_potential(root), node)
+        sides.append((side_problem, tree, frontier, set(), {root: 0}, {root: node}, sign))
+
+    # the cost of the best path found so far and the nodes of its meeting state in the forward and backward trees
+    best_cost, best_nodes = float('inf'), None
+    if initial_state == goal:
+        best_cost, best_nodes = 0, (sides[0][5][initial_state], sides[1][5][goal])
+
+    while sides[0][2] and sides[1][2]:
+
+        # stop if no path through the unexplored states can be cheaper than the best path
+        forward_top, backward_top = sides[0][2].peek()[1], sides[1][2].peek()[1]
+        if forward_top + backward_top >= best_cost:
+            break
+
+        # expand the side with the lowest priority
+        forward = forward_top <= backward_top
+        side_problem, tree, frontier, explored, cost, nodes, sign = sides[0] if forward else sides[1]
+        _, _, _, _, other_cost, other_nodes, _ = sides[1] if forward else sides[0]
+
+        state, priority, node = frontier.pop()
+        path_cost = cost[state]
+        side_problem.is_goal(state)
+        explored.add(state)
 
-                # add the successor to the frontier with the new path and the new heuristic cost
-                heapq.heappush(frontier, (new_heuristic, index,  successor , new_path))
+        # report the expansion if someone is listening (the path is only known for the forward side)
+        if listening: yield SearchEvent(state, path_cost, priority, len(sides[0][2]) + len(sides[1][2]),
+                                        functools.partial(tree.path, node) if forward else None)
+
+        for action in side_problem.get_actions(state):
+            successor = side_problem.get_successor(state, action)
+            if successor in explored:
+                continue
+            new_cost = path_cost + side_problem.get_cost(state, action)
+            if successor in frontier:
+                if new_cost >= cost[successor]:
+                    continue
+                child = tree.add(successor, node, action)
+                frontier.update(successor, new_cost + sign * get_potential(successor), child)
+            else:
+                child = tree.add(successor, node, action)
+                frontier.push(successor, new_cost + sign * get_potential(successor), child)
+            cost[successor] = new_cost
+            nodes[successor] = child
+
+            # if the other side reached this state, check if the path through it is the best one so far
+            if successor in other_cost and new_cost + other_cost[successor] < best_cost:
+                best_cost = new_cost + other_cost[successor]
+                best_nodes = (child, other_nodes[successor]) if forward else (other_nodes[successor], child)
+
+    if best_nodes is None:
+        return None
+    return _join_paths(problem, sides[0][1], best_nodes[0], sides[1][1], best_nodes[1])
+
+@with_metrics
+def BidirectionalUniformCostSearch(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm runs a uniform cost search from the initial state and another one from the goal on the reversed problem.
+            In each iteration the side whose frontier has the lowest cost pops and expands its state.
+            Whenever a state is reached by both sides, the cost of the path through this state is compared with the best path so far.
+            The search stops when the sum of the lowest costs in the two frontiers is not less than the cost of the best path.
 
-                # increment the index
-                index += 1
+        2.The data structure used : Two Priority Queues (indexed binary heaps)
 
-    # if the frontier is empty and the goal state is not found return None
-    return None
\ No newline at end of file
+        3.Why this data structure is used :
+            Each side is a uniform cost search so it needs to pop the state with the lowest cost.
+    '''
+    return run_steps(_bidirectional_uniform_cost_search(problem, initial_state, metrics))
+
+# The steps of the bidirectional uniform cost search (see "search_events.py")
+def _bidirectional_uniform_cost_search(problem: Problem[S, A], initial_state: S, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    return _bidirectional_best_first_search(problem, initial_state, lambda backward_problem, state: 0, metrics, listening)
+
+BidirectionalUniformCostSearchEvents = event_stream(_bidirectional_uniform_cost_search, "BidirectionalUniformCostSearchEvents")
+
+@with_metrics
+def BidirectionalAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm is a bidirectional uniform cost search where the priorities are adjusted by the average of
+            the forward heuristic (to the goal) and the backward heuristic (to the initial state on the reversed problem).
+            The forward side uses g(state) + (h_forward(state) - h_backward(state)) / 2
+            and the backward side uses g(state) + (h_backward(state) - h_forward(state)) / 2.
+            Using the average keeps both sides consistent with each other so the same stopping rule as the
+            bidirectional uniform cost search finds the optimal path (as long as the heuristic is consistent).
+
+        2.The data structure used : Two Priority Queues (indexed binary heaps)
+
+        3.Why this data structure is used :
+            Each side needs to pop the state with the lowest adjusted priority.
+    '''
+    return run_steps(_bidirectional_a_star_search(problem, initial_state, heuristic, metrics))
+
+# The steps of the bidirectional A* search (see "search_events.py")
+def _bidirectional_a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    return _bidirectional_best_first_search(problem, initial_state,
+        lambda backward_problem, state: (heuristic(problem, state) - heuristic(backward_problem, state)) / 2, metrics, listening)
+
+BidirectionalAStarSearchEvents = event_stream(_bidirectional_a_star_search, "BidirectionalAStarSearchEvents")
+
+@with_metrics
+def IterativeDeepeningAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, max_transpositions: int = 2**16, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm runs a series of depth first searches where each search only goes through states whose
+            estimated cost (actual cost + heuristic) does not exceed a bound.
+            The first bound is the heuristic of the initial state and every following bound is the lowest estimated cost
+            that exceeded the previous bound, so the first goal found is optimal (as long as the heuristic is admissible).
+            The states on the current path are skipped to avoid cycles.
+            A bounded transposition table stores the lowest cost with which each state was reached in the current iteration
+            so a state that is reached again with a higher or equal cost is not searched twice.
+
+        2.The data structure used : Stack (and a bounded dictionary for the transposition table)
+
+        3.Why this data structure is used :
+            The memory used by the depth first search only grows with the depth of the path
+            and the transposition table never grows beyond max_transpositions entries.
+    '''
+    return run_steps(_iterative_deepening_a_star_search(problem, initial_state, heuristic, max_transpositions, metrics))
+
+# The steps of the iterative deepening A* search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _iterative_deepening_a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, max_transpositions: int = 2**16, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+
+    # if the initial state is the goal state, no actions are needed
+    if problem.is_goal(initial_state):
+        return []
+
+    bound = heuristic(problem, initial_state)
+
+    while True:
+
+        # the lowest estimated cost that exceeded the bound in this iteration
+        next_bound = float('inf')
+
+        # the transposition table, the actions on the current path and the states on the current path
+        best_costs = {initial_state: 0}
+        path = []
+        on_path = {initial_state}
+
+        # the stack of the depth first search where every frame contains a state, its cost and an iterator over its actions
+        stack = [(initial_state, 0, iter(problem.get_actions(initial_state)))]
+        if metrics is not None: metrics.watch_frontier(stack)
+
+        while stack:
+            state, path_cost, actions = stack[-1]
+
+            # if all the actions of the state are done, backtrack
+            action = next(actions, _NO_ACTION)
+            if action is _NO_ACTION:
+                stack.pop()
+                on_path.discard(state)
+                if path: path.pop()
+                continue
+
+            successor = problem.get_successor(state, action)
+            if successor in on_path:
+                continue
+            new_cost = path_cost + problem.get_cost(state, action)
+
+            # if the estimated cost exceeds the bound, the successor is left for the next iterations
+            estimated_cost = new_cost + heuristic(problem, successor)
+            if estimated_cost > bound:
+                next_bound = min(next_bound, estimated_cost)
+                continue
+
+            # if the successor was already reached in this iteration with a lower or equal cost, skip it
+            known_cost = best_costs.get(successor)
+            if known_cost is not None and known_cost <= new_cost:
+                continue
+            if known_cost is not None or len(best_costs) < max_transpositions:
+                best_costs[successor] = new_cost
+
+            if problem.is_goal(successor):
+                path.append(action)
+                return path
+
+            path.append(action)
+            on_path.add(successor)
+
+            # report the expansion if someone is listening
+            if listening: yield SearchEvent(successor, new_cost, estimated_cost, len(stack) + 1, functools.partial(list, tuple(path)))
+
+            stack.append((successor, new_cost, iter(problem.get_actions(successor))))
+
+        # if no state exceeded the bound, the whole reachable space was searched and there is no solution
+        if next_bound == float('inf'):
+            return None
+        bound = next_bound
+
+IterativeDeepeningAStarSearchEvents = event_stream(_iterative_deepening_a_star_search, "IterativeDeepeningAStarSearchEvents")
+
+# This is used to detect the end of an iterator without catching StopIteration
+_NO_ACTION = object()
+
+# A node of the tree stored by the simplified memory-bounded A* search
+class _MemoryBoundedNode:
+    __slots__ = ("id", "state", "parent", "action", "cost", "f", "depth", "children", "forgotten")
+
+    def __init__(self, id: int, state, parent: '_MemoryBoundedNode', action, cost: float, f: float) -> None:
+        self.id = id                # A unique index used as the key of the node in the priority queues
+        self.state = state
+        self.parent = parent
+        self.action = action        # The action that generated this node from its parent
+        self.cost = cost            # The actual cost of the path from the initial state to this node
+        self.f = f                  # The estimated cost (backed up from the children once they are generated)
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = []          # The children that are currently in memory
+        self.forgotten = float('inf')   # The lowest estimated cost of the children that were removed to free memory
+
+    def path(self) -> List:
+        path, node = [], self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+@with_metrics
+def SimplifiedMemoryBoundedAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, max_nodes: int = 100000, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm works like A* on a search tree that never holds more than max_nodes nodes.
+            It expands the node with the lowest estimated cost (the deepest one if there is a tie).
+            When the memory is full, the leaf with the highest estimated cost (the shallowest one if there is a tie) is forgotten
+            and its estimated cost is remembered by its parent. A parent with forgotten children goes back to the frontier
+            with the lowest forgotten estimate so the forgotten branches are generated again if they become the best option.
+            After every expansion, the estimated cost of a node is backed up as the lowest estimated cost of its children,
+            so the estimates become more accurate as the search goes on.
+            The states on the path of a node are not generated as its children,
+            and a successor is skipped if the same state is already in memory with a lower or equal cost.
+            The path is optimal (as long as the heuristic is admissible) if max_nodes is larger than the length of the optimal path,
+            otherwise the search returns None. If max_nodes is small, the search can spend a lot of time generating the same nodes again.
+
+        2.The data structure used : Two Priority Queues (indexed binary heaps)
+
+        3.Why this data structure is used :
+            One queue gives the best node to expand and the other gives the worst leaf to forget.
+            Both need to remove arbitrary nodes and to change priorities when the estimates are backed up.
+    '''
+    return run_steps(_simplified_memory_bounded_a_star_search(problem, initial_state, heuristic, max_nodes, metrics))
+
+# The steps of the simplified memory-bounded A* search which yield a SearchEvent for every expansion if listening is True (see "search_events.py")
+def _simplified_memory_bounded_a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, max_nodes: int = 100000, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+
+    infinity = float('inf')
+    max_nodes = max(max_nodes, 2)
+    next_id = 0
+    def create_node(state, parent, action, cost, f):
+        nonlocal next_id
+        next_id += 1
+        return _MemoryBoundedNode(next_id - 1, state, parent, action, cost, f)
+
+    # Adds a node to a queue or changes its priority if it is already there
+    def enqueue(queue: IndexedPriorityQueue, node: _MemoryBoundedNode, priority):
+        if node.id in queue:
+            queue.update(node.id, priority, node)
+        else:
+            queue.push(node.id, priority, node)
+
+    root = create_node(initial_state, None, None, 0, heuristic(problem, initial_state))
+    node_count = 1
+
+    # the nodes that can be expanded (the leaves and the nodes with forgotten children) ordered by (estimate, -depth)
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(root.id, (root.f, 0), root)
+    # the leaves that can be forgotten ordered by (-estimate, depth) so the worst leaf is on the top
+    leaves = IndexedPriorityQueue()
+
+    # the node in memory with the lowest cost for every state
+    in_memory = {initial_state: root}
+
+    # Updates the estimate of a node from its children and propagates the change up the tree
+    def back_up(node: _MemoryBoundedNode):
+        while node is not None and node.children:
+            estimate = min(node.forgotten, min(child.f for child in node.children))
+            if estimate == node.f:
+                break
+            node.f = estimate
+            node = node.parent
+
+    # Removes a leaf from the tree and lets its parent remember its estimate
+    def forget(node: _MemoryBoundedNode):
+        nonlocal node_count
+        node_count -= 1
+        if node.id in frontier: frontier.remove(node.id)
+        if node.id in leaves: leaves.remove(node.id)
+        if in_memory.get(node.state) is node: del in_memory[node.state]
+        parent = node.parent
+        parent.children.remove(node)
+        parent.forgotten = min(parent.forgotten, node.f)
+        if parent.children:
+            # the parent goes back to the frontier to generate its forgotten children again when they are the best option
+            if parent.forgotten < infinity:
+                enqueue(frontier, parent, (parent.forgotten, -parent.depth))
+        elif parent.forgotten < infinity:
+            # the parent becomes a leaf again
+            parent.f = max(parent.f, parent.forgotten)
+            enqueue(frontier, parent, (parent.f, -parent.depth))
+            if parent.parent is not None:
+                enqueue(leaves, parent, (-parent.f, parent.depth))
+        elif parent.parent is not None:
+            # none of the children of the parent can reach the goal, so the parent is a dead end
+            parent.f = infinity
+            forget(parent)
+
+    while frontier:
+        _, (estimate, _), node = frontier.peek()
+        if estimate == infinity:
+            return None
+
+        if problem.is_goal(node.state):
+            return node.path()
+
+        frontier.pop()
+        if node.id in leaves: leaves.remove(node.id)
+
+        # report the expansion if someone is listening
+        if listening: yield SearchEvent(node.state, node.cost, estimate, len(frontier), node.path)
+
+        # generate the successors that are not in memory (all of them the first time, the forgotten ones later)
+        ancestors = set()
+        ancestor = node
+        while ancestor is not None:
+            ancestors.add(ancestor.state)
+            ancestor = ancestor.parent
+        existing = {child.state for child in node.children}
+        successors = []
+        for action in problem.get_actions(node.state):
+            successor = problem.get_successor(node.state, action)
+            if successor in ancestors or successor in existing:
+                continue
+            cost = node.cost + problem.get_cost(node.state, action)
+            other = in_memory.get(successor)
+            if other is not None and other.cost <= cost:
+                continue
+            # the estimate of a child can not be lower than the estimate of its parent (pathmax)
+            # and a child at the maximum depth can not be expanded since its path fills the memory
+            if node.depth + 1 >= max_nodes - 1:
+                continue
+            f = max(cost + heuristic(problem, successor), node.f)
+            successors.append((f, len(successors), successor, action, cost))
+        node.forgotten = infinity
+        successors.sort()
+
+        # add the successors (best first) while making room by forgetting the worst leaves
+        for f, _, successor, action, cost in successors:
+            if node_count >= max_nodes:
+                # if there is no leaf that is worse than the successor, the successor is forgotten instead
+                if not leaves or (-f, node.depth + 1) <= leaves.peek()[1]:
+                    node.forgotten = min(node.forgotten, f)
+                    continue
+                forget(leaves.peek()[2])
+            child = create_node(successor, node, action, cost, f)
+            node.children.append(child)
+            node_count += 1
+            in_memory[successor] = child
+            frontier.push(child.id, (child.f, -child.depth), child)
+            leaves.push(child.id, (-child.f, child.depth), child)
+
+        if node.children:
+            if node.id in leaves: leaves.remove(node.id)
+            if node.forgotten < infinity:
+                enqueue(frontier, node, (node.forgotten, -node.depth))
+            back_up(node)
+        elif node.forgotten < infinity:
+            if not leaves and node_count >= max_nodes:
+                # the memory is filled with the path to this node so the search can not continue
+                return None
+            node.f = max(node.f, node.forgotten)
+            enqueue(frontier, node, (node.f, -node.depth))
+            if node.parent is not None:
+                enqueue(leaves, node, (-node.f, node.depth))
+            back_up(node.parent)
+        elif node.parent is None:
+            # the initial state has no successors that can reach the goal
+            return None
+        else:
+            # the node is a dead end
+            node.f = infinity
+            forget(node)
+
+    return None
+
+SimplifiedMemoryBoundedAStarSearchEvents = event_stream(_simplified_memory_bounded_a_star_search, "SimplifiedMemoryBoundedAStarSearchEvents")
+
+# The anytime searches below find a first solution quickly by inflating the heuristic with a weight (the suboptimality factor)
+# then they improve the solution while the time budget lasts.
+# If time_limit is None, they return the first solution, whose cost is at most weight times the optimal cost.
+# Otherwise, they keep improving the solution until it is proven optimal or the time limit (in seconds) is reached,
+# then they return the best solution found (None if no solution was found in time). Use time_limit=float('inf') to continue until the optimal solution.
+# Every solution comes with a proven bound: its cost divided by the lowest g + h of the states that can still lead to a cheaper solution.
+# Their event variants yield an IncumbentEvent every time the solution or its bound improves (see "search_events.py").
+# The bounds need an admissible heuristic, and the bound of the first solution (weight) needs a consistent heuristic.
+
+# Returns the proven suboptimality bound of a solution given a lower bound of the cost of any cheaper solution
+def _suboptimality_bound(cost: float, lower_bound: float) -> float:
+    lower_bound = min(cost, lower_bound)
+    if cost == lower_bound:
+        return 1.0
+    return cost / lower_bound if lower_bound > 0 else float('inf')
+
+@with_metrics
+def WeightedAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 2.0, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm works like A* but the priority of a state is g(state) + weight * h(state),
+            so it prefers the states that look closer to the goal and finds a solution after expanding fewer states.
+            The cost of the first solution is at most weight times the optimal cost.
+            If a time limit is given, the search continues after the first solution (anytime weighted A*):
+            the states whose g + h is not less than the cost of the best solution are pruned, an explored state is opened again
+            when a cheaper path to it is found, and every goal that is cheaper than the best solution replaces it.
+            The best solution is optimal once the frontier is empty.
+
+        2.The data structure used : Priority Queue (indexed binary heap)
+
+        3.Why this data structure is used :
+            To get the state with the lowest weighted priority and to decrease the priority of a state in place
+            when a cheaper path to it is found.
+    '''
+    return run_steps(_weighted_a_star_search(problem, initial_state, heuristic, weight, time_limit, metrics))
+
+# The steps of the weighted A* search (see "search_events.py")
+def _weighted_a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 2.0, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    infinity = float('inf')
+
+    # the cost of the cheapest path found to every state and the heuristic of every state
+    # the heuristic is stored since a state can be opened again
+    costs = {initial_state: 0}
+    heuristics = {initial_state: heuristic(problem, initial_state)}
+
+    tree = SearchTree()
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, weight * heuristics[initial_state], tree.add_root(initial_state))
+
+    # the best solution found so far and its cost
+    best, best_cost = None, infinity
+
+    while frontier:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return best
+
+        state, priority, node = frontier.pop()
+        cost = costs[state]
+
+        # skip the states that can not lead to a cheaper solution
+        if cost + heuristics[state] >= best_cost:
+            continue
+
+        if problem.is_goal(state):
+            best, best_cost = tree.path(node), cost
+            if listening:
+                lower_bound = min((costs[other] + heuristics[other] for other in frontier), default=infinity)
+                yield IncumbentEvent(best, best_cost, _suboptimality_bound(best_cost, lower_bound), time.perf_counter() - start)
+            if deadline is None:
+                return best
+            continue
+
+        if listening: yield SearchEvent(state, cost, priority, len(frontier), functools.partial(tree.path, node))
+
+        for action, successor, step_cost in problem.get_successors(state):
+            new_cost = cost + step_cost
+
+            # skip the successor if it was already reached with a lower or equal cost
+            if new_cost >= costs.get(successor, infinity):
+                continue
+            h = heuristics.get(successor)
+            if h is None:
+                h = heuristics[successor] = heuristic(problem, successor)
+            if new_cost + h >= best_cost:
+                continue
+
+            # otherwise, add it to the frontier (or decrease its priority) even if it was explored before
+            costs[successor] = new_cost
+            child = tree.add(successor, node, action)
+            if successor in frontier:
+                frontier.update(successor, new_cost + weight * h, child)
+            else:
+                frontier.push(successor, new_cost + weight * h, child)
+
+    # the frontier is empty so no cheaper solution exists
+    if listening and best is not None:
+        yield IncumbentEvent(best, best_cost, 1.0, time.perf_counter() - start)
+    return best
+
+WeightedAStarSearchEvents = event_stream(_weighted_a_star_search, "WeightedAStarSearchEvents")
+
+@with_metrics
+def AnytimeRepairingAStarSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 3.0, weight_step: float = 0.5, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm (ARA*) runs a series of weighted A* searches where the weight is decreased by weight_step after every search
+            until it reaches 1. Every search continues from the frontier of the previous one instead of starting again:
+            in a search, every state is expanded at most once, and an explored state that is reached again by a cheaper path
+            is only remembered as inconsistent. When the search ends, the inconsistent states go back to the frontier and
+            the priorities of the frontier are computed again with the new weight.
+            A search ends when the best solution is not more expensive than the lowest priority in the frontier,
+            which proves that the solution costs at most weight times the optimal cost.
+
+        2.The data structure used : Priority Queue (indexed binary heap) and a set for the inconsistent states
+
+        3.Why this data structure is used :
+            To get the state with the lowest weighted priority, to decrease the priority of a state in place
+            and to update all the priorities when the weight changes.
+    '''
+    return run_steps(_anytime_repairing_a_star_search(problem, initial_state, heuristic, weight, weight_step, time_limit, metrics))
+
+# The steps of the anytime repairing A* search (see "search_events.py")
+def _anytime_repairing_a_star_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 3.0, weight_step: float = 0.5, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    infinity = float('inf')
+    weight = max(weight, 1.0)
+
+    # the cost of the cheapest path found to every state, the heuristic of every state and the node of the cheapest path in the search tree
+    costs = {initial_state: 0}
+    heuristics = {initial_state: heuristic(problem, initial_state)}
+    tree = SearchTree()
+    nodes = {initial_state: tree.add_root(initial_state)}
+
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, weight * heuristics[initial_state], nodes[initial_state])
+
+    # the states expanded in the current search and the expanded states whose cost decreased after their expansion
+    explored = set()
+    inconsistent = set()
+
+    best, best_cost = None, infinity
+    reported_bound = infinity
+
+    while True:
+
+        # expand the states until the best solution is not more expensive than the lowest priority in the frontier
+        while frontier and frontier.peek()[1] < best_cost:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return best
+
+            state, priority, node = frontier.pop()
+            cost = costs[state]
+            explored.add(state)
+
+            if problem.is_goal(state):
+                # the goal is not expanded, it only replaces the best solution
+                if cost < best_cost:
+                    best, best_cost = tree.path(node), cost
+                continue
+
+            if listening: yield SearchEvent(state, cost, priority, len(frontier), functools.partial(tree.path, node))
+
+            for action, successor, step_cost in problem.get_successors(state):
+                new_cost = cost + step_cost
+                if new_cost >= costs.get(successor, infinity):
+                    continue
+                costs[successor] = new_cost
+                h = heuristics.get(successor)
+                if h is None:
+                    h = heuristics[successor] = heuristic(problem, successor)
+                child = nodes[successor] = tree.add(successor, node, action)
+                if successor in explored:
+                    inconsistent.add(successor)
+                elif successor in frontier:
+                    frontier.update(successor, new_cost + weight * h, child)
+                else:
+                    frontier.push(successor, new_cost + weight * h, child)
+
+        # the frontier is empty and no goal was found so there is no solution
+        if best is None:
+            return None
+
+        # every cheaper solution has to go through a state in the frontier or an inconsistent state
+        lower_bound = min((costs[other] + heuristics[other] for other in (*frontier, *inconsistent)), default=infinity)
+        bound = min(weight, _suboptimality_bound(best_cost, lower_bound))
+        if listening and bound < reported_bound:
+            reported_bound = bound
+            yield IncumbentEvent(best, best_cost, bound, time.perf_counter() - start)
+        if deadline is None or bound <= 1 or weight <= 1:
+            return best
+
+        # decrease the weight, move the inconsistent states to the frontier and update the priorities with the new weight
+        weight = max(1.0, weight - weight_step) if weight_step > 0 else 1.0
+        for state in inconsistent:
+            if state not in frontier:
+                frontier.push(state, 0, nodes[state])
+        for state in list(frontier):
+            frontier.update(state, costs[state] + weight * heuristics[state], nodes[state])
+        explored = set()
+        inconsistent = set()
+
+AnytimeRepairingAStarSearchEvents = event_stream(_anytime_repairing_a_star_search, "AnytimeRepairingAStarSearchEvents")
+
+@with_metrics
+def FocalSearch(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 2.0, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None) -> Solution:
+    '''
+        1.What the algorithm does :
+            the algorithm (A*-epsilon) keeps the frontier ordered by f = g + h like A*, so the lowest f in the frontier is a lower bound of the optimal cost.
+            The focal list contains the states of the frontier whose f is at most weight times the lowest f,
+            and the state that is expanded is the one in the focal list with the lowest heuristic (the one that looks closest to the goal).
+            So the search moves greedily towards the goal while the cost of the first solution stays within weight times the optimal cost.
+            If a time limit is given, the search continues after the first solution like the anytime weighted A* search
+            until the lowest f in the frontier is not less than the cost of the best solution.
+
+        2.The data structure used : Two Priority Queues (indexed binary heaps) and a heap of the states waiting to enter the focal list
+
+        3.Why this data structure is used :
+            The frontier gives the lowest f, the focal list gives the state with the lowest heuristic,
+            and the waiting heap gives the states that enter the focal list when the lowest f increases.
+    '''
+    return run_steps(_focal_search(problem, initial_state, heuristic, weight, time_limit, metrics))
+
+# The steps of the focal search (see "search_events.py")
+def _focal_search(problem: Problem[S, A], initial_state: S, heuristic: HeuristicFunction, weight: float = 2.0, time_limit: Optional[float] = None, metrics: Optional[SearchMetrics] = None, listening: bool = False) -> SearchSteps:
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    infinity = float('inf')
+
+    costs = {initial_state: 0}
+    heuristics = {initial_state: heuristic(problem, initial_state)}
+    tree = SearchTree()
+    nodes = {initial_state: tree.add_root(initial_state)}
+
+    # the frontier ordered by f = g + h
+    frontier = IndexedPriorityQueue()
+    if metrics is not None: metrics.watch_frontier(frontier)
+    frontier.push(initial_state, heuristics[initial_state], nodes[initial_state])
+    # the states of the frontier whose f is within the limit ordered by (h, f)
+    focal = IndexedPriorityQueue()
+    focal.push(initial_state, (heuristics[initial_state], heuristics[initial_state]), nodes[initial_state])
+    # the states of the frontier that are not in the focal list as (f, order, state)
+    # the entries become outdated when the state leaves the frontier or its f changes, and they are skipped when they are popped
+    waiting = []
+    order = 0
+
+    best, best_cost = None, infinity
+
+    while frontier:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return best
+
+        # if no state in the frontier can lead to a cheaper solution, the best solution is optimal
+        lowest = frontier.peek()[1]
+        if lowest >= best_cost:
+            break
+        limit = weight * lowest
+
+        # move the waiting states whose f is within the limit to the focal list
+        while waiting and waiting[0][0] <= limit:
+            f, _, state = heapq.heappop(waiting)
+            if state in frontier and state not in focal and frontier.priority(state) == f:
+                focal.push(state, (heuristics[state], f), nodes[state])
+
+        # pop the state with the lowest heuristic from the focal list
+        # (if the lowest f decreased, which can happen with an inconsistent heuristic, the states above the limit go back to waiting)
+        state, (h, f), node = focal.pop()
+        while f > limit:
+            heapq.heappush(waiting, (f, order, state))
+            order += 1
+            state, (h, f), node = focal.pop()
+        frontier.remove(state)
+        cost = costs[state]
+
+        # skip the states that can not lead to a cheaper solution
+        if f >= best_cost:
+            continue
+
+        if problem.is_goal(state):
+            best, best_cost = tree.path(node), cost
+            if listening:
+                lower_bound = frontier.peek()[1] if frontier else infinity
+                yield IncumbentEvent(best, best_cost, _suboptimality_bound(best_cost, lower_bound), time.perf_counter() - start)
+            if deadline is None:
+                return best
+            continue
+
+        if listening: yield SearchEvent(state, cost, f, len(frontier), functools.partial(tree.path, node))
+
+        for action, successor, step_cost in problem.get_successors(state):
+            new_cost = cost + step_cost
+            if new_cost >= costs.get(successor, infinity):
+                continue
+            h = heuristics.get(successor)
+            if h is None:
+                h = heuristics[successor] = heuristic(problem, successor)
+            new_f = new_cost + h
+            if new_f >= best_cost:
+                continue
+
+            # add the successor to the frontier (or decrease its f) even if it was explored before
+            costs[successor] = new_cost
+            child = nodes[successor] = tree.add(successor, node, action)
+            if successor in frontier:
+                frontier.update(successor, new_f, child)
+            else:
+                frontier.push(successor, new_f, child)
+
+            # put the successor in the focal list if its f is within the limit, otherwise it waits
+            if successor in focal:
+                focal.remove(successor)
+            if new_f <= limit:
+                focal.push(successor, (h, new_f), child)
+            else:
+                heapq.heappush(waiting, (new_f, order, successor))
+                order += 1
+
+    # no state in the frontier can lead to a cheaper solution
+    if listening and best is not None:
+        yield IncumbentEvent(best, best_cost, 1.0, time.perf_counter() - start)
+    return best
+
+FocalSearchEvents = event_stream(_focal_search, "FocalSearchEvents")
@@ -0,0 +1,139 @@
+from typing import Any, Callable, Generator, Iterator, List, Optional, Union
+from dataclasses import dataclass
+import functools, time
+
+from problem import Solution
+
+# This file contains the events that the search functions can report while they run and a driver that runs a search under a budget.
+# Every search function in search.py has an event variant (with the suffix "Events", e.g. "AStarSearchEvents") which is a generator
+# that takes the same arguments. It yields a SearchEvent every time a state is expanded and finally a SolutionEvent:
+#   for event in AStarSearchEvents(problem, initial_state, heuristic):
+#       if isinstance(event, SolutionEvent): print(event.solution)
+#       else: print(event.state, event.g, event.f, event.frontier_size)
+# The anytime searches (e.g. "AnytimeRepairingAStarSearchEvents") also yield an IncumbentEvent every time they find a better solution.
+# Stopping the iteration (or closing the generator) cancels the search.
+# The search functions themselves run the same code without creating any events, so they do not pay for the events when nobody is listening.
+
+# The event reported when a state is expanded
+#   g is the cost (or the depth for the uninformed searches) of the path to the state (None if the search does not track it)
+#   f is the priority of the state in the frontier (None for the uninformed searches)
+#   frontier_size is the total number of nodes in the frontier(s)
+class SearchEvent:
+    __slots__ = ("state", "g", "f", "frontier_size", "_path")
+
+    def __init__(self, state: Any, g: Optional[float], f: Optional[float], frontier_size: int, path: Optional[Callable[[], List]] = None) -> None:
+        self.state = state
+        self.g = g
+        self.f = f
+        self.frontier_size = frontier_size
+        self._path = path   # A function that builds the path to the state (None if the path is not known, e.g. in the backward search)
+
+    # The heuristic part of the priority (the priority itself if the cost is not tracked)
+    @property
+    def h(self) -> Optional[float]:
+        if self.f is None: return None
+        return self.f if self.g is None else self.f - self.g
+
+    # Returns the list of actions from the initial state to this state (None if it is not known)
+    def path(self) -> Optional[List]:
+        return None if self._path is None else self._path()
+
+    def __repr__(self) -> str:
+        return f"SearchEvent(state={self.state}, g={self.g}, f={self.f}, frontier_size={self.frontier_size})"
+
+# The last event of a search which contains the solution (None if there is no solution)
+@dataclass
+class SolutionEvent:
+    solution: Solution
+
+# The event reported by the anytime searches every time they find a better solution
+#   cost is the cost of the solution and bound is the proven suboptimality bound (the solution costs at most bound * the optimal cost)
+#   elapsed is the time (in seconds) since the search started
+@dataclass
+class IncumbentEvent:
+    solution: Solution
+    cost: float
+    bound: float
+    elapsed: float
+
+# The generator returned by the private search implementations
+# It only yields events if it was created with listening=True, and it returns the solution
+SearchSteps = Generator[Union[SearchEvent, IncumbentEvent], None, Solution]
+
+# Run the steps of a search that is not listened to and return its solution
+def run_steps(steps: SearchSteps) -> Solution:
+    try:
+        while True: next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+# Create the event variant of a search from its steps function
+def event_stream(steps_fn: Callable[..., SearchSteps], name: str) -> Callable[..., Iterator[Union[SearchEvent, IncumbentEvent, SolutionEvent]]]:
+    def events(problem, initial_state, *args, **kwargs) -> Iterator[Union[SearchEvent, IncumbentEvent, SolutionEvent]]:
+        solution = yield from steps_fn(problem, initial_state, *args, listening=True, **kwargs)
+        yield SolutionEvent(solution)
+    events.__name__ = events.__qualname__ = name
+    events.__module__ = steps_fn.__module__
+    return events
+
+# The result of a search that ran under a budget
+#   status is one of: "solved", "no solution", "time limit" or "node limit"
+#   if the search was stopped before finishing, solution is the best solution found by an anytime search (if any)
+#   and partial is the path to the most promising expanded state (the lowest h, then the highest g)
+@dataclass
+class SearchOutcome:
+    status: str
+    solution: Solution = None
+    partial: Optional[List] = None
+    partial_state: Any = None
+    expanded: int = 0
+    elapsed: float = 0
+
+# Run an event stream until it finishes or until the time limit (in seconds) or the node limit (expansions) is reached
+# If "on_event" is given, it is called with every SearchEvent (e.g. to show the progress)
+def run_with_budget(events: Iterator[Union[SearchEvent, IncumbentEvent, SolutionEvent]], time_limit: Optional[float] = None,
+                    node_limit: Optional[int] = None, on_event: Optional[Callable[[SearchEvent], None]] = None) -> SearchOutcome:
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    expanded = 0
+    best, best_key = None, None
+    status, incumbent = None, None
+    try:
+        for event in events:
+            if isinstance(event, SolutionEvent):
+                return SearchOutcome("no solution" if event.solution is None else "solved", event.solution,
+                                     expanded=expanded, elapsed=time.perf_counter() - start)
+            if isinstance(event, IncumbentEvent):
+                incumbent = event.solution
+                continue
+            expanded += 1
+            if on_event is not None: on_event(event)
+            if event._path is not None:
+                h = event.h
+                key = (h if h is not None else 0, -(event.g or 0))
+                if best_key is None or key <= best_key:
+                    best, best_key = event, key
+            if node_limit is not None and expanded >= node_limit:
+                status = "node limit"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                status = "time limit"
+                break
+    finally:
+        # closing the generator cancels the search
+        if hasattr(events, "close"): events.close()
+    return SearchOutcome(status or "no solution", incumbent, None if best is None else best.path(), None if best is None else best.state,
+                         expanded, time.perf_counter() - start)
+
+# Returns a search function (with the same arguments as the event variant) that reports its progress every "interval" expansions
+# The callback receives the number of expansions and the last event
+def with_progress(events_fn: Callable[..., Iterator], callback: Callable[[int, SearchEvent], None], interval: int = 1000) -> Callable[..., Solution]:
+    @functools.wraps(events_fn)
+    def search(problem, initial_state, *args, **kwargs) -> Solution:
+        expanded = 0
+        def on_event(event: SearchEvent):
+            nonlocal expanded
+            expanded += 1
+            if expanded % interval == 0: callback(expanded, event)
+        return run_with_budget(events_fn(problem, initial_state, *args, **kwargs), on_event=on_event).solution
+    return search
@@ -0,0 +1,185 @@
+from typing import Any, Callable, Dict, List, Optional
+import functools, json, time
+
+from problem import HeuristicFunction, Problem, S, A, Solution
+
+# This file contains the metrics that a search function can report while it runs.
+# To collect the metrics of a search, create a SearchMetrics object and pass it to the search function:
+#   metrics = SearchMetrics()
+#   path = AStarSearch(problem, initial_state, heuristic, metrics=metrics)
+#   print(metrics.to_json())
+# Every search gets its own metrics object, so the metrics of searches running at the same time are kept apart.
+# When no metrics object is given, the search function is called directly so collecting metrics costs nothing.
+# The metrics are collected by giving the search a proxy of the problem (and a wrapper of the heuristic) that counts and times every call,
+# so the search functions do not need to count anything themselves; they only register their frontiers (see "watch_frontier").
+# Since the proxy calls the methods of the original problem, the call counters used by the autograder (e.g. on "is_goal") still work.
+
+class SearchMetrics:
+    def __init__(self) -> None:
+        self.algorithm: Optional[str] = None
+        self.goal_tests = 0             # The number of "is_goal" calls (this is the explored nodes count used by the autograder)
+        self.expanded = 0               # The number of states whose actions (or successors) were requested
+        self.reopened = 0               # The number of expansions of states that were already expanded before
+        self.generated = 0              # The number of successors generated
+        self.heuristic_evaluations = 0  # The number of heuristic calls
+        self.peak_frontier = 0          # The largest total size of the frontiers (measured every time a state is expanded)
+        self.heap_operations: Dict[str, int] = {}   # The counters of the priority queues used as frontiers (pushes, pops, updates, ...)
+        self.phase_times: Dict[str, float] = {}     # The time (in seconds) spent in every phase of the search
+        self.solution_length: Optional[int] = None  # The number of actions in the solution (None if no solution was found)
+        self.solution_cost: Optional[float] = None  # The cost of the solution (None if no solution was found)
+        self._frontiers: List[Any] = []
+        self._expanded_states = set()
+
+    # Register a frontier (any object that supports "len") so its size is included in the peak frontier size
+    # If the frontier has a "counters" method (like the IndexedPriorityQueue), its counters are added to the heap operations
+    def watch_frontier(self, frontier: Any):
+        self._frontiers.append(frontier)
+
+    # Add the given duration to the time of a phase
+    def add_time(self, phase: str, duration: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + duration
+
+    # Record the expansion of a state (this is called by the problem proxy)
+    def _expand(self, state: Any):
+        self.expanded += 1
+        if state in self._expanded_states:
+            self.reopened += 1
+        else:
+            self._expanded_states.add(state)
+        size = sum(len(frontier) for frontier in self._frontiers)
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    # Collect the final values from the frontiers and the solution (this is called once the search returns)
+    def _finish(self, problem: Problem, initial_state: Any, solution: Solution):
+        size = sum(len(frontier) for frontier in self._frontiers)
+        self.peak_frontier = max(self.peak_frontier, size)
+        for frontier in self._frontiers:
+            if hasattr(frontier, "counters"):
+                for name, value in frontier.counters().items():
+                    self.heap_operations[name] = self.heap_operations.get(name, 0) + value
+        if solution is not None:
+            state, cost = initial_state, 0
+            for action in solution:
+                cost += problem.get_cost(state, action)
+                state = problem.get_successor(state, action)
+            self.solution_length, self.solution_cost = len(solution), cost
+        self._frontiers = []
+        self._expanded_states = set()
+
+    # Returns the metrics as a dictionary
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "algorithm": self.algorithm,
+            "goal_tests": self.goal_tests,
+            "expanded": self.expanded,
+            "reopened": self.reopened,
+            "generated": self.generated,
+            "heuristic_evaluations": self.heuristic_evaluations,
+            "peak_frontier": self.peak_frontier,
+            "heap_operations": dict(self.heap_operations),
+            "phase_times": dict(self.phase_times),
+            "solution_length": self.solution_length,
+            "solution_cost": self.solution_cost,
+        }
+
+    # Returns the metrics as a JSON string and writes it to the given path (if any)
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+# This proxy forwards every call to the original problem and reports the calls to the metrics object
+# Any attribute that is not defined here (e.g. the layout or the cache) is read from the original problem
+class InstrumentedProblem:
+    def __init__(self, problem: Problem[S, A], metrics: SearchMetrics) -> None:
+        self.problem = problem
+        self.metrics = metrics
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.problem, name)
+
+    def is_goal(self, state: S) -> bool:
+        start = time.perf_counter()
+        result = self.problem.is_goal(state)
+        self.metrics.add_time("goal_test", time.perf_counter() - start)
+        self.metrics.goal_tests += 1
+        return result
+
+    def get_actions(self, state: S) -> List[A]:
+        self.metrics._expand(state)
+        start = time.perf_counter()
+        actions = list(self.problem.get_actions(state))
+        self.metrics.add_time("expansion", time.perf_counter() - start)
+        return actions
+
+    def get_successor(self, state: S, action: A) -> S:
+        start = time.perf_counter()
+        successor = self.problem.get_successor(state, action)
+        self.metrics.add_time("expansion", time.perf_counter() - start)
+        self.metrics.generated += 1
+        return successor
+
+    def get_successors(self, state: S) -> list:
+        self.metrics._expand(state)
+        start = time.perf_counter()
+        successors = list(self.problem.get_successors(state))
+        self.metrics.add_time("expansion", time.perf_counter() - start)
+        self.metrics.generated += len(successors)
+        return successors
+
+    def get_cost(self, state: S, action: A) -> float:
+        start = time.perf_counter()
+        cost = self.problem.get_cost(state, action)
+        self.metrics.add_time("expansion", time.perf_counter() - start)
+        return cost
+
+    # The backward problem of the bidirectional searches reports to the same metrics object
+    def reverse(self, state: S) -> 'InstrumentedProblem':
+        return InstrumentedProblem(self.problem.reverse(state), self.metrics)
+
+# Returns the original problem of an instrumented problem (or the problem itself if it is not instrumented)
+# This is used for the work that is not part of the search (e.g. rebuilding a path) so it is not reported to the metrics
+def unwrap_problem(problem: Problem[S, A]) -> Problem[S, A]:
+    return problem.problem if isinstance(problem, InstrumentedProblem) else problem
+
+# Wrap a heuristic so its calls are counted and timed
+def instrument_heuristic(heuristic: HeuristicFunction, metrics: SearchMetrics) -> HeuristicFunction:
+    def instrumented(problem, state):
+        start = time.perf_counter()
+        value = heuristic(problem, state)
+        metrics.add_time("heuristic", time.perf_counter() - start)
+        metrics.heuristic_evaluations += 1
+        return value
+    return instrumented
+
+# The total time of the phases measured by the proxy and the heuristic wrapper
+def _measured_time(metrics: SearchMetrics) -> float:
+    return sum(duration for phase, duration in metrics.phase_times.items() if phase not in ("total", "search"))
+
+# This decorator adds the "metrics" keyword argument to a search function
+# If "metrics" is None, the search function is called directly (with no overhead per node)
+# Otherwise, the search receives an instrumented problem and heuristic, and the metrics object (to register its frontiers)
+# The search function must accept the "metrics" keyword argument and the heuristic (if any) must be its third positional argument
+def with_metrics(search_fn: Callable[..., Solution]) -> Callable[..., Solution]:
+    @functools.wraps(search_fn)
+    def search(problem: Problem[S, A], initial_state: S, *args, metrics: Optional[SearchMetrics] = None, **kwargs) -> Solution:
+        if metrics is None:
+            return search_fn(problem, initial_state, *args, **kwargs)
+        metrics.algorithm = search_fn.__name__
+        if args and callable(args[0]):
+            args = (instrument_heuristic(args[0], metrics),) + args[1:]
+        if callable(kwargs.get("heuristic")):
+            kwargs["heuristic"] = instrument_heuristic(kwargs["heuristic"], metrics)
+        measured_before = _measured_time(metrics)
+        start = time.perf_counter()
+        solution = search_fn(InstrumentedProblem(problem, metrics), initial_state, *args, metrics=metrics, **kwargs)
+        elapsed = time.perf_counter() - start
+        # the time that is not spent in the problem or the heuristic is spent by the search itself (e.g. on the frontier)
+        metrics.add_time("search", elapsed - (_measured_time(metrics) - measured_before))
+        metrics.add_time("total", elapsed)
+        metrics._finish(problem, initial_state, solution)
+        return solution
+    return search
@@ -0,0 +1,52 @@
+from array import array
+from typing import Generic, List
+from problem import S, A
+
+# The search tree stores every node generated during a search exactly once.
+# Instead of storing the whole path with every node (which costs O(depth) memory per node),
+# each node only stores its state, the action that generated it and the index of its parent.
+# The path to a node is rebuilt by walking up the parent pointers, which is only done once the goal is found.
+# Nodes are identified by their index in the tree, so the frontier can store plain integers.
+class SearchTree(Generic[S, A]):
+    __slots__ = ("states", "actions", "parents")
+
+    # The index stored as the parent of the root node
+    NO_PARENT = -1
+
+    def __init__(self) -> None:
+        self.states: List[S] = []       # states[i] is the state of node 'i'
+        self.actions: List[A] = []      # actions[i] is the action that generated node 'i' from its parent
+        self.parents = array('q')       # parents[i] is the index of the parent of node 'i' (NO_PARENT for the root)
+
+    # Adds the root node (the initial state) to the tree and returns its index
+    def add_root(self, state: S) -> int:
+        return self.add(state, SearchTree.NO_PARENT, None)
+
+    # Adds a node that was generated by applying 'action' to the node 'parent' and returns its index
+    def add(self, state: S, parent: int, action: A) -> int:
+        self.states.append(state)
+        self.actions.append(action)
+        self.parents.append(parent)
+        return len(self.parents) - 1
+
+    # Returns the depth of the given node (the number of actions that lead from the root to it)
+    def depth(self, node: int) -> int:
+        depth = 0
+        parents = self.parents
+        while parents[node] != SearchTree.NO_PARENT:
+            depth += 1
+            node = parents[node]
+        return depth
+
+    # Returns the list of actions that lead from the root to the given node
+    def path(self, node: int) -> List[A]:
+        path = []
+        parents, actions = self.parents, self.actions
+        while parents[node] != SearchTree.NO_PARENT:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self) -> int:
+        return len(self.parents)
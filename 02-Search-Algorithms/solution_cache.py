@@ -0,0 +1,239 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from enum import Enum
+import argparse, hashlib, inspect, json, os, shutil, sys, tempfile, time
+
+from problem import HeuristicFunction, Problem, S, A, Solution
+
+# This file contains a persistent (on-disk) cache of the solutions found by the search functions,
+# so solving the same level again (e.g. in another run of play_dungeon.py) returns the stored plan without searching.
+# An entry is identified by:
+#   - the hash of the level (stored in problem.level_hash by "from_text", "from_file" and "level_format.load_level")
+#   - the state from which the search started
+#   - the identity of the search function and the heuristic (their module and name)
+#   - the code version: a hash of all the python files in the folders of the search function, the heuristic and the problem
+#     and in their "helpers" sub-folders (so it also covers the modules they use, e.g. the priority queues used by the search)
+# So an entry is never returned if the level or the code changed since it was stored.
+# Problems without a level hash (e.g. created in code) and functions without a stable identity (e.g. lambdas) are never cached.
+# Every entry is a JSON file in a folder named after the level hash which contains the actions and the statistics of the search:
+#   cache = SolutionCache()
+#   solution = cache.solve(problem, problem.get_initial_state(), AStarSearch, strong_heuristic)
+# The agents in agents.py consult the cache before searching if they are given one.
+# The entries of older code versions are not reachable anymore, they can be deleted from the command line:
+#   python solution_cache.py prune
+
+# The version of the entry format (changing it invalidates all the entries)
+FORMAT_VERSION = 2
+# The default folder of the cache
+DEFAULT_DIRECTORY = ".solution_cache"
+
+# The hashes of the source files (path -> (modification time, hash)) so every file is only read once while it is not modified
+_source_hashes: Dict[str, Tuple[float, str]] = {}
+
+def source_hash(path: str) -> str:
+    modified = os.path.getmtime(path)
+    cached = _source_hashes.get(path)
+    if cached is None or cached[0] != modified:
+        with open(path, 'rb') as f:
+            cached = _source_hashes[path] = (modified, hashlib.sha1(f.read()).hexdigest())
+    return cached[1]
+
+# The sub-folders of the shared code which the modules of a folder import (e.g. "helpers.utils" which is used by the searches and the problems)
+SHARED_FOLDERS = ("helpers",)
+
+# Returns the hash of all the python files in the given folders and in their shared sub-folders
+def code_version(folders: List[str]) -> str:
+    digest = hashlib.sha1()
+    for folder in sorted(folders):
+        for prefix in ("", *SHARED_FOLDERS):
+            path = os.path.join(folder, prefix)
+            if not os.path.isdir(path): continue
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".py"):
+                    digest.update(f"{prefix}/{name}:{source_hash(os.path.join(path, name))}\n".encode())
+    return digest.hexdigest()
+
+# Returns the identity of a function or a class (module.name) and the folder of its module
+# or None if it does not have a stable identity across runs (e.g. a lambda or a nested function)
+def function_identity(fn: Callable) -> Optional[Tuple[str, Optional[str]]]:
+    module, name = getattr(fn, "__module__", None), getattr(fn, "__qualname__", None)
+    if module is None or name is None or "<" in name: return None
+    path = getattr(sys.modules.get(module), "__file__", None)
+    return f"{module}.{name}", None if path is None else os.path.dirname(os.path.abspath(path))
+
+# Convert an action to a JSON value (enums are stored as their values and objects with a name, like the graph nodes, as their names)
+def encode_action(action: Any) -> Any:
+    if isinstance(action, Enum): return action.value
+    if isinstance(action, (tuple, list)): return [encode_action(item) for item in action]
+    if isinstance(action, (int, float, str)) or action is None: return action
+    name = getattr(action, "name", None)
+    return name if isinstance(name, str) else str(action)
+
+class SolutionCache:
+    # If collect_metrics is True, the searches are run with a SearchMetrics object and its metrics are stored with the solution
+    # (this makes the searches slower), otherwise only the search time, the solution length and the solution cost are stored
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, collect_metrics: bool = False) -> None:
+        self.directory = directory
+        self.collect_metrics = collect_metrics
+        self.hits = 0       # The number of searches answered from the cache
+        self.misses = 0     # The number of searches that were run and stored
+        self.skipped = 0    # The number of searches that could not be cached (no level hash or no stable function identity)
+        self.invalid = 0    # The number of entries that were deleted since they could not be read or replayed
+
+    # Returns the path of the entry file and the metadata of the entry (None if this search cannot be cached)
+    def entry(self, problem: Problem[S, A], state: S, search_fn: Callable, heuristic: Optional[HeuristicFunction] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        level_hash = getattr(problem, "level_hash", None)
+        identities = [function_identity(search_fn), function_identity(type(problem))]
+        if heuristic is not None: identities.append(function_identity(heuristic))
+        if level_hash is None or None in identities: return None
+        folders = sorted({folder for _, folder in identities if folder is not None})
+        metadata = {
+            "format": FORMAT_VERSION,
+            "level": level_hash,
+            "state": hashlib.sha1(str(state).encode()).hexdigest(),
+            "algorithm": identities[0][0],
+            "heuristic": None if heuristic is None else identities[2][0],
+            "folders": folders,
+            "code_version": code_version(folders),
+        }
+        key = hashlib.sha1(json.dumps(metadata, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.directory, level_hash, key + ".json"), metadata
+
+    # Replay the stored actions from the state and return the solution (None if an action is not possible in the problem)
+    @staticmethod
+    def _replay(problem: Problem[S, A], state: S, actions: List[Any]) -> Optional[List[A]]:
+        solution = []
+        for encoded in actions:
+            action = next((action for action in problem.get_actions(state) if encode_action(action) == encoded), None)
+            if action is None: return None
+            solution.append(action)
+            state = problem.get_successor(state, action)
+        return solution
+
+    # Returns (True, solution) if the solution of this search is in the cache, otherwise (False, None)
+    # The solution is None if the stored search did not find a solution
+    def get(self, problem: Problem[S, A], state: S, search_fn: Callable, heuristic: Optional[HeuristicFunction] = None) -> Tuple[bool, Solution]:
+        entry = self.entry(problem, state, search_fn, heuristic)
+        return (False, None) if entry is None else self._load(entry, problem, state)
+
+    def _load(self, entry: Tuple[str, Dict[str, Any]], problem: Problem[S, A], state: S) -> Tuple[bool, Solution]:
+        path, metadata = entry
+        if not os.path.exists(path): return False, None
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            if any(stored.get(name) != value for name, value in metadata.items()): raise ValueError("The entry does not match the search")
+            actions = stored["solution"]
+            solution = None if actions is None else self._replay(problem, state, actions)
+            if actions is not None and solution is None: raise ValueError("The stored solution cannot be replayed")
+        except (OSError, ValueError, KeyError):
+            # the entry is corrupted or does not belong to this search, so it is deleted and the search will be run again
+            self.invalid += 1
+            try: os.remove(path)
+            except OSError: pass
+            return False, None
+        return True, solution
+
+    # Store the solution of a search with its statistics
+    def put(self, problem: Problem[S, A], state: S, search_fn: Callable, heuristic: Optional[HeuristicFunction], solution: Solution, stats: Dict[str, Any]):
+        entry = self.entry(problem, state, search_fn, heuristic)
+        if entry is not None: self._store(entry, solution, stats)
+
+    def _store(self, entry: Tuple[str, Dict[str, Any]], solution: Solution, stats: Dict[str, Any]):
+        path, metadata = entry
+        content = dict(metadata, solution=None if solution is None else [encode_action(action) for action in solution], stats=stats, created=time.time())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # the entry is written to a temporary file then renamed so other processes never read a partially written entry
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(descriptor, 'w') as f:
+            json.dump(content, f)
+        os.replace(temporary, path)
+
+    # Return the solution from the cache if it is there, otherwise run the search, store its solution and return it
+    # If heuristic is None, the search function is called without a heuristic (an uninformed search)
+    def solve(self, problem: Problem[S, A], state: S, search_fn: Callable, heuristic: Optional[HeuristicFunction] = None) -> Solution:
+        arguments = (problem, state) if heuristic is None else (problem, state, heuristic)
+        entry = self.entry(problem, state, search_fn, heuristic)
+        if entry is None:
+            self.skipped += 1
+            return search_fn(*arguments)
+        found, solution = self._load(entry, problem, state)
+        if found:
+            self.hits += 1
+            return solution
+        self.misses += 1
+        metrics = None
+        if self.collect_metrics and "metrics" in inspect.signature(search_fn).parameters:
+            from search_metrics import SearchMetrics
+            metrics = SearchMetrics()
+        start = time.perf_counter()
+        solution = search_fn(*arguments) if metrics is None else search_fn(*arguments, metrics=metrics)
+        stats: Dict[str, Any] = {"time": time.perf_counter() - start}
+        if solution is not None:
+            current, cost = state, 0
+            for action in solution:
+                cost += problem.get_cost(current, action)
+                current = problem.get_successor(current, action)
+            stats.update(length=len(solution), cost=cost)
+        if metrics is not None: stats["metrics"] = metrics.to_dict()
+        self._store(entry, solution, stats)
+        return solution
+
+    # Iterate over the paths and the contents of all the entries (the unreadable entries are skipped)
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if not os.path.isdir(self.directory): return
+        for folder in sorted(os.listdir(self.directory)):
+            folder = os.path.join(self.directory, folder)
+            if not os.path.isdir(folder): continue
+            for name in sorted(os.listdir(folder)):
+                if not name.endswith(".json"): continue
+                path = os.path.join(folder, name)
+                try:
+                    with open(path, 'r') as f:
+                        yield path, json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    # Delete the entries of a level (given its hash)
+    def invalidate_level(self, level_hash: str):
+        shutil.rmtree(os.path.join(self.directory, level_hash), ignore_errors=True)
+
+    # Delete the entries that can never be returned again: entries of an older format
+    # or entries whose code version is not the current version of their folders (the code was modified since they were stored)
+    # Returns the number of deleted entries
+    def prune(self) -> int:
+        deleted = 0
+        for path, content in list(self.entries()):
+            folders: List[str] = content.get("folders", [])
+            valid = content.get("format") == FORMAT_VERSION and all(os.path.isdir(folder) for folder in folders) \
+                and code_version(folders) == content.get("code_version")
+            if not valid:
+                os.remove(path)
+                deleted += 1
+        return deleted
+
+    # Delete all the entries
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # Returns the counters of this cache object
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "skipped": self.skipped, "invalid": self.invalid}
+
+def main(args: argparse.Namespace):
+    cache = SolutionCache(args.directory)
+    if args.command == "list":
+        for path, content in cache.entries():
+            stats = content.get("stats", {})
+            print(f"{path}: {content.get('algorithm')} ({content.get('heuristic')}) length={stats.get('length')} cost={stats.get('cost')} time={stats.get('time', 0):.4f}s")
+    elif args.command == "prune":
+        print(f"Deleted {cache.prune()} stale entries")
+    else:
+        cache.clear()
+        print(f"Deleted {args.directory}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the solution cache")
+    parser.add_argument("command", choices=["list", "prune", "clear"], help="list the entries, delete the stale entries or delete all the entries")
+    parser.add_argument("--directory", "-d", default=DEFAULT_DIRECTORY, help="the folder of the cache")
+    args = parser.parse_args()
+    main(args)
@@ -1,30 +1,159 @@
-import os, subprocess, argparse
-from posixpath import dirname
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os, sys, subprocess, argparse, hashlib, json, tempfile, time
+
+# This script grades all the submissions in a folder (every sub-folder is a submission) with the autograder
+# Every submission is graded by its own autograder process (since the autograder imports the student files as modules, a process cannot grade two submissions)
+# and up to "--jobs" of these processes run at the same time (the threads of the pool only start the processes and wait for them).
+# The autograder is run with "--json" so the result of every test case is collected, not only the exit code.
+# The results are stored in a cache folder (one JSON file per graded submission) under a key made from:
+#   - the hash of the files of the submission
+#   - the hash of the grading code (the autograder, the helpers, the testcases and the python files of the lab)
+#   - the run number (when every submission is graded more than once with "--repeat")
+# So a submission is never graded twice with the same files and the same grading code, and if the grading is interrupted,
+# running the same command again only grades the submissions that were not graded yet.
+# While the grading is running, a line of JSON is written to the stream file (by default "<out>.jsonl") for every graded submission
+# and when it is done, the CSV file contains a line for every submission with its total grade in every run.
+# Example:
+#   python batchgrader.py submissions grades.csv --jobs 8
+
+# The folder of this lab (the autograder is run from it)
+LAB_PATH = os.path.dirname(os.path.abspath(__file__))
+# The default folder of the result cache
+DEFAULT_CACHE = os.path.join(LAB_PATH, ".grading_cache")
+# The files and folders that are not part of a submission or of the grading code
+IGNORED = {"__pycache__", ".grading_cache"}
+
+# Returns the hash of the names and the contents of the files in the given paths (folders are hashed recursively)
+def hash_files(paths: Iterable[str]) -> str:
+    digest = hashlib.sha1()
+    def visit(path: str, name: str):
+        if os.path.isdir(path):
+            for child in sorted(os.listdir(path)):
+                if child not in IGNORED: visit(os.path.join(path, child), f"{name}/{child}")
+        elif os.path.isfile(path):
+            with open(path, 'rb') as f:
+                digest.update(f"{name}:{hashlib.sha1(f.read()).hexdigest()}\n".encode())
+    for path in paths:
+        visit(path, os.path.basename(path))
+    return digest.hexdigest()
+
+# Returns the hash of the grading code
+def grader_version() -> str:
+    paths = [os.path.join(LAB_PATH, name) for name in ["autograder.py", "helpers", "testcases"]]
+    paths += sorted(os.path.join(LAB_PATH, name) for name in os.listdir(LAB_PATH) if name.endswith(".py") and name != "batchgrader.py")
+    return hash_files(paths)
+
+# Returns the names of the submissions (the sub-folders of the path)
+def list_submissions(path: str) -> List[str]:
+    return sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)) and not name.startswith(".") and name not in IGNORED)
+
+# Run the autograder on a submission and return the graded entry:
+#   the exit code of the autograder, the total and the maximum grade (None if the autograder did not finish), the per-test results and the time
+def run_autograder(submission_path: str, json_path: str) -> Dict[str, Any]:
+    environ = os.environ.copy()
+    environ['PYTHONIOENCODING'] = 'utf-8'
+    start = time.perf_counter()
+    exit_code = subprocess.call([sys.executable, "autograder.py", "-s", submission_path, "--json", json_path],
+                                cwd=LAB_PATH, stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL, env=environ)
+    elapsed = time.perf_counter() - start
+    tests, summary = [], {}
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        # the last line is the summary (the total grade), it is only written if the autograder finished
+        if records and "total" in records[-1]: summary = records.pop()
+        tests = records
+        os.remove(json_path)
+    return {"exit_code": exit_code, "total": summary.get("total"), "maximum": summary.get("maximum"), "tests": tests, "time": elapsed}
+
+class ResultCache:
+    def __init__(self, directory: str = DEFAULT_CACHE) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    # Returns the path of the entry of a submission
+    def path(self, source: str, grader: str, run: int) -> str:
+        key = hashlib.sha1(f"{source}:{grader}:{run}".encode()).hexdigest()
+        return os.path.join(self.directory, key + ".json")
+
+    # Returns the stored entry (or None if it is not in the cache or cannot be read)
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Store an entry (it is written to a temporary file then renamed, so an interrupted grading never leaves a partial entry)
+    def put(self, path: str, entry: Dict[str, Any]):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, 'w', encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+
+# Grade a submission (or read its results from the cache) and return its entry
+def grade_submission(cache: ResultCache, grader: str, path: str, name: str, run: int) -> Dict[str, Any]:
+    submission_path = os.path.abspath(os.path.join(path, name))
+    source = hash_files([submission_path])
+    entry_path = cache.path(source, grader, run)
+    entry = cache.get(entry_path)
+    if entry is not None: return dict(entry, submission=name, cached=True)
+    descriptor, json_path = tempfile.mkstemp(dir=cache.directory, suffix=".jsonl")
+    os.close(descriptor)
+    entry = run_autograder(submission_path, json_path)
+    entry.update(source=source, grader=grader, run=run)
+    # an entry is only stored if the autograder finished, so a crashed or interrupted grading is retried by the next call
+    if entry["total"] is not None: cache.put(entry_path, entry)
+    return dict(entry, submission=name, cached=False)
+
+# Grade all the submissions in the path "repeat" times with "jobs" autograders running at the same time
+# Returns the entries of every submission (in the order of the runs)
+# If stream is given, every entry is written to it as a line of JSON as soon as it is ready
+def grade_all(path: str, repeat: int = 1, jobs: int = 1, cache_directory: str = DEFAULT_CACHE, stream = None, verbose: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    names = list_submissions(path)
+    cache = ResultCache(cache_directory)
+    grader = grader_version()
+    tasks: List[Tuple[str, int]] = [(name, run) for run in range(1, repeat+1) for name in names]
+    entries: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        futures = {pool.submit(grade_submission, cache, grader, path, name, run): (name, run) for name, run in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            name, run = futures[future]
+            entry = entries[(name, run)] = future.result()
+            if stream is not None:
+                stream.write(json.dumps(entry) + "\n")
+                stream.flush()
+            if verbose:
+                status = "cached" if entry["cached"] else f"{entry['time']:.2f}s"
+                print(f"[{done}/{len(tasks)}] Run #{run}/{repeat}: {name} - {entry['total']}/{entry['maximum']} ({status})")
+    finally:
+        # if the grading is interrupted, the submissions that did not start yet are cancelled (they will be graded by the next call)
+        pool.shutdown(wait=True, cancel_futures=True)
+    return {name: [entries[(name, run)] for run in range(1, repeat+1)] for name in names}
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(description="Grade all the submissions (the sub-folders of the path) with the autograder")
     parser.add_argument("path")
     parser.add_argument("out")
-    parser.add_argument("--repeat", "-r", type=int, default=4)
+    parser.add_argument("--repeat", "-r", type=int, default=4, help="the number of times every submission is graded")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="the number of submissions graded at the same time")
+    parser.add_argument("--cache", "-c", default=DEFAULT_CACHE, help="the folder where the results are stored (grading again with the same cache resumes the grading)")
+    parser.add_argument("--stream", default=None, help="the file where the results of every submission are written as lines of JSON (by default, <out>.jsonl)")
     args = parser.parse_args()
 
     path: str = args.path
     out: str = args.out
-    repeat: int = args.repeat
-    
-    dirnames = [dirname for dirname in os.listdir(path) if os.path.isdir(os.path.join(path, dirname))]    
-    results = {dirname:[] for dirname in dirnames}
+    stream_path: str = args.stream or os.path.splitext(out)[0] + ".jsonl"
 
-    environ = os.environ.copy()
-    environ['PYTHONIOENCODING'] = 'utf-8'
+    try:
+        with open(stream_path, 'w', encoding="utf-8") as stream:
+            results = grade_all(path, args.repeat, args.jobs, args.cache, stream)
+    except KeyboardInterrupt:
+        print("Interrupted: run the same command again to resume the grading")
+        exit(1)
 
-    for r in range(1, repeat+1):
-        for index, dirname in enumerate(dirnames):
-            dirpath = os.path.join(path, dirname)
-            print(f"Run #{r}/{repeat}: Grading Student {index+1}/{len(dirnames)} - {dirname}")
-            result = subprocess.call(["python", "autograder.py", "-s", dirpath], stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL, encoding="utf-8", env=environ)
-            results[dirname].append(result)
-            print(f"Result:", result)
-    
+    # Every line contains the name of the submission and its total grade in every run (or "ERROR" if the autograder did not finish)
     with open(out, 'w') as f:
-        f.writelines([f"{k}, {', '.join(str(v) for v in vs)}\n" for k, vs in results.items()])
\ No newline at end of file
+        f.writelines([f"{k}, {', '.join('ERROR' if v['total'] is None else str(v['total']) for v in vs)}\n" for k, vs in results.items()])
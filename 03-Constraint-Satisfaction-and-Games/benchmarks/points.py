@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+from contextlib import contextmanager
+import argparse, glob
+
+import mathutils
+from mathutils import Direction, Point
+import dungeon
+from dungeon import DungeonGame, DungeonLayout, DungeonState
+from benchmarks.common import measure_time, print_table
+
+# This benchmark compares the Point named tuple and the neighbor tables against the frozen dataclass that was used before
+# For every dungeon, it expands the game tree of the dungeon game to a fixed depth (like the game search algorithms do)
+# which calls "get_actions" and "get_successor" for every node, and it computes the shortest paths from the player (used by the heuristics).
+# Every workload is run with:
+#   - the old Point dataclass where the neighbors are computed by adding the direction vectors (the code before the change)
+#   - the Point named tuple where the neighbors are still computed by adding the direction vectors
+#   - the Point named tuple with the neighbor table of the layout (the current code)
+# To run the same code with the old points, the Point class is replaced in the modules of the lab while the old points are measured.
+
+# This is the Point class that was used before the named tuple
+@dataclass(frozen=True)
+class LegacyPoint:
+    __slots__ = ('x', 'y')
+    x: int
+    y: int
+
+    def __add__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x - other.x, self.y - other.y)
+
+    def __neg__(self) -> 'LegacyPoint':
+        return LegacyPoint(-self.x, -self.y)
+
+    def __str__(self) -> str:
+        return f'({self.x}, {self.y})'
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y))
+
+    def __deepcopy__(self, memo):
+        return self
+
+# A replacement of the neighbor table which computes the neighbors of a position every time they are requested (like the code before the table)
+class ComputedNeighbors:
+    def __getitem__(self, position) -> Tuple:
+        return tuple(position + vector for vector in Direction._Vectors)
+
+# Replace the Point class (and the direction vectors) in the modules of the lab while the block runs
+# If table is False, the layouts compute the neighbors instead of using the neighbor table
+@contextmanager
+def use_points(point_class: type, table: bool):
+    modules = [mathutils, dungeon]
+    vectors = Direction._Vectors
+    neighbors = DungeonLayout.__dict__["neighbors"]
+    try:
+        for module in modules: module.Point = point_class
+        Direction._Vectors = [point_class(x, y) for x, y in vectors]
+        if not table: DungeonLayout.neighbors = property(lambda _: ComputedNeighbors())
+        yield
+    finally:
+        for module in modules: module.Point = Point
+        Direction._Vectors = vectors
+        DungeonLayout.neighbors = neighbors
+
+# Expand the game tree to the given depth and return the number of expanded nodes
+def expand_tree(game: DungeonGame, state: DungeonState, depth: int) -> int:
+    terminal, _ = game.is_terminal(state)
+    if terminal or depth == 0: return 1
+    return 1 + sum(expand_tree(game, game.get_successor(state, action), depth - 1) for action in game.get_actions(state))
+
+def game_tree(levels: List[str], depth: int) -> int:
+    expanded = 0
+    for level in levels:
+        game = DungeonGame.from_file(level)
+        expanded += expand_tree(game, game.get_initial_state(), depth)
+    return expanded
+
+# Compute the shortest paths from the player to every walkable position
+def shortest_paths(levels: List[str]) -> int:
+    found = 0
+    for level in levels:
+        game = DungeonGame.from_file(level)
+        start = game.get_initial_state().player.position
+        found += sum(dungeon.compute_path(game, start, position) is not None for position in game.layout.walkable)
+    return found
+
+def main(args: argparse.Namespace):
+    levels = args.levels or sorted(glob.glob("dungeons/*.txt"))
+    workloads = [
+        (f"Game tree (depth {args.depth})", lambda: game_tree(levels, args.depth)),
+        ("Shortest paths", lambda: shortest_paths(levels)),
+    ]
+    configurations: List[Tuple[type, bool]] = [(LegacyPoint, False), (Point, False), (Point, True)]
+    rows = []
+    for name, workload in workloads:
+        times: Dict[Tuple[type, bool], float] = {}
+        for point_class, table in configurations:
+            with use_points(point_class, table):
+                output, times[point_class, table] = min((measure_time(workload) for _ in range(args.repeat)), key=lambda result: result[1])
+        base = times[LegacyPoint, False]
+        rows.append([name, output] + [f"{times[configuration]:.4f} ({base / times[configuration]:.2f}x)" for configuration in configurations])
+    print_table(["Workload", "Output", "Dataclass (s)", "Named Tuple (s)", "Named Tuple + Table (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Point named tuple and the neighbor tables against the frozen dataclass")
+    parser.add_argument("levels", nargs="*", help="the dungeon files (all the dungeons by default)")
+    parser.add_argument("--depth", "-d", type=int, default=6, help="the depth of the expanded game trees")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="the best time of this many runs is reported")
+    args = parser.parse_args()
+    main(args)
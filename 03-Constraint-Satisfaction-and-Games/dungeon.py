@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from copy import deepcopy
-from typing import Iterable, List, Optional, Set, Tuple
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from enum import Enum
 
-from mathutils import Direction, Point
+from mathutils import Direction, Point, neighbor_table
 from game import Game
 from helpers.utils import track_call_count
 from helpers.mt19937 import RandomGenerator
@@ -32,6 +33,12 @@ class DungeonLayout:
     walkable: Set[Point]
     exit: Point
 
+    # neighbors[position][direction] is the position reached by moving in the direction (including Direction.NONE)
+    # It is built on the first use and shared by all the states since they share the layout
+    @cached_property
+    def neighbors(self) -> Dict[Point, Tuple[Point, ...]]:
+        return neighbor_table(self.walkable)
+
     def __deepcopy__(self, memo):
         return self
 
@@ -138,26 +145,24 @@ class DungeonGame(Game[DungeonState, Direction]):
     def get_actions(self, state: DungeonState) -> Iterable[Direction]:
         if state.turn == 0:
             # Find an return actions to be done by the player
-            position_position = state.player.position
-            positions = ((direction, position_position + direction.to_vector()) for direction in Direction)
+            neighbors, walkable = state.layout.neighbors[state.player.position], state.layout.walkable
             # prevent the player from getting into a wall
-            return [direction for direction, position in positions if position in state.layout.walkable]
+            return [direction for direction in Direction if neighbors[direction] in walkable]
         else:
             # Find an return actions to be done by a monster
             index = state.turn - 1
             if not state.monsters[index].alive: return []
             monster_locations = {monster.position for i, monster in enumerate(state.monsters) if i != index and monster.alive} 
-            monster_position = state.monsters[index].position
-            positions = ((direction, monster_position + direction.to_vector()) for direction in Direction)
+            neighbors, walkable = state.layout.neighbors[state.monsters[index].position], state.layout.walkable
             # prevent the monster from getting into a wall or another monster
-            return [direction for direction, position in positions if position in state.layout.walkable and position not in monster_locations]
+            return [direction for direction in Direction if neighbors[direction] in walkable and neighbors[direction] not in monster_locations]
 
     def get_successor(self, state: DungeonState, action: Direction) -> DungeonState:
         state = deepcopy(state)
         current_turn = state.turn
         if current_turn == 0:
             # This action is done by the player
-            new_position = state.player.position + action.to_vector()
+            new_position = state.layout.neighbors[state.player.position][action]
             state.player.position = new_position
             if new_position in state.coins:
                 # If we walk over a coin, we take it
@@ -186,7 +191,7 @@ class DungeonGame(Game[DungeonState, Direction]):
         else:
             # This action is done by a monster
             monster = state.monsters[current_turn - 1]
-            new_position = monster.position + action.to_vector()
+            new_position = state.layout.neighbors[monster.position][action]
             monster.position = new_position
             if new_position == state.player.position:
                 if state.player.inventory.daggers != 0:
@@ -291,8 +296,7 @@ def compute_path(game: DungeonGame, p1: Point, p2: Point) -> List[Point]:
         while queue:
             parent = queue.popleft()
             path = path_map[parent]
-            for direction in Direction:
-                child = parent + direction.to_vector()
+            for child in game.layout.neighbors[parent]:
                 if child in path_map or child not in game.layout.walkable:
                     continue
                 path_map[child] = path + [child]
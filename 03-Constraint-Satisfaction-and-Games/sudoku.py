@@ -1,4 +1,6 @@
 from typing import Dict
+from functools import partial
+import operator
 from CSP import Assignment, Problem, UnaryConstraint, BinaryConstraint
 
 # A class for the sudoku problem which inherits from the generic CSP problem class
@@ -20,8 +22,9 @@ class SudokuProblem(Problem):
     # Read a sudoku puzzle from a string
     @staticmethod
     def from_text(text: str) -> 'SudokuProblem':
-        not_equal_condition = lambda a, b: a != b
-        unary_not_equal_condition = lambda f: (lambda v: v != f)
+        # the conditions are built from operator.ne (instead of lambdas) so the problem can be pickled
+        not_equal_condition = operator.ne
+        unary_not_equal_condition = lambda f: partial(operator.ne, f)
         
         lines = [line.strip() for line in text.splitlines()]
         lines = [line.replace('| ', '').split() for line in lines if len(line) != 0 and not line.startswith('-')]
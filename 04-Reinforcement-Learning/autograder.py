@@ -1,9 +1,16 @@
 import traceback
 import threading, _thread, ctypes
 import time, json, os, fnmatch
+import io, sys, math, signal, multiprocessing
+import ast, pickle
+from multiprocessing import connection as mpc
 import argparse
-from typing import Any, Callable, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from queue import Queue
+try:
+    import resource
+except ImportError:
+    resource = None
 
 from helpers.globals import *
 from helpers.utils import *
@@ -28,16 +35,20 @@ def raise_exception_in_thread(thread: threading.Thread, exception: Exception):
     tid = thread.ident
     ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), ctypes.py_object(exception))
 
+# Call the function then compare its output and return the result (None if the function is not implemented)
+def execute_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Arguments) -> Union[Result, None]:
+    try:
+        output = fn(*input_args.args, **input_args.kwargs)
+        result = cmp(output, *cmp_args.args, **cmp_args.kwargs)
+    except NotImplementedError as err:
+        result = None
+    except:
+        result = Result(False, 0, traceback.format_exc())
+    return result
+
 def run_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Arguments, timeout: 10) -> Union[Result, None]:
     def _call(queue: Queue):
-        try:
-            output = fn(*input_args.args, **input_args.kwargs)
-            result = cmp(output, *cmp_args.args, **cmp_args.kwargs)
-        except NotImplementedError as err:
-            result = None
-        except:
-            result = Result(False, 0, traceback.format_exc())
-        queue.put(result)
+        queue.put(execute_test(fn, input_args, cmp, cmp_args))
     queue = Queue()
     thread = threading.Thread(target=_call, args=(queue,), daemon=True)
     thread.start()
@@ -59,6 +70,185 @@ def run_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Argum
     del thread
     return result
 
+# The parallel engine is used when the autograder runs with "--jobs N" where N > 1
+# Every test case runs in its own process (forked from the autograder when possible) so:
+#   a test case that exceeds its time limit is killed instead of running in the background
+#   the global state changed by a test case (e.g. the call counters of "track_call_count") does not leak into the other test cases
+# Up to N test cases run at the same time and their results (and anything they print) are printed in the same order as the serial run.
+# The time limit of a test case is a CPU time limit, so it does not depend on the number of test cases running at the same time,
+# but a test case is also killed if its wall-clock time exceeds twice its time limit (e.g. if it is blocked).
+# The address space of every test case is limited to "--memory-limit" MiB.
+# The CPU and memory limits are only applied on systems that have the "resource" module (e.g. not on Windows).
+
+class TimeLimitExceeded(BaseException):
+    pass
+
+# This function runs a single test case inside the test case process and sends (printed output, result) to the autograder
+def run_isolated_test(channel, problem_kwargs: Dict[str, Any], test_case: Dict[str, Any], timeout: Optional[float], memory_limit: int, solution: str):
+    set_solution_path(solution)
+    sys.stdout = output = io.StringIO()
+    expired = False
+    def on_time_limit(signum, frame):
+        nonlocal expired
+        expired = True
+        raise TimeLimitExceeded()
+    if resource is not None:
+        if timeout is not None:
+            # the hard limit kills the process if the tested code catches the time limit exception and keeps running
+            limit = math.ceil(timeout) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+        if memory_limit > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        if timeout is not None and hasattr(signal, "setitimer"):
+            signal.signal(signal.SIGPROF, on_time_limit)
+            signal.setitimer(signal.ITIMER_PROF, timeout)
+        try:
+            fn, fn_args, cmp, cmp_args = Problem(**problem_kwargs).prepare(test_case)
+        except TimeLimitExceeded:
+            raise
+        except:
+            result = Result(False, 0, traceback.format_exc())
+        else:
+            result = execute_test(fn, fn_args, cmp, cmp_args)
+        if timeout is not None and hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_PROF, 0)
+    except TimeLimitExceeded:
+        pass
+    if expired: result = Result(False, 0, "Timeout")
+    channel.send((output.getvalue(), result))
+    channel.close()
+
+class ParallelRunner:
+    def __init__(self, jobs: int, memory_limit: int, solution: str) -> None:
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self.jobs = jobs
+        self.memory_limit = memory_limit    # in bytes (0 means no limit)
+        self.solution = solution
+        self.tasks: List[Tuple[Dict[str, Any], Dict[str, Any], Optional[float]]] = []
+
+    # Add a test case to the queue, the test cases start running when the results are requested
+    def submit(self, problem_kwargs: Dict[str, Any], test_case: Dict[str, Any], timeout: Optional[float]):
+        self.tasks.append((problem_kwargs, test_case, timeout))
+
+    # Run the test cases and yield (printed output, result) for every test case in the order they were submitted
+    def results(self) -> Iterator[Tuple[str, Union[Result, None]]]:
+        finished: Dict[int, Tuple[str, Union[Result, None]]] = {}
+        running = {} # channel -> (index, process, deadline)
+        next_task, next_result = 0, 0
+        try:
+            while next_result < len(self.tasks):
+                while next_task < len(self.tasks) and len(running) < self.jobs:
+                    problem_kwargs, test_case, timeout = self.tasks[next_task]
+                    receiver, sender = self.context.Pipe(duplex=False)
+                    process = self.context.Process(target=run_isolated_test, daemon=True,
+                        args=(sender, problem_kwargs, test_case, timeout, self.memory_limit, self.solution))
+                    process.start()
+                    sender.close()
+                    deadline = None if timeout is None else time.time() + max(2 * timeout, timeout + 1)
+                    running[receiver] = (next_task, process, deadline)
+                    next_task += 1
+                if next_result in finished:
+                    yield finished.pop(next_result)
+                    next_result += 1
+                    continue
+                deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+                wait_time = max(0, min(deadlines) - time.time()) if deadlines else None
+                for channel in mpc.wait(list(running), wait_time):
+                    index, process, _ = running.pop(channel)
+                    try:
+                        finished[index] = channel.recv()
+                    except EOFError:
+                        # the process died without sending a result (e.g. it was killed by the CPU time limit)
+                        process.join()
+                        exceeded = resource is not None and process.exitcode in (-signal.SIGXCPU, -signal.SIGKILL)
+                        finished[index] = ("", Result(False, 0, "Timeout" if exceeded else "Run Failed"))
+                    channel.close()
+                    process.join()
+                now = time.time()
+                for channel, (index, process, deadline) in list(running.items()):
+                    if deadline is not None and now >= deadline:
+                        process.kill()
+                        process.join()
+                        channel.close()
+                        del running[channel]
+                        finished[index] = ("", Result(False, 0, "Timeout"))
+        finally:
+            for channel, (_, process, _) in running.items():
+                process.kill()
+                process.join()
+                channel.close()
+
+# Returns a function that writes every record it is given as a line of JSON to the file (this is used by "--json")
+# The file is flushed after every line so the results can be read while the grading is still running
+def json_reporter(file) -> Callable[[Dict[str, Any]], None]:
+    def report(record: Dict[str, Any]):
+        file.write(json.dumps(record, default=str) + "\n")
+        file.flush()
+    return report
+
+# The fixtures of the test cases: the arguments of the test cases are python expressions that are evaluated by "prepare"
+# Every expression is compiled once per process. The expressions that only load a level from a file
+# (a call like "DungeonProblem.from_file('dungeons/dungeon1.txt')" whose arguments are constants) are fixtures:
+# the level is parsed once and stored as a pickled snapshot, then every test case gets its own copy by unpickling the snapshot
+# (the copy is as independent as a newly parsed level so a test case cannot affect the others).
+# Every fixture that can be pickled gets a snapshot, so a test case gets the same kind of copy in every run (the choice does not depend on timings).
+# A fixture that cannot be pickled is evaluated again for every test case.
+# With the parallel engine, the fixtures are loaded by "submit" before the test processes are forked, so the processes inherit them.
+class Fixtures:
+    def __init__(self, namespace: Dict[str, Any]) -> None:
+        self.namespace = namespace
+        self.compiled: Dict[str, Tuple[Any, bool]] = {}     # expression -> (code, is it a fixture)
+        self.snapshots: Dict[str, Optional[bytes]] = {}     # fixture expression -> pickled value (None if it cannot be pickled)
+
+    # Returns True if the node is a constant or a call of a name with constant arguments (e.g. "Point(0,2)")
+    @staticmethod
+    def _is_constant(node: ast.expr) -> bool:
+        if isinstance(node, ast.Constant): return True
+        if isinstance(node, (ast.Tuple, ast.List)): return all(Fixtures._is_constant(element) for element in node.elts)
+        if isinstance(node, ast.Call):
+            return isinstance(node.func, ast.Name) and all(Fixtures._is_constant(arg) for arg in node.args) \
+                and all(Fixtures._is_constant(keyword.value) for keyword in node.keywords)
+        return False
+
+    # Returns the compiled code of the expression and whether it is a fixture
+    def compile(self, expression: str) -> Tuple[Any, bool]:
+        compiled = self.compiled.get(expression)
+        if compiled is None:
+            node = ast.parse(expression, mode="eval").body
+            is_fixture = isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "from_file" \
+                and isinstance(node.func.value, ast.Name) and all(Fixtures._is_constant(arg) for arg in [*node.args, *(keyword.value for keyword in node.keywords)])
+            compiled = self.compiled[expression] = (compile(expression, "<string>", "eval"), is_fixture)
+        return compiled
+
+    # Returns the value of the expression (a new copy for every call if it is a fixture)
+    def evaluate(self, expression: str) -> Any:
+        code, is_fixture = self.compile(expression)
+        if not is_fixture: return eval(code, self.namespace)
+        if expression not in self.snapshots:
+            value = eval(code, self.namespace)
+            try:
+                snapshot = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                # the snapshot is checked once so a value that cannot be unpickled is evaluated again instead
+                pickle.loads(snapshot)
+            except Exception:
+                snapshot = None
+            self.snapshots[expression] = snapshot
+            return value
+        snapshot = self.snapshots[expression]
+        return eval(code, self.namespace) if snapshot is None else pickle.loads(snapshot)
+
+    # Load the fixtures of a test case (if a fixture cannot be loaded, the error is left to the test case)
+    def load(self, test_case: Dict[str, Any]):
+        for expression in [*test_case.get("input_args", []), *test_case.get("input_kwargs", {}).values()]:
+            try:
+                if self.compile(expression)[1] and expression not in self.snapshots: self.evaluate(expression)
+            except Exception:
+                pass
+
+fixtures = Fixtures(globals())
+
 def default_comparator(output, expected):
     success = output == expected
     grade = (1 if success else 0)
@@ -79,6 +269,7 @@ def approximate_comparator(output, expected):
 
 class Problem:
     def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
         self.name = kwargs.get("name", "Unnamed Problem")
         self.testcases_path = kwargs.get("testcases_path", self.name)
         self.default_fn = lambda x: x
@@ -89,35 +280,57 @@ class Problem:
         self.default_timeout = kwargs.get("timeout", 1)
         self.grade = 0
         self.maximum_grade = 0
-    
-    def run(self, is_debug: bool = False, pattern: str = "*", time_scale: float = 1):
+        self.test_cases: List[Dict[str, Any]] = []
+
+    # Returns the function, its arguments, the comparator and its arguments of a test case
+    def prepare(self, test_case: Dict[str, Any]) -> Tuple[Callable, Arguments, Callable, Arguments]:
+        fn = self.default_fn
+        if "function" in test_case: fn = fixtures.evaluate(test_case["function"])
+        fn_args = Arguments(
+            [fixtures.evaluate(arg) for arg in test_case.get("input_args", [])], {key:fixtures.evaluate(value) for key, value in test_case.get("input_kwargs", {}).items()})
+        cmp = self.default_cmp
+        if "comparator" in test_case: cmp = fixtures.evaluate(test_case["comparator"])
+        cmp_args = Arguments(
+            [fixtures.evaluate(arg) for arg in test_case.get("comparison_args", [])],
+            {key:fixtures.evaluate(value) for key, value in test_case.get("comparison_kwargs", {}).items()})
+        return fn, fn_args, cmp, cmp_args
+
+    # Read the test cases and submit them to the parallel runner (their results are given to "run")
+    def submit(self, runner: ParallelRunner, is_debug: bool = False, pattern: str = "*", time_scale: float = 1):
+        self.test_cases = get_test_cases(os.path.join(root, self.testcases_path), pattern)
+        for test_case in self.test_cases:
+            fixtures.load(test_case)
+            runner.submit(self.kwargs, test_case, None if is_debug else test_case.get("timeout", self.default_timeout) * time_scale)
+
+    # Run the test cases and print their results
+    # If results is given, the test cases were submitted to a parallel runner and their results are read from it instead of running them
+    def run(self, is_debug: bool = False, pattern: str = "*", time_scale: float = 1, results: Optional[Iterator[Tuple[str, Union[Result, None]]]] = None, report: Optional[Callable[[Dict[str, Any]], None]] = None):
         print(f"Problem: {self.name}")
-        test_cases = get_test_cases(os.path.join(root, self.testcases_path), pattern)
+        test_cases = get_test_cases(os.path.join(root, self.testcases_path), pattern) if results is None else self.test_cases
         self.grade = 0
         self.maximum_grade = 0
         for test_index, test_case in enumerate(test_cases):
             description = test_case.get("description", f"Test Case {test_index+1}")
             timeout = test_case.get("timeout", self.default_timeout)
             print(f"{test_index+1}: {description} :: time-limit = {timeout*time_scale} sec")
-            fn = self.default_fn
-            if "function" in test_case: fn = eval(test_case["function"])
             input_args = test_case.get("input_args", [])
             input_kwargs = test_case.get("input_kwargs", {})
-            fn_args = Arguments(
-                [eval(arg) for arg in input_args], {key:eval(value) for key, value in input_kwargs.items()})
-            cmp = self.default_cmp
-            if "comparator" in test_case: cmp = eval(test_case["comparator"])
-            cmp_args = Arguments(
-                [eval(arg) for arg in test_case.get("comparison_args", [])],
-                {key:eval(value) for key, value in test_case.get("comparison_kwargs", {}).items()})
             weight = test_case.get("weight", 1)
             maximum_grade = self.weight * weight * test_case.get("maximum_grade", 1)
             self.maximum_grade += maximum_grade
-            result = run_test(fn, fn_args, cmp, cmp_args, (None if is_debug else timeout * time_scale))
+            if results is None:
+                fn, fn_args, cmp, cmp_args = self.prepare(test_case)
+                result = run_test(fn, fn_args, cmp, cmp_args, (None if is_debug else timeout * time_scale))
+            else:
+                output, result = next(results)
+                print(output, end="")
+            record = {"problem": self.name, "test": test_index+1, "description": description, "maximum_grade": maximum_grade}
             if result is None:
                 print("Function is not implemented yet")
+                if report is not None: report(dict(record, status="NOT IMPLEMENTED", grade=0, message=None))
                 continue
             grade = self.weight * weight * result.grade
+            if report is not None: report(dict(record, status="PASS" if result.success else "FAIL", grade=grade, message=result.message))
             if result.success:
                 print(f"Result: PASS {grade}/{maximum_grade}", end="")
                 if result.message:
@@ -163,12 +376,24 @@ def main(args: argparse.Namespace):
             pass
     else:
         problems = [(problem, "*") for index, problem in enumerate(problems)]
+    report = None
+    if args.json:
+        json_file = open(args.json, 'w', encoding="utf-8")
+        report = json_reporter(json_file)
+    results = None
+    if args.jobs > 1:
+        runner = ParallelRunner(args.jobs, args.memory_limit * 2**20, args.solution)
+        for problem, pattern in problems: problem.submit(runner, args.debug, pattern, args.timescale)
+        results = runner.results()
     for problem, pattern in problems:
-        problem.run(args.debug, pattern, args.timescale)
+        problem.run(args.debug, pattern, args.timescale, results, report)
         print()
         total_grade += problem.grade
         maximum_grade += problem.maximum_grade
     print(f"Problem Set Total {total_grade}/{maximum_grade}\n")
+    if report is not None:
+        report({"total": total_grade, "maximum": maximum_grade})
+        json_file.close()
     exit(total_grade)
 
 if __name__ == "__main__":
@@ -177,5 +402,8 @@ if __name__ == "__main__":
     parser.add_argument("--debug", "-d", action="store_true", help="Disables timeout to enable debugging via the autograder")
     parser.add_argument("--timescale", "-t", type=float, default="1.0", help="A scaling factor for the timeout")
     parser.add_argument("--solution", "-s", default="")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="run the test cases in N processes at the same time (every test case runs in its own process)")
+    parser.add_argument("--memory-limit", type=int, default=4096, help="the memory limit (in MiB) of every test case when running with --jobs (0 for no limit)")
+    parser.add_argument("--json", default="", help="write the result of every test case to this file as a line of JSON (the last line contains the total grade)")
     args = parser.parse_args()
     main(args)
\ No newline at end of file
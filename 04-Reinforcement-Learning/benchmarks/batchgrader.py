@@ -0,0 +1,45 @@
+from typing import List
+import argparse, os, shutil, tempfile
+
+from batchgrader import grade_all
+from benchmarks.common import measure_time, print_table
+
+# This benchmark measures the throughput of batchgrader.py (the graded submissions per minute)
+# on a synthetic set of submissions: copies of the "solution" folder where a comment with the copy number is appended to every python file
+# (so every copy has its own source hash and is really graded instead of being read from the cache).
+# For every number of jobs, the copies are graded with an empty cache ("Cold") then graded again with the filled cache ("Warm"),
+# which is the cost of resuming a grading where every submission was already graded.
+# Examples:
+#   python -m benchmarks.batchgrader
+#   python -m benchmarks.batchgrader --copies 50 --jobs 1 4
+
+# Create the copies of the solution folder in the path
+def create_submissions(path: str, copies: int):
+    for index in range(copies):
+        target = os.path.join(path, f"student{index:04d}")
+        shutil.copytree("solution", target, ignore=shutil.ignore_patterns("__pycache__"))
+        for name in os.listdir(target):
+            if name.endswith(".py"):
+                with open(os.path.join(target, name), 'a') as f:
+                    f.write(f"\n# copy {index}\n")
+
+def main(args: argparse.Namespace):
+    rows: List[list] = []
+    with tempfile.TemporaryDirectory() as directory:
+        submissions = os.path.join(directory, "submissions")
+        create_submissions(submissions, args.copies)
+        for jobs in args.jobs:
+            cache = os.path.join(directory, f"cache{jobs}")
+            for name in ["Cold", "Warm"]:
+                results, elapsed = measure_time(grade_all, submissions, 1, jobs, cache, None, False)
+                entries = [entry for runs in results.values() for entry in runs]
+                correct = sum(entry["total"] is not None and entry["total"] == entry["maximum"] for entry in entries)
+                rows.append([jobs, name, len(entries), f"{correct}/{len(entries)}", f"{elapsed:.2f}", f"{len(entries) / elapsed * 60:.1f}"])
+    print_table(["Jobs", "Cache", "Submissions", "Full Grade", "Time (s)", "Submissions/min"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the throughput of the batch grader on copies of the solution folder")
+    parser.add_argument("--copies", "-n", type=int, default=300, help="the number of copies of the solution folder")
+    parser.add_argument("--jobs", "-j", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}), help="the numbers of jobs to compare")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,51 @@
+from typing import Any, Callable, List, Sequence, Tuple
+from importlib import util as ilu
+import gc, time, tracemalloc
+
+# This file contains the shared tools used by the benchmarks
+# The benchmarks should be run from the lab directory as modules, for example:
+#   python -m benchmarks.search_memory
+
+# Load a python file as a module with the given name
+# This is used to load a second version of a module (e.g. the one in the "solution" folder) to compare against
+def load_module(path: str, name: str):
+    spec = ilu.spec_from_file_location(name, path)
+    module = ilu.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Call the function and return its output and the elapsed wall-clock time in seconds
+def measure_time(fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    gc.collect()
+    start = time.perf_counter()
+    output = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    return output, elapsed
+
+# Call the function and return its output and the peak memory (in bytes) allocated during the call
+# Since tracemalloc slows down the execution, the time should be measured in a separate call
+def measure_peak_memory(fn: Callable, *args, **kwargs) -> Tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        output = fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return output, peak
+
+# Format a number of bytes as a human readable string
+def format_bytes(size: float) -> str:
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(size) < 1024: return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+# Print a list of rows as an aligned table
+def print_table(headers: Sequence[str], rows: List[Sequence[Any]]):
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max([len(str(header))] + [len(row[index]) for row in rows]) for index, header in enumerate(headers)]
+    print(" | ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print("-+-".join("-" * width for width in widths))
+    for row in rows:
+        print(" | ".join(cell.ljust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, List
+import argparse, os
+
+import autograder
+from benchmarks.common import measure_time, print_table
+
+# This benchmark measures the overhead of preparing the arguments of the test cases in the autograder
+# with the fixture layer (autograder.Fixtures) and without it (evaluating every expression with "eval" as "prepare" used to do)
+# For every problem, it reports the time to evaluate the expressions of all its test cases:
+#   Eval: every expression is evaluated with "eval" (every level is parsed again for every test case)
+#   Cold: with a new fixture layer (the expressions are compiled and the levels are parsed and pickled once)
+#   Warm: with the same fixture layer again (the levels are copied from their snapshots)
+# The start-up time (reading the problems and the test case files) is reported first.
+
+# Returns the expressions that "prepare" evaluates for a test case
+def expressions(test_case: Dict[str, Any]) -> List[str]:
+    result = [test_case[name] for name in ["function", "comparator"] if name in test_case]
+    for name in ["input_args", "comparison_args"]: result += test_case.get(name, [])
+    for name in ["input_kwargs", "comparison_kwargs"]: result += test_case.get(name, {}).values()
+    return result
+
+def evaluate_all(evaluate: Callable[[str], Any], test_cases: List[Dict[str, Any]]):
+    for test_case in test_cases:
+        for expression in expressions(test_case):
+            evaluate(expression)
+
+def read_all() -> List[autograder.Problem]:
+    _, problems = autograder.read_problems()
+    problems = [autograder.Problem(**problem) for problem in problems]
+    for problem in problems:
+        problem.test_cases = autograder.get_test_cases(os.path.join(autograder.root, problem.testcases_path), "*")
+    return problems
+
+def main(args: argparse.Namespace):
+    problems, startup = measure_time(read_all)
+    print(f"Start-up (reading the problems and the test cases): {startup * 1000:.2f} ms\n")
+    namespace = vars(autograder)
+    rows = []
+    for problem in problems:
+        test_cases = problem.test_cases
+        _, legacy = min((measure_time(evaluate_all, lambda expression: eval(expression, namespace), test_cases) for _ in range(args.repeat)), key=lambda result: result[1])
+        fixtures = autograder.Fixtures(namespace)
+        _, cold = measure_time(evaluate_all, fixtures.evaluate, test_cases)
+        _, warm = min((measure_time(evaluate_all, fixtures.evaluate, test_cases) for _ in range(args.repeat)), key=lambda result: result[1])
+        count = max(1, len(test_cases))
+        rows.append([problem.name, len(test_cases), len(fixtures.snapshots), f"{legacy * 1000:.2f}", f"{cold * 1000:.2f}", f"{warm * 1000:.2f}",
+                     f"{legacy / count * 1000:.3f}", f"{warm / count * 1000:.3f}", f"{legacy / warm:.2f}x"])
+    print_table(["Problem", "Tests", "Fixtures", "Eval (ms)", "Cold (ms)", "Warm (ms)", "Eval/Test (ms)", "Warm/Test (ms)", "Speedup"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the time to prepare the arguments of the test cases with and without the fixture layer")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="the best time of this many runs is reported")
+    args = parser.parse_args()
+    main(args)
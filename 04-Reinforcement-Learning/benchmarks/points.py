@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+from contextlib import contextmanager
+import argparse, glob
+
+import mathutils
+from mathutils import Direction, Point
+import grid
+from grid import GridEnv, GridMDP
+from value_iteration import ValueIterationAgent
+from benchmarks.common import measure_time, print_table
+
+# This benchmark compares the Point named tuple and the neighbor tables against the frozen dataclass that was used before
+# It measures the code of this lab that calls the successor function of the grid MDP:
+#   - value iteration on every grid (which calls "get_successor" for every state and action in every iteration)
+#   - random walks in the grid environments (which call "get_successor" in every step)
+# Every workload is run with:
+#   - the old Point dataclass where the next states are computed by adding the direction vectors (the code before the change)
+#   - the Point named tuple where the next states are still computed by adding the direction vectors
+#   - the Point named tuple with the neighbor table of the MDP (the current code)
+# To run the same code with the old points, the Point class is replaced in the modules of the lab while the old points are measured.
+
+# This is the Point class that was used before the named tuple
+@dataclass(frozen=True, order=True)
+class LegacyPoint:
+    __slots__ = ('x', 'y')
+    x: int
+    y: int
+
+    def __add__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other: 'LegacyPoint') -> 'LegacyPoint':
+        return LegacyPoint(self.x - other.x, self.y - other.y)
+
+    def __neg__(self) -> 'LegacyPoint':
+        return LegacyPoint(-self.x, -self.y)
+
+    def __str__(self) -> str:
+        return f'({self.x}, {self.y})'
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            x, y = other
+            return x==self.x and y==self.y
+        except:
+            return False
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y))
+
+    def __deepcopy__(self, memo):
+        return self
+
+# Replace the Point class (and the direction vectors) in the modules of the lab while the block runs
+@contextmanager
+def use_points(point_class: type):
+    modules = [mathutils, grid]
+    vectors = Direction._Vectors
+    try:
+        for module in modules: module.Point = point_class
+        Direction._Vectors = [point_class(x, y) for x, y in vectors]
+        yield
+    finally:
+        for module in modules: module.Point = Point
+        Direction._Vectors = vectors
+
+# Load the grid MDP, without its neighbor table if table is False (so the next states are computed by adding the direction vectors)
+def load_mdp(path: str, table: bool) -> GridMDP:
+    mdp = GridMDP.from_file(path)
+    if not table: mdp.neighbors = {}
+    return mdp
+
+def value_iteration(levels: List[str], iterations: int, table: bool) -> int:
+    updates = 0
+    for level in levels:
+        agent = ValueIterationAgent(load_mdp(level, table), 0.9)
+        updates += agent.train(iterations) * len(agent.mdp.get_states())
+    return updates
+
+def random_walks(levels: List[str], steps: int, table: bool) -> int:
+    terminals = 0
+    for level in levels:
+        env = GridEnv(load_mdp(level, table))
+        env.reset(0)
+        actions = env.actions()
+        for step in range(steps):
+            _, _, done, _ = env.step(actions[step % len(actions)])
+            if done:
+                terminals += 1
+                env.reset()
+    return terminals
+
+def main(args: argparse.Namespace):
+    levels = args.levels or sorted(glob.glob("grids/*.json"))
+    workloads = [
+        (f"Value iteration ({args.iterations} iterations)", lambda table: value_iteration(levels, args.iterations, table)),
+        (f"Random walks ({args.steps} steps)", lambda table: random_walks(levels, args.steps, table)),
+    ]
+    configurations: List[Tuple[type, bool]] = [(LegacyPoint, False), (Point, False), (Point, True)]
+    rows = []
+    for name, workload in workloads:
+        times: Dict[Tuple[type, bool], float] = {}
+        for point_class, table in configurations:
+            with use_points(point_class):
+                output, times[point_class, table] = min((measure_time(workload, table) for _ in range(args.repeat)), key=lambda result: result[1])
+        base = times[LegacyPoint, False]
+        rows.append([name, output] + [f"{times[configuration]:.4f} ({base / times[configuration]:.2f}x)" for configuration in configurations])
+    print_table(["Workload", "Output", "Dataclass (s)", "Named Tuple (s)", "Named Tuple + Table (s)"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Point named tuple and the neighbor tables against the frozen dataclass")
+    parser.add_argument("levels", nargs="*", help="the grid files (all the grids by default)")
+    parser.add_argument("--iterations", "-i", type=int, default=100, help="the number of value iterations on every grid")
+    parser.add_argument("--steps", "-s", type=int, default=20000, help="the number of random walk steps on every grid")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="the best time of this many runs is reported")
+    args = parser.parse_args()
+    main(args)
@@ -1,7 +1,7 @@
 from typing import Dict, List, Optional, Set, Tuple
 from mdp import MarkovDecisionProcess
 from environment import Environment
-from mathutils import Point, Direction
+from mathutils import Point, Direction, neighbor_table
 from helpers.mt19937 import RandomGenerator
 import json
 
@@ -13,6 +13,7 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
     terminals: Set[Point] # A set of positions where the episode would end when the player reaches it
     rewards: Dict[Point, float] # The reward of each position
     noise: float # The action noise, aka the probability of steering left or right of the intended direction
+    neighbors: Dict[Point, Tuple[Point, ...]] # neighbors[state][direction] is the position reached by moving in the direction (ignoring the walls)
 
     def __init__(self, 
             size: Tuple[int, int], 
@@ -26,6 +27,8 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
         self.terminals = terminals
         self.rewards = rewards
         self.noise = noise
+        # The neighbors are computed once so the successor function does not create new points
+        self.neighbors = neighbor_table(walkable)
 
     # Returns all possible states (where there is no walls)
     def get_states(self) -> List[Point]:
@@ -53,8 +56,9 @@ class GridMDP(MarkovDecisionProcess[Point, Direction]):
             (action.rotate(3), 0.5 * self.noise)
         ]
         states = {}
+        neighbors = self.neighbors.get(state)
         for direction, prob in noisy_actions:
-            next_state = state + direction.to_vector()
+            next_state = state + direction.to_vector() if neighbors is None else neighbors[direction]
             if next_state not in self.walkable: next_state = state
             if next_state in states: states[next_state] += prob
             else: states[next_state] = prob
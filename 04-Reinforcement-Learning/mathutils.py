@@ -1,48 +1,56 @@
-from dataclasses import dataclass
 from enum import IntEnum
-from typing import Iterator
+from typing import Dict, Iterable, NamedTuple, Tuple
 import math
 
 # the class Point will hold a 2D coordinate on a discrete grid
-# We use dataclass with frozen=True to automatically implement:
-#   the constructor, the == operator, the hash function and to make the class immutable
-# Now it can be added to sets and used as keys in dictionaries
-@dataclass(frozen=True, order=True)
-class Point:
-    __slots__ = ('x', 'y')
+# Since points are created and hashed in the hottest loops (e.g. "position + direction.to_vector()"),
+# Point is a named tuple instead of a frozen dataclass:
+#   the constructor, the == operator, the hash function and the ordering are implemented in C by the tuple
+#   which makes creating, hashing and comparing points much faster, and the tuple is immutable.
+# Now it can be added to sets and used as keys in dictionaries, and it can be unpacked (x, y = point) like any tuple
+# Note that a point is equal to the tuple (x, y) (and has the same hash) and they are ordered by x then y like the tuples
+class Point(NamedTuple):
     x: int
     y: int
 
     # The following functions implement the operators +, -, negative and str
+    # The new points are created by tuple.__new__ directly to skip the python constructor of the named tuple
     def __add__(self, other: 'Point') -> 'Point':
-        return Point(self.x + other.x, self.y + other.y)
+        return _tuple_new(Point, (self[0] + other[0], self[1] + other[1]))
     
     def __sub__(self, other: 'Point') -> 'Point':
-        return Point(self.x - other.x, self.y - other.y)
+        return _tuple_new(Point, (self[0] - other[0], self[1] - other[1]))
     
     def __neg__(self) -> 'Point':
-        return Point(-self.x, -self.y)
+        return _tuple_new(Point, (-self[0], -self[1]))
     
     def __str__(self) -> str:
         return f'({self.x}, {self.y})'
-    
+
+    # A point is equal to any pair (a tuple or a list) with the same x and y
+    # The common case (comparing with another tuple) is done by the tuple comparison
     def __eq__(self, other: object) -> bool:
+        if isinstance(other, tuple):
+            return _tuple_eq(self, other)
         try:
             x, y = other
             return x==self.x and y==self.y
         except:
-            return False 
+            return False
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    # the hash is the hash of the tuple (x, y) so a point and the equal tuple can be used as the same key in dictionaries
+    __hash__ = tuple.__hash__
 
-    # this allow points to be used as iterators such as writing:
-    # x, y = point
-    # to unpack the Point class into its x and y components
-    def __iter__(self) -> Iterator[int]:
-        return iter((self.x, self.y))
-    
     # since Point is immutable, the deepcopy should not clone it
     def __deepcopy__(self, memo):
         return self
 
+_tuple_new = tuple.__new__
+_tuple_eq = tuple.__eq__
+
 # This is a helper function to compute the manhattan distance between 2 points
 def manhattan_distance(p1: Point, p2: Point) -> int:
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
@@ -74,4 +82,13 @@ Direction._Vectors = [
     Point(-1,  0),
     Point( 0,  1),
     Point( 0,  0)
-]
\ No newline at end of file
+]
+
+# Build a table that maps every point of a layout (e.g. the walkable positions) to its neighbors
+# where table[point][direction] is the point reached by moving from the point in the direction.
+# If a neighbor is in the layout, the table contains the same point object as the layout,
+# so looking it up in the layout is an identity check instead of a comparison.
+# The table is built once per layout so the successor functions do not need to create new points.
+def neighbor_table(points: Iterable[Point]) -> Dict[Point, Tuple[Point, ...]]:
+    points = {point: point for point in points}
+    return {point: tuple(points.get(neighbor, neighbor) for neighbor in (point + vector for vector in Direction._Vectors)) for point in points}